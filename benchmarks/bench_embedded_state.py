@@ -0,0 +1,84 @@
+"""
+HTML 页面内嵌数据提取: 原来的 解码为 str + 非贪婪正则截取 + json.loads
+与 utils.embedded_state 直接在 bytes 上定位标记并按括号匹配截取 的耗时和峰值内存对比
+
+模拟页面在内嵌数据前后填充大段 HTML, 分别统计数据在页面开头和末尾两种情况
+另外校验 A站 videoInfo 标题中含 ; 时两种方式的结果: 原来的 (.*?); 会提前截断
+
+运行: python -m benchmarks.bench_embedded_state [--padding 512] [--rounds 50]
+"""
+
+import argparse
+import json
+import re
+
+from benchmarks.bench_json_path import make_router_data, measure
+from utils import embedded_state
+
+ROUTER_DATA_MARKER = b"window._ROUTER_DATA"
+ROUTER_DATA_PATTERN = re.compile(
+    r"window\._ROUTER_DATA\s*=\s*(.*?)</script>", re.DOTALL
+)
+ACFUN_VIDEO_PATTERN = re.compile(r"var videoInfo =\s(.*?);")
+
+
+def make_page(state: str, padding_kib: int, state_first: bool) -> bytes:
+    filler = "".join(
+        f'<div class="item-{i}"><span>推荐</span><p>记录美好生活 {i}</p></div>\n'
+        for i in range(padding_kib * 1024 // 64)
+    )
+    script = f"<script>window._ROUTER_DATA = {state}</script>\n"
+    body = script + filler if state_first else filler + script
+    return f"<!DOCTYPE html><html><head></head><body>{body}</body></html>".encode()
+
+
+def regex_extract(page: bytes):
+    html = page.decode()
+    match = ROUTER_DATA_PATTERN.search(html)
+    return json.loads(match.group(1))
+
+
+def check_acfun() -> bool:
+    video_info = {"title": "第一集; 开始</script>", "cover": "https://a.cn/c.jpg"}
+    page = f"<script>var videoInfo = {json.dumps(video_info, ensure_ascii=False)};"
+    page += "\nvar playInfo = {};</script>"
+
+    try:
+        old = json.loads(ACFUN_VIDEO_PATTERN.search(page).group(1))
+    except ValueError:
+        old = None
+    new = embedded_state.extract_state(page.encode(), b"var videoInfo =")
+    print(f"A站标题含 ; : 正则 {'正确' if old == video_info else '截断失败'}, ", end="")
+    print(f"embedded_state {'正确' if new == video_info else '错误'}")
+    return new == video_info
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--padding", type=int, default=512, help="填充 HTML KiB")
+    arg_parser.add_argument("--rounds", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    state = make_router_data()
+    for label, state_first in (("开头", True), ("末尾", False)):
+        page = make_page(state, args.padding, state_first)
+        regex_result, regex_ms, regex_peak = measure(
+            lambda: regex_extract(page), args.rounds
+        )
+        state_result, state_ms, state_peak = measure(
+            lambda: embedded_state.extract_state(page, ROUTER_DATA_MARKER),
+            args.rounds,
+        )
+        same = "一致" if regex_result == state_result else "不一致"
+        print(
+            f"页面 {len(page) / 1024:.0f} KiB, 数据在{label:<4}"
+            f"正则 {regex_ms:>7.2f} ms {regex_peak:>8.0f} KiB | "
+            f"embedded_state {state_ms:>7.2f} ms {state_peak:>8.0f} KiB | {same}"
+        )
+
+    if not check_acfun():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
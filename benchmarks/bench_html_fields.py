@@ -0,0 +1,155 @@
+"""
+按 CSS 选择器提取页面字段: 原来的 parsel.Selector 整页解析 与 utils.html_fields 增量解析 的耗时对比
+
+分别使用美拍 / 绿洲 / A站解析器中定义的字段, 两种方式的结果先做一致性校验, 不一致时退出码为 1
+传入保存下来的页面(浏览器 "另存为" 或 curl 输出)时使用这些页面, 文件名需以平台开头,
+如 meipai.html / lvzhou_1.html / acfun.html; 否则生成结构相同、填充大量推荐内容的模拟页面,
+字段分别位于推荐内容之前和之后(最坏情况, 需要解析整个页面)
+字段在前时只解析页面开头; 字段在后时同样只解析一次整页、查询一轮, 耗时与 parsel 相当
+
+运行: python -m benchmarks.bench_html_fields [page.html ...] [--rounds 20]
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from parsel import Selector
+
+from parser.acfun import AcFun
+from parser.lvzhou import LvZhou
+from parser.meipai import MeiPai
+from utils.html_fields import HtmlFields
+
+# 平台 -> (字段定义, 原来的选择器)
+PLATFORMS: Dict[str, Tuple[HtmlFields, Dict[str, str]]] = {
+    "meipai": (
+        MeiPai.PAGE_FIELDS,
+        {
+            "video_bs64": "#shareMediaBtn::attr(data-video)",
+            "cover_url": "#detailVideo img::attr(src)",
+            "title": ".detail-cover-title::text",
+            "author_href": ".detail-name a::attr(href)",
+            "author_name": ".detail-avatar::attr(alt)",
+            "author_avatar": ".detail-avatar::attr(src)",
+        },
+    ),
+    "lvzhou": (
+        LvZhou.PAGE_FIELDS,
+        {
+            "video_url": "video::attr(src)",
+            "author_avatar": "a.avatar img::attr(src)",
+            "video_cover_style": "div.video-cover::attr(style)",
+            "title": "div.status-title::text",
+            "author_name": "div.nickname::text",
+        },
+    ),
+    "acfun": (
+        AcFun.AUTHOR_FIELDS,
+        {
+            "uid": "div.up-info > a.info-item1::attr(href)",
+            "name": "div.up-info span.up-name::text",
+            "avatar": "div.up-info span.up-avatar > img::attr(src)",
+        },
+    ),
+}
+
+_DETAILS = {
+    "meipai": """
+<div class="detail-cover-title"> 记录美好生活 </div>
+<div id="detailVideo"><img src="https://mvimg.meitudata.com/cover.jpg"></div>
+<div class="detail-name"><a href="/user/1234567">作者</a></div>
+<img class="detail-avatar" alt="作者" src="//mvavatar.meitudata.com/avatar.jpg">
+<a id="shareMediaBtn" data-video="a1b2Ly9tdnZpZGVvMTAubWVpdHVkYXRhLmNvbS92">分享</a>
+""",
+    "lvzhou": """
+<div class="video-cover" style="background-image:url(https://wx1.sinaimg.cn/c.jpg)">
+<video src="https://f.video.weibocdn.com/o0/v.mp4"></video></div>
+<a class="avatar" href="#"><img src="https://tvax1.sinaimg.cn/avatar.jpg"></a>
+<div class="nickname">绿洲用户</div><div class="status-title">绿洲标题</div>
+""",
+    "acfun": """
+<div class="up-info"><a class="info-item1" href="/upPage/123456">
+<span class="up-avatar"><img src="https://imgs.aixifan.com/avatar.jpg"></span></a>
+<span class="up-name">UP主</span></div>
+""",
+}
+
+
+def make_page(platform: str, items: int, details_first: bool) -> bytes:
+    header = "<head><title>页面</title><style>.item { color: red; }</style></head>"
+    recommends = "".join(
+        f'<div class="recommend-item"><a href="/v/{i}"><img src="/cover/{i}.jpg">'
+        f"<p>推荐视频 {i}</p></a></div>\n"
+        for i in range(items)
+    )
+    if details_first:
+        body = f"<body>{_DETAILS[platform]}{recommends}</body>"
+    else:
+        body = f"<body>{recommends}{_DETAILS[platform]}</body>"
+    return f"<!DOCTYPE html><html>{header}{body}</html>".encode()
+
+
+def parsel_extract(html: bytes, selectors: Dict[str, str]) -> Dict[str, Optional[str]]:
+    sel = Selector(body=html)
+    return {name: sel.css(css).get() for name, css in selectors.items()}
+
+
+def per_call(func: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def load_pages(paths: List[str], items: int) -> List[Tuple[str, str, bytes]]:
+    pages = []
+    for path in paths:
+        name = os.path.basename(path)
+        platform = next((p for p in PLATFORMS if name.startswith(p)), None)
+        if platform is None:
+            raise SystemExit(f"无法根据文件名判断平台: {name}")
+        with open(path, "rb") as f:
+            pages.append((name, platform, f.read()))
+    if not pages:
+        for platform in PLATFORMS:
+            pages.append(
+                (f"{platform} 字段在前", platform, make_page(platform, items, True))
+            )
+            pages.append(
+                (f"{platform} 字段在后", platform, make_page(platform, items, False))
+            )
+    return pages
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("pages", nargs="*", help="保存的页面, 文件名以平台开头")
+    arg_parser.add_argument("--items", type=int, default=3000, help="模拟页面推荐条数")
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    mismatched = False
+    print("单位: 毫秒/次")
+    for name, platform, html in load_pages(args.pages, args.items):
+        fields, selectors = PLATFORMS[platform]
+        expected = parsel_extract(html, selectors)
+        actual = fields.extract(html)
+        same = expected == actual
+        mismatched = mismatched or not same
+        parsel_ms = per_call(lambda: parsel_extract(html, selectors), args.rounds)
+        fields_ms = per_call(lambda: fields.extract(html), args.rounds)
+        print(
+            f"{name:<16} {len(html) / 1024:>6.0f} KiB  parsel {parsel_ms:>7.2f}  "
+            f"html_fields {fields_ms:>7.2f}  {'一致' if same else '不一致'}"
+        )
+        if not same:
+            print(f"  parsel: {expected}\n  html_fields: {actual}")
+
+    if mismatched:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
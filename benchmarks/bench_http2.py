@@ -0,0 +1,166 @@
+"""
+HTTP/1.1 与 HTTP/2 上游吞吐对比
+
+在本地启动一个 TLS stub 服务(通过 ALPN 同时支持 h2 与 http/1.1), 每个请求模拟固定的上游延迟,
+分别使用 HTTP/1.1 连接池和 HTTP/2 多路复用的 HttpClientRegistry 并发请求, 输出吞吐与建连次数
+
+运行: python -m benchmarks.bench_http2 [--requests 2000] [--concurrency 100]
+需要安装 h2 和 openssl 命令行工具
+"""
+
+import argparse
+import asyncio
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+
+os.environ["PARSE_VIDEO_HTTP2"] = "1"
+
+import h2.config  # noqa: E402
+import h2.connection  # noqa: E402
+import h2.events  # noqa: E402
+
+from utils.http_client import HttpClientRegistry  # noqa: E402
+
+HOST = "localhost"
+BODY = b'{"code":0,"data":{"durl":[{"url":"https://example.com/v.mp4"}]}}'
+
+
+class StubServer:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        ssl_object = writer.get_extra_info("ssl_object")
+        try:
+            if ssl_object.selected_alpn_protocol() == "h2":
+                await self._handle_h2(reader, writer)
+            else:
+                await self._handle_h1(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_h1(self, reader, writer):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                return
+            await asyncio.sleep(self.latency)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + b"Content-Length: %d\r\n\r\n" % len(BODY)
+                + BODY
+            )
+            await writer.drain()
+
+    async def _handle_h2(self, reader, writer):
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id):
+            await asyncio.sleep(self.latency)
+            conn.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(BODY))),
+                ],
+            )
+            conn.send_data(stream_id, BODY, end_stream=True)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+        tasks = set()
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                return
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    task = asyncio.create_task(respond(event.stream_id))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+
+def make_certificate(workdir: str):
+    cert_file = os.path.join(workdir, "cert.pem")
+    key_file = os.path.join(workdir, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key_file, "-out", cert_file, "-days", "1",
+            "-subj", f"/CN={HOST}", "-addext", f"subjectAltName=DNS:{HOST}",
+        ],
+        check=True,
+        capture_output=True,
+    )  # fmt: skip
+    return cert_file, key_file
+
+
+async def run_case(name, url, cert_file, http2, total, concurrency, server):
+    ssl_context = ssl.create_default_context(cafile=cert_file)
+    registry = HttpClientRegistry(ssl_context=ssl_context)
+    if http2:
+        registry.set_http2_hosts([HOST])
+    server.connections = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            async with registry.client() as client:
+                response = await client.get(url)
+                response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    await registry.aclose()
+    print(
+        f"{name:<10} {total / elapsed:>10.1f} req/s"
+        f"  {elapsed:>7.3f}s  connections={server.connections}"
+    )
+
+
+async def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--concurrency", type=int, default=100)
+    arg_parser.add_argument("--latency", type=float, default=0.02)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cert_file, key_file = make_certificate(workdir)
+        server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_ctx.load_cert_chain(cert_file, key_file)
+        server_ctx.set_alpn_protocols(["h2", "http/1.1"])
+
+        stub = StubServer(args.latency)
+        server = await asyncio.start_server(stub.handle, HOST, 0, ssl=server_ctx)
+        port = server.sockets[0].getsockname()[1]
+        url = f"https://{HOST}:{port}/x/player/playurl"
+
+        print(
+            f"requests={args.requests} concurrency={args.concurrency} "
+            f"latency={args.latency * 1000:.0f}ms"
+        )
+        for name, http2 in (("HTTP/1.1", False), ("HTTP/2", True)):
+            await run_case(
+                name, url, cert_file, http2, args.requests, args.concurrency, stub
+            )
+        server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""
+小红书 window.__INITIAL_STATE__ 解析: yaml.safe_load 与 utils.js_literal.loads 对比
+
+传入保存下来的小红书笔记页面(浏览器 "另存为" 或 curl 输出)时使用这些页面,
+否则生成结构相同的模拟页面(包含 undefined、转义字符和大量评论数据)
+两种方式的解析结果会先做一致性校验(yaml 把 undefined 解析为字符串, 比较前统一为 None),
+不一致时退出码为 1
+
+运行: python -m benchmarks.bench_js_literal [page.html ...] [--notes 40] [--rounds 5]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from typing import Any, List, Tuple
+
+import yaml
+
+from utils import js_literal
+
+STATE_PATTERN = re.compile(r"window\.__INITIAL_STATE__\s*=\s*(.*?)</script>", re.DOTALL)
+
+
+def make_note(rng: random.Random, note_id: str) -> dict:
+    return {
+        "note": {
+            "noteId": note_id,
+            "type": "video" if rng.random() < 0.5 else "normal",
+            "title": f'记录美好生活 #{note_id} "引号" \\ 反斜杠',
+            "desc": "分享一下今天的穿搭～ " * rng.randrange(5, 40),
+            "user": {
+                "userId": f"{rng.randrange(10**23):024x}",
+                "nickname": "小红薯" + str(rng.randrange(10**6)),
+                "avatar": "https://sns-avatar-qc.xhscdn.com/avatar/abc.jpg",
+            },
+            "imageList": [
+                {
+                    "urlDefault": "http://sns-webpic-qc.xhscdn.com/202406/"
+                    f"notes_pre_post/{rng.randrange(10**12)}!nd_dft_wlteh_webp_3",
+                    "width": 1080,
+                    "height": 1440,
+                    "livePhoto": False,
+                    "stream": {"h264": []},
+                    "infoList": [{"imageScene": "WB_DFT", "url": "undefined"}],
+                }
+                for _ in range(rng.randrange(1, 9))
+            ],
+            "video": {
+                "media": {
+                    "stream": {
+                        "h264": [
+                            {
+                                "masterUrl": "http://sns-video-bd.xhscdn.com/"
+                                f"stream/110/{rng.randrange(10**12)}_259.mp4",
+                                "size": rng.randrange(10**8),
+                            }
+                        ]
+                    }
+                }
+            },
+            "interactInfo": {"likedCount": str(rng.randrange(10**5))},
+            "lastUpdateTime": "__UNDEFINED__",
+        },
+        "comments": {
+            "list": [
+                {"id": str(i), "content": "好看！" * rng.randrange(1, 20)}
+                for i in range(rng.randrange(20, 80))
+            ],
+            "cursor": "",
+            "hasMore": True,
+        },
+        "currentTime": "__UNDEFINED__",
+    }
+
+
+def make_page(notes: int, seed: int = 20240601) -> str:
+    rng = random.Random(seed)
+    note_ids = [f"{rng.randrange(16**24):024x}" for _ in range(notes)]
+    state = {
+        "global": {"appSettings": {"notificationInterval": 30}, "serverTime": 0},
+        "user": {"loggedIn": False, "userInfo": "__UNDEFINED__"},
+        "note": {
+            "currentNoteId": note_ids[0],
+            "noteDetailMap": {note_id: make_note(rng, note_id) for note_id in note_ids},
+            "serverRequestInfo": {"state": "success", "errorCode": 0},
+        },
+    }
+    # 与页面相同, 用 / 转义斜杠, 并写入裸 undefined
+    blob = (
+        json.dumps(state, ensure_ascii=False)
+        .replace("/", "\\u002F")
+        .replace('"__UNDEFINED__"', "undefined")
+    )
+    return (
+        "<html><head><script>window.__INITIAL_STATE__="
+        f"{blob}</script></head><body></body></html>"
+    )
+
+
+def normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    return None if value == "undefined" else value
+
+
+def timed(func, blob: str, rounds: int) -> Tuple[Any, float]:
+    result = None
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func(blob)
+    return result, (time.perf_counter() - start) / rounds
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("pages", nargs="*", help="保存的小红书页面")
+    arg_parser.add_argument("--notes", type=int, default=40)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    pages: List[Tuple[str, str]] = []
+    for path in args.pages:
+        with open(path, encoding="utf-8") as f:
+            pages.append((path, f.read()))
+    if not pages:
+        pages.append((f"模拟页面({args.notes} 篇笔记)", make_page(args.notes)))
+
+    mismatches = 0
+    for name, html in pages:
+        blob = STATE_PATTERN.search(html).group(1)
+        yaml_result, yaml_time = timed(yaml.safe_load, blob, args.rounds)
+        fast_result, fast_time = timed(js_literal.loads, blob, args.rounds)
+        same = normalize(yaml_result) == normalize(fast_result)
+        mismatches += not same
+        print(
+            f"{name}: {len(blob) / 1024:.0f} KiB, "
+            f"yaml {yaml_time * 1000:.1f} ms, js_literal {fast_time * 1000:.2f} ms, "
+            f"{yaml_time / fast_time:.0f}x, 结果{'一致' if same else '不一致'}"
+        )
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
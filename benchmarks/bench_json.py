@@ -0,0 +1,194 @@
+"""
+各平台 JSON 解码耗时: 标准库 json(先解码为 str, 即原来的 response.json()) 与 utils.fast_json 的各解码器对比
+
+默认使用按各平台接口 / 页面内嵌数据结构生成的模拟数据,
+指定 --fixtures 目录时读取其中保存的响应, 文件名为 <平台>.json, 如 bilibili_view.json
+
+运行: python -m benchmarks.bench_json [--fixtures dir] [--rounds 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import Callable, Dict
+
+from utils import fast_json
+
+
+def _text(rng: random.Random, length: int) -> str:
+    return "".join(
+        rng.choice("记录美好生活分享日常abcdefg 123#@") for _ in range(length)
+    )
+
+
+def _url(rng: random.Random, host: str) -> str:
+    object_id = f"{rng.randrange(16**32):032x}"
+    return f"https://{host}/obj/{object_id}?x-expires={rng.randrange(10**10)}"
+
+
+def _author(rng: random.Random) -> dict:
+    return {
+        "uid": str(rng.randrange(10**15)),
+        "sec_uid": f"MS4wLjABAAAA{rng.randrange(16**40):040x}",
+        "nickname": _text(rng, 8),
+        "avatar_thumb": {"url_list": [_url(rng, "p3.douyinpic.com") for _ in range(3)]},
+        "signature": _text(rng, 60),
+    }
+
+
+def _douyin_item(rng: random.Random) -> dict:
+    return {
+        "aweme_id": str(rng.randrange(10**19)),
+        "desc": _text(rng, 80),
+        "author": _author(rng),
+        "video": {
+            "play_addr": {
+                "url_list": [_url(rng, "v3.douyinvod.com") for _ in range(3)]
+            },
+            "cover": {"url_list": [_url(rng, "p3.douyinpic.com") for _ in range(3)]},
+            "bit_rate": [
+                {"gear_name": f"normal_{i}", "bit_rate": rng.randrange(10**7)}
+                for i in range(6)
+            ],
+        },
+        "statistics": {key: rng.randrange(10**6) for key in ("digg", "share", "play")},
+        "text_extra": [{"hashtag_name": _text(rng, 6)} for _ in range(8)],
+    }
+
+
+def make_fixtures(seed: int = 20240601) -> Dict[str, bytes]:
+    rng = random.Random(seed)
+    payloads = {
+        "bilibili_view": {
+            "code": 0,
+            "data": {
+                "bvid": "BV1xx411c7mD",
+                "title": _text(rng, 40),
+                "desc": _text(rng, 400),
+                "pic": _url(rng, "i0.hdslb.com"),
+                "owner": {"mid": 1, "name": _text(rng, 8), "face": _url(rng, "i0")},
+                "pages": [{"cid": i, "part": _text(rng, 20)} for i in range(20)],
+                "stat": {key: rng.randrange(10**6) for key in ("view", "like")},
+            },
+        },
+        "bilibili_playurl": {
+            "code": 0,
+            "data": {
+                "durl": [
+                    {"url": _url(rng, "upos-sz.bilivideo.com"), "size": 1}
+                    for _ in range(4)
+                ],
+                "support_formats": [{"quality": q} for q in range(10)],
+            },
+        },
+        "douyin_aweme_detail": {"aweme_detail": _douyin_item(rng), "status_code": 0},
+        "douyin_router_data": {
+            "loaderData": {
+                "video_(id)/page": {
+                    "videoInfoRes": {
+                        "item_list": [_douyin_item(rng)],
+                        "filter_list": [],
+                    }
+                },
+                "layout": {
+                    "config": {_text(rng, 10): _text(rng, 200)} for _ in range(30)
+                },
+            }
+        },
+        "kuaishou_init_state": {
+            f"tusjoh.{i}": {
+                "result": 1,
+                "photo": {
+                    "caption": _text(rng, 80),
+                    "mainMvUrls": [{"url": _url(rng, "kwaicdn.com")}],
+                    "coverUrls": [{"url": _url(rng, "kwaicdn.com")}],
+                },
+            }
+            for i in range(40)
+        },
+        "acfun_video_info": {
+            "title": _text(rng, 40),
+            "cover": _url(rng, "imgs.aixifan.com"),
+            "tagList": [{"name": _text(rng, 6)} for _ in range(20)],
+            "videoList": [{"id": i, "title": _text(rng, 20)} for i in range(30)],
+        },
+        "acfun_play_info": {
+            "streams": [
+                {"playUrls": [_url(rng, "ali-safety-video.acfun.cn")], "size": i}
+                for i in range(8)
+            ]
+        },
+        "weibo_render_data": [
+            {
+                "status": {
+                    "text": _text(rng, 300),
+                    "user": {"screen_name": _text(rng, 8)},
+                    "pics": [{"large": {"url": _url(rng, "wx1.sinaimg.cn")}}] * 9,
+                }
+            }
+        ],
+        "xinpianchang_next_data": {
+            "props": {
+                "pageProps": {
+                    "detail": {
+                        "title": _text(rng, 40),
+                        "content": _text(rng, 2000),
+                        "media_id": "abc",
+                        "video": {"appKey": "key"},
+                        "author": {"userinfo": {"id": 1, "username": _text(rng, 8)}},
+                    },
+                    "relatedVideos": [_douyin_item(rng) for _ in range(20)],
+                }
+            }
+        },
+    }
+    return {
+        name: json.dumps(payload, ensure_ascii=False).encode()
+        for name, payload in payloads.items()
+    }
+
+
+def load_fixtures(directory: str) -> Dict[str, bytes]:
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename), "rb") as f:
+                fixtures[filename[:-5]] = f.read()
+    return fixtures
+
+
+def per_call(func: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--fixtures", help="保存的响应目录, 文件名为 <平台>.json")
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else make_fixtures()
+    names = list(fast_json.DECODERS)
+    print(f"当前使用: {fast_json.BACKEND}, 单位: 微秒/次")
+    print(
+        f"{'平台':<24}{'KiB':>8}{'json(str)':>12}" + "".join(f"{n:>12}" for n in names)
+    )
+    for name, data in fixtures.items():
+        baseline = per_call(lambda: json.loads(data.decode()), args.rounds)
+        timings = [
+            per_call(lambda: decode(data), args.rounds)
+            for decode in fast_json.DECODERS.values()
+        ]
+        print(
+            f"{name:<24}{len(data) / 1024:>8.1f}{baseline:>12.1f}"
+            + "".join(f"{t:>12.1f}" for t in timings)
+        )
+
+
+if __name__ == "__main__":
+    main()
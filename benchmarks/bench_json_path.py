@@ -0,0 +1,156 @@
+"""
+页面内嵌数据按路径提取: 解码整个文档后取子树 与 utils.json_path.extract 只解码子树 的耗时和峰值内存对比,
+以及 utils.embedded_state.extract_state 在两者之间自动选择的结果
+
+- 抖音 / 西瓜 _ROUTER_DATA: loaderData.*.videoInfoRes.item_list[0], 目标之前有大段无关的 loaderData
+- 小红书 __INITIAL_STATE__: note.noteDetailMap[id].note, 分别统计当前笔记在 map 开头和末尾两种情况
+- 括号密集的文档: 大量短数组, 目标在末尾, 扫描器最慢的情况
+
+三种方式的结果不一致时退出码为 1
+
+运行: python -m benchmarks.bench_json_path [--notes 40] [--rounds 20]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from benchmarks.bench_js_literal import STATE_PATTERN, make_page
+from benchmarks.bench_json import _douyin_item, _text
+from utils import embedded_state, fast_json, js_literal, json_path
+
+
+def make_router_data(seed: int = 20240601) -> str:
+    rng = random.Random(seed)
+    loader_data = {
+        "layout": {
+            "config": {f"key_{i}": _text(rng, 200) for i in range(20)},
+            "abTest": [{"vid": str(i), "params": _text(rng, 80)} for i in range(30)],
+        },
+        "video_(id)/page": {
+            "videoInfoRes": {"item_list": [_douyin_item(rng)], "filter_list": []},
+            "commonProps": {"related": [_douyin_item(rng) for _ in range(30)]},
+        },
+    }
+    return json.dumps({"loaderData": loader_data}, ensure_ascii=False)
+
+
+def measure(func: Callable[[], Any], rounds: int) -> Tuple[Any, float, float]:
+    """
+    :return: 结果, 平均耗时(ms), 峰值内存(KiB)
+    """
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+    return result, elapsed, peak / 1024
+
+
+def make_dense_data(rows: int = 100_000) -> str:
+    rows_data = [[i, [i % 7], {"v": [i % 3]}] for i in range(rows)]
+    return json.dumps({"rows": rows_data, "target": {"id": rows}})
+
+
+def script_page(marker: str, state: str) -> bytes:
+    return f"<html><script>{marker}={state}</script></html>".encode()
+
+
+def compare(
+    name: str,
+    full: Callable[[], Any],
+    partial: Callable[[], Any],
+    chosen: Callable[[], Any],
+    rounds: int,
+) -> bool:
+    full_result, full_ms, full_peak = measure(full, rounds)
+    partial_result, partial_ms, partial_peak = measure(partial, rounds)
+    chosen_result, chosen_ms, _ = measure(chosen, rounds)
+    same = full_result == partial_result == chosen_result
+    print(
+        f"{name:<28} 整体解码 {full_ms:>7.2f} ms {full_peak:>8.0f} KiB | "
+        f"路径提取 {partial_ms:>7.2f} ms {partial_peak:>8.0f} KiB | "
+        f"extract_state {chosen_ms:>7.2f} ms | {'一致' if same else '不一致'}"
+    )
+    return same
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--notes", type=int, default=40)
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    results = []
+    router_data = make_router_data()
+    router_page = script_page("window._ROUTER_DATA", router_data)
+    router_path = ("loaderData", json_path.WILDCARD, "videoInfoRes", "item_list", 0)
+    print(f"_ROUTER_DATA {len(router_data) / 1024:.0f} KiB")
+    results.append(
+        compare(
+            "douyin item_list[0]",
+            lambda: fast_json.loads(router_data)["loaderData"]["video_(id)/page"][
+                "videoInfoRes"
+            ]["item_list"][0],
+            lambda: json_path.extract(router_data, router_path),
+            lambda: embedded_state.extract_state(
+                router_page, b"window._ROUTER_DATA", router_path
+            ),
+            args.rounds,
+        )
+    )
+
+    html = make_page(args.notes)
+    start = STATE_PATTERN.search(html).start(1)
+    # 与解析器相同, 从页面的 bytes 开始解码
+    state = html[start:].encode()
+    note_ids = list(js_literal.loads(state)["note"]["noteDetailMap"])
+    print(f"__INITIAL_STATE__ {len(state) / 1024:.0f} KiB, {args.notes} 篇笔记")
+    page = html.encode()
+    for label, note_id in (("开头", note_ids[0]), ("末尾", note_ids[-1])):
+        note_path = ("note", "noteDetailMap", note_id, "note")
+        results.append(
+            compare(
+                f"redbook 当前笔记在{label}",
+                lambda: js_literal.loads(state)["note"]["noteDetailMap"][note_id][
+                    "note"
+                ],
+                lambda: json_path.extract(state, note_path, loads=js_literal.loads),
+                lambda: embedded_state.extract_state(
+                    page,
+                    b"window.__INITIAL_STATE__",
+                    note_path,
+                    loads=js_literal.loads,
+                ),
+                args.rounds,
+            )
+        )
+
+    dense_data = make_dense_data()
+    dense_page = script_page("window.__DATA__", dense_data)
+    print(f"括号密集的文档 {len(dense_data) / 1024:.0f} KiB")
+    results.append(
+        compare(
+            "dense target",
+            lambda: fast_json.loads(dense_data)["target"],
+            lambda: json_path.extract(dense_data, ("target",)),
+            lambda: embedded_state.extract_state(
+                dense_page, b"window.__DATA__", ("target",)
+            ),
+            max(1, args.rounds // 4),
+        )
+    )
+
+    if not all(results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
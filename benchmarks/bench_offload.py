@@ -0,0 +1,113 @@
+"""
+大页面数据提取对事件循环的影响: utils.offload 的 none / thread / process 三种执行方式对比
+
+模拟并发解析: 多个协程同时提取小红书 __INITIAL_STATE__(js_literal)和
+抖音 _ROUTER_DATA(embedded_state)页面数据, 期间用 LoopLagMonitor 高频采样事件循环调度延迟,
+统计总耗时、平均 / 最大延迟; 各方式的提取结果先与直接执行的结果做一致性校验, 不一致时退出码为 1
+
+none 下提取期间事件循环完全阻塞; thread 下提取仍持有 GIL, 但循环可以在线程切换间隙得到调度;
+process 下提取在子进程中执行, 代价是页面和结果的 pickle 开销以及进程启动时间(不计入统计)
+
+运行: python -m benchmarks.bench_offload [--notes 200] [--jobs 32] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, List, Tuple
+
+from benchmarks.bench_embedded_state import make_page as make_douyin_page
+from benchmarks.bench_js_literal import make_page as make_redbook_page
+from benchmarks.bench_json_path import make_router_data
+from parser.redbook import RedBook
+from utils import embedded_state
+from utils.offload import MODES, ExtractionOffloader, LoopLagMonitor
+
+ROUTER_DATA_MARKER = b"window._ROUTER_DATA"
+
+
+def extract_douyin(html: bytes) -> Any:
+    return embedded_state.extract_state(html, ROUTER_DATA_MARKER)
+
+
+def make_jobs(notes: int, padding_kib: int) -> List[Tuple[str, Callable, bytes]]:
+    return [
+        ("redbook", RedBook._extract_note, make_redbook_page(notes).encode()),
+        (
+            "douyin",
+            extract_douyin,
+            make_douyin_page(make_router_data(), padding_kib, False),
+        ),
+    ]
+
+
+async def run_mode(
+    mode: str, jobs: List[Tuple[str, Callable, bytes]], count: int, args
+) -> Tuple[float, dict, bool]:
+    # 阈值为 0: 所有页面都按 mode 执行
+    offloader = ExtractionOffloader(mode, threshold=0, workers=args.workers)
+    expected = [func(html) for _, func, html in jobs]
+    # 先让每个线程 / 进程都执行过, 进程池启动时间不计入统计
+    warm = await asyncio.gather(
+        *(
+            offloader.run(jobs[i % len(jobs)][1], jobs[i % len(jobs)][2])
+            for i in range(max(args.workers, len(jobs)))
+        )
+    )
+    same = warm[: len(jobs)] == expected
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(index: int) -> None:
+        _, func, html = jobs[index % len(jobs)]
+        async with semaphore:
+            await offloader.run(func, html)
+
+    monitor = LoopLagMonitor(args.interval)
+    monitor.start()
+    await asyncio.sleep(args.interval * 2)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    # 等待提取结束后的一次采样, 记录最后一段阻塞
+    await asyncio.sleep(args.interval * 2)
+    monitor.stop()
+    offloader.shutdown()
+    return elapsed, monitor.snapshot(), same
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--notes", type=int, default=200, help="小红书页面笔记数")
+    arg_parser.add_argument("--padding", type=int, default=512, help="抖音页面填充 KiB")
+    arg_parser.add_argument("--jobs", type=int, default=32, help="提取次数")
+    arg_parser.add_argument("--concurrency", type=int, default=8)
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument(
+        "--interval", type=float, default=0.005, help="采样间隔(秒)"
+    )
+    arg_parser.add_argument("--modes", default=",".join(MODES))
+    args = arg_parser.parse_args()
+
+    jobs = make_jobs(args.notes, args.padding)
+    for name, _, html in jobs:
+        print(f"{name} 页面 {len(html) / 1024:.0f} KiB")
+    print(f"{args.jobs} 次提取, 并发 {args.concurrency}, 执行器 {args.workers} 个")
+
+    mismatched = False
+    for mode in args.modes.split(","):
+        elapsed, lag, same = asyncio.run(run_mode(mode, jobs, args.jobs, args))
+        mismatched = mismatched or not same
+        print(
+            f"{mode:<8} 总耗时 {elapsed * 1000:>8.1f} ms  "
+            f"延迟 平均 {lag['avg_ms']:>7.2f} ms 最大 {lag['max_ms']:>7.2f} ms  "
+            f">10ms {lag['over_10ms']:>4}/{lag['samples']:<4} "
+            f"{'一致' if same else '不一致'}"
+        )
+
+    if mismatched:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
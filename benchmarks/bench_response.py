@@ -0,0 +1,99 @@
+"""
+解析接口响应编码耗时:
+原来的 FastAPI jsonable_encoder + JSONResponse 与 utils.response_codec 直接编码为 bytes 对比
+JSON 编码器的结果会先与原来的结果做一致性校验
+
+按图集图片数量分别统计, 同时给出各编码器的响应大小
+
+运行: python -m benchmarks.bench_response [--images 0,9,50] [--rounds 2000]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.bench_json import _text, _url
+from parser.base import ImgInfo, VideoAuthor, VideoInfo
+from utils import fast_json, response_codec
+
+
+def make_video_info(rng: random.Random, images: int) -> VideoInfo:
+    return VideoInfo(
+        video_url="" if images else _url(rng, "v3.douyinvod.com"),
+        cover_url=_url(rng, "p3.douyinpic.com"),
+        title=_text(rng, 80),
+        music_url=_url(rng, "sf3.douyinvod.com"),
+        images=[
+            ImgInfo(
+                url=_url(rng, "p3.douyinpic.com"),
+                live_photo_url=_url(rng, "v3.douyinvod.com") if i % 3 == 0 else "",
+            )
+            for i in range(images)
+        ],
+        author=VideoAuthor(
+            uid=str(rng.randrange(10**15)),
+            name=_text(rng, 8),
+            avatar=_url(rng, "p3.douyinpic.com"),
+        ),
+    )
+
+
+def fastapi_encode(payload: Any) -> bytes:
+    """
+    原来返回 dict 时 FastAPI 的处理: jsonable_encoder 转换后由 JSONResponse 编码
+    """
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode()
+
+
+def per_call(func: Callable[[], bytes], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--images", default="0,9,50", help="图集图片数量, 逗号分隔")
+    arg_parser.add_argument("--rounds", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    encoders = {"fastapi": fastapi_encode}
+    encoders.update(
+        {f"json:{name}": encoder for name, encoder in fast_json.ENCODERS.items()}
+    )
+    if response_codec.MSGPACK_MEDIA_TYPE in response_codec.ENCODERS:
+        encoders["msgpack"] = response_codec.ENCODERS[response_codec.MSGPACK_MEDIA_TYPE]
+
+    rng = random.Random(20240601)
+    print(f"当前 JSON 编码器: {fast_json.BACKEND}, 单位: 微秒/次 (字节数)")
+    print(f"{'图片数':<8}" + "".join(f"{name:>22}" for name in encoders))
+    for images in map(int, args.images.split(",")):
+        payload = {
+            "code": 200,
+            "msg": "解析成功",
+            "data": make_video_info(rng, images),
+        }
+        baseline = json.loads(fastapi_encode(payload))
+        cells = []
+        for name, encode in encoders.items():
+            content = encode(payload)
+            if name != "msgpack" and json.loads(content) != baseline:
+                raise SystemExit(f"{name} 编码结果不一致")
+            elapsed = per_call(lambda: encode(payload), args.rounds)
+            cells.append(f"{elapsed:.1f} ({len(content)})")
+        print(f"{images:<8}" + "".join(f"{cell:>22}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+解析结果缓存后端对比
+
+对 memory / sqlite / mmap / redis 四种后端分别写入、命中读取、未命中读取一批解析结果,
+输出每种操作的耗时和后端统计; sqlite 和 mmap 额外由子进程写入, 验证多个 worker 间共享
+redis 后端默认连接本地启动的 RESP stand-in 服务, 也可通过 --redis-url 指向真实的 Redis
+
+运行: python -m benchmarks.bench_result_cache [--entries 2000]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+
+from parser.base import ImgInfo, VideoAuthor, VideoInfo, VideoSource
+from parser.result_cache import ResultCache
+from tests.resp_stand_in import RespStandIn
+from utils.cache_backends import create_cache_backend
+
+
+def make_video_info(index: int) -> VideoInfo:
+    expires = int(time.time()) + 3600
+    return VideoInfo(
+        video_url=f"https://v3-web.douyinvod.com/{index:032x}/video.mp4"
+        f"?a=6383&br=1024&x-expires={expires}&l=2024{index:016d}",
+        cover_url=f"https://p3-sign.douyinpic.com/{index:032x}~tplv-dy-360p.jpeg",
+        title=f"记录美好生活 #{index}",
+        music_url=f"https://sf5-hl-cdn-tos.douyinstatic.com/obj/{index}.mp3",
+        images=[
+            ImgInfo(url=f"https://p3-sign.douyinpic.com/{index}/{i}.webp")
+            for i in range(4)
+        ],
+        author=VideoAuthor(uid=str(index), name="作者", avatar="https://p3/a.jpeg"),
+    )
+
+
+async def run_case(name, backend, entries):
+    cache = ResultCache(backend)
+    infos = [make_video_info(i) for i in range(entries)]
+
+    async def timed(label, func):
+        start = time.perf_counter()
+        for i in range(entries):
+            await func(i)
+        elapsed = time.perf_counter() - start
+        return f"{label} {elapsed / entries * 1e6:>8.1f}us"
+
+    results = [
+        await timed("set", lambda i: cache.set(VideoSource.DouYin, str(i), infos[i])),
+        await timed("hit", lambda i: cache.get(VideoSource.DouYin, str(i))),
+        await timed("miss", lambda i: cache.get(VideoSource.DouYin, f"x{i}")),
+    ]
+    print(f"{name:<8} " + "  ".join(results))
+    print(f"{'':<8} {await cache.stats()}")
+    await cache.aclose()
+
+
+def write_from_worker(backend_name, path, entries):
+    async def write():
+        cache = ResultCache(create_cache_backend(backend_name, "bench", entries, path))
+        for i in range(entries):
+            await cache.set(VideoSource.DouYin, f"w{i}", make_video_info(i))
+        await cache.aclose()
+
+    asyncio.run(write())
+
+
+async def check_shared(backend_name, path, entries):
+    process = multiprocessing.Process(
+        target=write_from_worker, args=(backend_name, path, entries)
+    )
+    process.start()
+    await asyncio.to_thread(process.join)
+    cache = ResultCache(create_cache_backend(backend_name, "bench", entries, path))
+    hits = 0
+    for i in range(entries):
+        hits += await cache.get(VideoSource.DouYin, f"w{i}") is not None
+    await cache.aclose()
+    print(f"{backend_name:<8} 子进程写入 {entries} 条, 当前进程命中 {hits} 条")
+
+
+async def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--entries", type=int, default=2000)
+    arg_parser.add_argument("--redis-url", default="")
+    args = arg_parser.parse_args()
+    entries = args.entries
+
+    server = None
+    redis_url = args.redis_url
+    if not redis_url:
+        server = await asyncio.start_server(RespStandIn().handle, "127.0.0.1", 0)
+        redis_url = f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sqlite_path = os.path.join(workdir, "bench.sqlite3")
+        mmap_path = os.path.join(workdir, "bench.mmap")
+        print(f"entries={entries}")
+        await run_case(
+            "memory", create_cache_backend("memory", "bench", entries), entries
+        )
+        await run_case(
+            "sqlite",
+            create_cache_backend("sqlite", "bench", entries, sqlite_path),
+            entries,
+        )
+        await run_case(
+            "mmap", create_cache_backend("mmap", "bench", entries, mmap_path), entries
+        )
+        await run_case(
+            "redis",
+            create_cache_backend("redis", "bench", entries, url=redis_url),
+            entries,
+        )
+        await check_shared("sqlite", sqlite_path, entries)
+        await check_shared("mmap", mmap_path, entries)
+
+    if server is not None:
+        server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
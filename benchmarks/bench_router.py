@@ -0,0 +1,57 @@
+"""
+分享链接路由: 原来的 逐个来源 / 逐个域名做子串匹配 与 utils.host_router 按 host 查表 的耗时对比
+
+样例链接见 tests/share_urls.py, 路由结果的校验见 tests/test_host_router.py, 这里只统计提取链接和路由的平均耗时
+
+运行: python -m benchmarks.bench_router [--rounds 20000]
+"""
+
+import argparse
+import time
+from typing import Callable, List, Optional
+
+from parser import VideoSource, source_router, video_source_info_mapping
+from tests.share_urls import SAMPLE_URLS
+from utils import extract_url
+
+
+# 原来的域名配置: 绿洲为 weibo.cn
+LEGACY_DOMAINS = {VideoSource.LvZhou: ["weibo.cn"], VideoSource.WeiBo: ["weibo.com"]}
+
+
+def linear_scan(share_url: str) -> Optional[VideoSource]:
+    """
+    原来 parse_video_share_url 中的路由方式
+    """
+    for source, source_info in video_source_info_mapping.items():
+        for domain in LEGACY_DOMAINS.get(source, source_info["domain_list"]):
+            if domain in share_url:
+                return source
+    return None
+
+
+def per_call(func: Callable[[str], object], inputs: List[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in inputs:
+            func(item)
+    return (time.perf_counter() - start) / rounds / len(inputs) * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rounds", type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    print(f"{len(SAMPLE_URLS)} 条样例链接")
+    texts = [text for text, _ in SAMPLE_URLS]
+    urls = [extract_url(text) for text in texts]
+    extract_us = per_call(extract_url, texts, args.rounds)
+    linear_us = per_call(linear_scan, urls, args.rounds)
+    router_us = per_call(source_router.match, urls, args.rounds)
+    print(f"提取链接 {extract_us:.2f} us/次")
+    print(f"子串匹配 {linear_us:.2f} us/次, router {router_us:.2f} us/次")
+
+
+if __name__ == "__main__":
+    main()
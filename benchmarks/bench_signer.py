@@ -0,0 +1,115 @@
+"""
+a_bogus 签名: Python 实现与 signer.js 的一致性校验和速度对比
+
+一致性: 用固定种子生成一批 query / UA / 随机数 / 时间戳, 在 Node 中替换 Math.random 和 Date.now
+后执行 signer.js 的 get_sign, 与 utils.a_bogus.generate_a_bogus 的结果逐个比较, 不一致时退出码为 1
+速度: 分别统计进程内 Python、Node 常驻进程池、execjs 每秒签名次数
+
+运行: python -m benchmarks.bench_signer [--fixtures 200] [--seconds 2]
+需要安装 node
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from parser.douyin import signer_pool
+from tests.signer_fixtures import (
+    FIXTURE_RUNNER_JS,
+    PC_UA,
+    QUERY,
+    SIGNER_JS,
+    make_fixtures,
+)
+from utils import a_bogus
+
+
+def check_equivalence(count: int) -> bool:
+    fixtures = make_fixtures(count)
+    completed = subprocess.run(
+        ["node", "-e", FIXTURE_RUNNER_JS, SIGNER_JS],
+        input=json.dumps(fixtures),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    expected = json.loads(completed.stdout)
+    mismatches = 0
+    for fixture, js_sign in zip(fixtures, expected):
+        py_sign = a_bogus.generate_a_bogus(
+            fixture["query"],
+            fixture["user_agent"],
+            fixture["random"],
+            fixture["start_time"],
+            fixture["end_time"],
+        )
+        if py_sign != js_sign:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"不一致: {fixture}\n  js: {js_sign}\n  py: {py_sign}")
+    print(f"一致性: {count - mismatches}/{count} 与 signer.js 相同")
+    return mismatches == 0
+
+
+def report(name: str, count: int, elapsed: float) -> None:
+    print(f"{name:<12} {count / elapsed:>10.1f} sign/s  ({count} 次, {elapsed:.2f}s)")
+
+
+def bench_python(seconds: float) -> None:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        a_bogus.get_sign(QUERY, PC_UA)
+        count += 1
+    report("python", count, time.perf_counter() - start)
+
+
+async def bench_node_pool(seconds: float) -> None:
+    await signer_pool.start()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        await asyncio.gather(
+            *(signer_pool.call("get_sign", QUERY, PC_UA) for _ in range(32))
+        )
+        count += 32
+    report(f"node pool x{signer_pool.size}", count, time.perf_counter() - start)
+    await signer_pool.aclose()
+
+
+def bench_execjs(seconds: float) -> None:
+    try:
+        import execjs
+    except ImportError:
+        print("execjs       未安装, 跳过")
+        return
+    with open(SIGNER_JS, encoding="utf-8") as f:
+        ctx = execjs.compile(f.read())
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        ctx.call("get_sign", QUERY, PC_UA)
+        count += 1
+    report("execjs", count, time.perf_counter() - start)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--fixtures", type=int, default=200)
+    arg_parser.add_argument("--seconds", type=float, default=2.0)
+    args = arg_parser.parse_args()
+
+    equivalent = check_equivalence(args.fixtures)
+    print(f"SM3 实现: {a_bogus._sm3.__name__}")
+    bench_python(args.seconds)
+    asyncio.run(bench_node_pool(args.seconds))
+    bench_execjs(args.seconds)
+    if not equivalent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
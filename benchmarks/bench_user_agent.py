@@ -0,0 +1,60 @@
+"""
+每次请求获取 User-Agent 的耗时:
+原来的 fake_useragent.UserAgent(os=[...]).random 与 utils.user_agent 预加载池对比
+
+预加载池分别统计 random / round_robin / fixed 三种轮换方式, 以及指定 session 的固定 User-Agent
+
+运行: python -m benchmarks.bench_user_agent [--rounds 200]
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import fake_useragent
+
+from utils.user_agent import OS_FAMILIES, POLICIES, UserAgentPool
+
+
+def per_call(func: Callable[[], str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    pools = {policy: UserAgentPool(policy=policy) for policy in POLICIES}
+    build_ms = (time.perf_counter() - start) / len(pools) * 1000
+    print(f"预加载池构建 {build_ms:.1f} ms/次 (只在启动时执行一次), 单位: 微秒/次")
+
+    print(
+        f"{'系统':<10}{'条数':>6}{'fake_useragent':>16}"
+        + "".join(f"{policy:>14}" for policy in POLICIES)
+        + f"{'session':>12}"
+    )
+    for family in OS_FAMILIES:
+        baseline = per_call(
+            lambda: fake_useragent.UserAgent(os=[family]).random, args.rounds
+        )
+        timings = [
+            per_call(lambda: pool.get(family), args.rounds * 100)
+            for pool in pools.values()
+        ]
+        sticky = per_call(
+            lambda: pools["random"].get(family, session="post"), args.rounds * 100
+        )
+        print(
+            f"{family:<10}{pools['random'].size(family):>6}{baseline:>16.1f}"
+            + "".join(f"{t:>14.2f}" for t in timings)
+            + f"{sticky:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,78 @@
+import asyncio
+import dataclasses
 import os
-import re
+import uuid
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi_mcp import FastApiMCP
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # 导入解析逻辑
-from parser import VideoSource, parse_video_id, parse_video_share_url
-from parser.douyin import DouYin
-
-app = FastAPI()
+from parser import (
+    VideoSource,
+    get_source_hosts,
+    hot_refresh_stats,
+    parse_single_flight,
+    parse_video_id,
+    parse_video_share_url,
+    refresh_hot_results,
+)
+from parser.douyin import DouYin, signer_pool
+from parser.result_cache import HOT_REFRESH_TOP_N, negative_cache, result_cache
+from parser.warmup import (
+    WARMUP_CONCURRENCY,
+    WARMUP_MAX_CONCURRENCY,
+    WarmupProgress,
+    load_share_urls,
+    warm_up,
+)
+from utils import extract_url
+from utils.dns_cache import dns_cache
+from utils.hedging import hedge_policy
+from utils.host_limiter import host_limiter
+from utils.http_client import http_client_registry
+from utils.offload import extraction_offloader, loop_lag
+from utils.response_codec import encode
+from utils.short_link import short_link_cache
+
+# 启动时预热连接的热门平台, 逗号分隔的 VideoSource 值, 如: douyin,bilibili
+PREWARM_SOURCES = os.getenv("PARSE_VIDEO_PREWARM_SOURCES", "")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 进程级连接池: 启动时绑定事件循环, 关闭时释放所有 keep-alive 连接
+    await http_client_registry.open()
+    # 预解析所有平台的域名, 首个请求无需等待 DNS
+    await dns_cache.prefetch(get_source_hosts())
+    # 预热热门平台连接, 完成后 uvicorn 才会报告启动完成
+    prewarm_sources = [
+        VideoSource(item.strip()) for item in PREWARM_SOURCES.split(",") if item.strip()
+    ]
+    if prewarm_sources:
+        await http_client_registry.prewarm(get_source_hosts(prewarm_sources))
+    # 后台提前刷新热点解析结果
+    hot_refresh_task = None
+    if HOT_REFRESH_TOP_N > 0:
+        hot_refresh_task = asyncio.create_task(refresh_hot_results())
+    # 采样事件循环调度延迟, 在 /api/stats 中查看
+    loop_lag.start()
+    yield
+    loop_lag.stop()
+    if hot_refresh_task is not None:
+        hot_refresh_task.cancel()
+    extraction_offloader.shutdown()
+    await http_client_registry.aclose()
+    await result_cache.aclose()
+    await signer_pool.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 mcp = FastApiMCP(app)
 mcp.mount_http()
@@ -29,6 +90,19 @@ class CookieUpdateParams(BaseModel):
     password: str
     cookie: str
 
+
+class WarmupParams(BaseModel):
+    # 分享链接或分享文案, 每项一条
+    urls: List[str]
+    # 超过上限时返回 422, 避免单个请求对上游发起过多并发
+    concurrency: int = Field(WARMUP_CONCURRENCY, ge=1, le=WARMUP_MAX_CONCURRENCY)
+
+
+# 预解析任务, 只保留最近 WARMUP_MAX_JOBS 个
+WARMUP_MAX_JOBS = 20
+warmup_jobs: Dict[str, WarmupProgress] = {}
+warmup_tasks = set()
+
 # =========================================================
 # 2. 核心鉴权中间件 (The Guard)
 # =========================================================
@@ -86,36 +160,91 @@ async def update_cookie_api(params: CookieUpdateParams):
     DouYin.update_cookie(params.cookie)
     return {"code": 200, "msg": "Cookie 更新成功！"}
 
+
+def encoded_response(request: Request, payload: dict) -> Response:
+    """
+    解析结果直接编码为 bytes, 请求头 Accept: application/msgpack 时返回 MessagePack, 否则为 JSON
+    """
+    content, media_type = encode(payload, request.headers.get("accept"))
+    return Response(content=content, media_type=media_type)
+
+
 # --- 视频解析接口 (被中间件拦截，必须带 Header) ---
 @app.get("/video/share/url/parse")
-async def share_url_parse(url: str):
+async def share_url_parse(url: str, request: Request):
     try:
-        url_reg = re.compile(r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+")
-        match = url_reg.search(url)
-        video_share_url = match.group() if match else url
+        # 按链接的 host 分发到对应平台的解析器
+        video_share_url = extract_url(url)
+        video_info = await parse_video_share_url(video_share_url)
 
-        if "douyin" in video_share_url:
-            print(f"[Router] Detected Douyin URL...")
-            parser = DouYin()
-            video_info = await parser.parse_share_url(video_share_url)
-        else:
-            print(f"[Router] Detected other URL...")
-            video_info = await parse_video_share_url(video_share_url)
-
-        return {"code": 200, "msg": "解析成功", "data": video_info.__dict__}
+        return encoded_response(
+            request, {"code": 200, "msg": "解析成功", "data": video_info}
+        )
 
     except Exception as err:
         print(f"[API Error] {err}")
-        return {"code": 500, "msg": str(err)}
+        return encoded_response(request, {"code": 500, "msg": str(err)})
 
 # --- ID 解析接口 (被中间件拦截，必须带 Header) ---
 @app.get("/video/id/parse")
-async def video_id_parse(source: VideoSource, video_id: str):
+async def video_id_parse(source: VideoSource, video_id: str, request: Request):
     try:
         video_info = await parse_video_id(source, video_id)
-        return {"code": 200, "msg": "解析成功", "data": video_info.__dict__}
+        return encoded_response(
+            request, {"code": 200, "msg": "解析成功", "data": video_info}
+        )
     except Exception as err:
-        return {"code": 500, "msg": str(err)}
+        return encoded_response(request, {"code": 500, "msg": str(err)})
+
+
+# --- 缓存预热接口 (被中间件拦截，必须带 Header) ---
+@app.post("/api/warmup")
+async def warmup_api(params: WarmupParams):
+    share_urls = load_share_urls(params.urls)
+    job_id = uuid.uuid4().hex[:12]
+    progress = WarmupProgress(total=len(share_urls))
+    while len(warmup_jobs) >= WARMUP_MAX_JOBS:
+        warmup_jobs.pop(next(iter(warmup_jobs)))
+    warmup_jobs[job_id] = progress
+
+    # 后台执行, 通过 /api/warmup/{job_id} 查看进度
+    task = asyncio.create_task(warm_up(share_urls, params.concurrency, progress))
+    warmup_tasks.add(task)
+    task.add_done_callback(warmup_tasks.discard)
+    return {
+        "code": 200,
+        "msg": "预热任务已开始",
+        "data": {"job_id": job_id, **dataclasses.asdict(progress)},
+    }
+
+
+@app.get("/api/warmup/{job_id}")
+async def warmup_progress_api(job_id: str):
+    progress: Optional[WarmupProgress] = warmup_jobs.get(job_id)
+    if progress is None:
+        return JSONResponse(status_code=404, content={"code": 404, "msg": "任务不存在"})
+    return {"code": 200, "msg": "ok", "data": dataclasses.asdict(progress)}
+
+
+# --- 运行状态接口 (被中间件拦截，必须带 Header) ---
+@app.get("/api/stats")
+async def stats_api():
+    return {
+        "code": 200,
+        "msg": "ok",
+        "data": {
+            "host_limits": host_limiter.snapshot(),
+            "short_link_cache": short_link_cache.stats(),
+            "hedging": hedge_policy.snapshot(),
+            "parse_in_flight": parse_single_flight.in_flight(),
+            "result_cache": await result_cache.stats(),
+            "negative_cache": negative_cache.stats(),
+            "hot_refresh": hot_refresh_stats(),
+            "signer_pool": signer_pool.snapshot(),
+            "extraction_offload": extraction_offloader.snapshot(),
+            "loop_lag": loop_lag.snapshot(),
+        },
+    }
 
 mcp.setup_server()
 
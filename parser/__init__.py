@@ -1,5 +1,14 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from utils.host_router import HostRouter
+from utils.hotness import HotKeyTracker
+from utils.http_client import http_client_registry
+from utils.singleflight import SingleFlight
+
 from .acfun import AcFun
-from .base import VideoInfo, VideoSource
+from .base import PermanentParseError, VideoInfo, VideoSource
 from .bilibili import BiliBili
 from .doupai import DouPai
 from .douyin import DouYin
@@ -14,6 +23,14 @@ from .pipixia import PiPiXia
 from .quanmin import QuanMin
 from .quanminkge import QuanMinKGe
 from .redbook import RedBook
+from .result_cache import (
+    HOT_HALF_LIFE,
+    HOT_MIN_SCORE,
+    HOT_REFRESH_INTERVAL,
+    HOT_REFRESH_TOP_N,
+    negative_cache,
+    result_cache,
+)
 from .sixroom import SixRoom
 from .weibo import WeiBo
 from .weishi import WeiShi
@@ -22,18 +39,33 @@ from .xinpianchang import XinPianChang
 from .zuiyou import ZuiYou
 
 # 视频来源与解析器的映射关系
+# domain_list: 分享链接的域名, 同时匹配其子域名, 多个来源的域名重叠时最具体的优先
+# api_hosts: 解析器实际请求的上游 host, 用于 DNS 预解析和连接预热
+# http2_hosts: 开启 PARSE_VIDEO_HTTP2 后, 这些 API host 使用 HTTP/2 多路复用
+# cache_ttl: 媒体链接中没有过期时间时, 解析结果的缓存有效期(秒), 不配置则使用全局默认值
 video_source_info_mapping = {
     VideoSource.AcFun: {
         "domain_list": ["www.acfun.cn"],
         "parser": AcFun,
+        "api_hosts": ["www.acfun.cn"],
     },
     VideoSource.DouPai: {
         "domain_list": ["doupai.cc"],
         "parser": DouPai,
+        "api_hosts": ["v2.doupai.cc"],
     },
     VideoSource.DouYin: {
-        "domain_list": ["v.douyin.com", "www.iesdouyin.com", "www.douyin.com"],
+        "domain_list": [
+            "v.douyin.com",
+            "www.iesdouyin.com",
+            "www.douyin.com",
+            "douyin.com",
+            "iesdouyin.com",
+        ],
         "parser": DouYin,
+        "api_hosts": ["www.douyin.com", "www.iesdouyin.com"],
+        "http2_hosts": ["www.douyin.com"],
+        "cache_ttl": 3600,
     },
     VideoSource.HaoKan: {
         "domain_list": [
@@ -41,6 +73,7 @@ video_source_info_mapping = {
             "haokan.hao123.com",
         ],
         "parser": HaoKan,
+        "api_hosts": ["haokan.baidu.com"],
     },
     VideoSource.BiliBili: {
         "domain_list": [
@@ -49,66 +82,86 @@ video_source_info_mapping = {
             "m.bilibili.com",
         ],
         "parser": BiliBili,
+        "api_hosts": ["api.bilibili.com"],
+        "http2_hosts": ["api.bilibili.com"],
     },
     VideoSource.HuYa: {
         "domain_list": ["v.huya.com"],
         "parser": HuYa,
+        "api_hosts": ["liveapi.huya.com"],
+        "http2_hosts": ["liveapi.huya.com"],
     },
     VideoSource.KuaiShou: {
         "domain_list": ["v.kuaishou.com"],
         "parser": KuaiShou,
+        "cache_ttl": 1800,
+        "api_hosts": ["v.kuaishou.com"],
     },
     VideoSource.LiShiPin: {
         "domain_list": ["www.pearvideo.com"],
         "parser": LiShiPin,
+        "api_hosts": ["www.pearvideo.com"],
     },
     VideoSource.LvZhou: {
-        "domain_list": ["weibo.cn"],
+        "domain_list": ["oasis.weibo.cn"],
         "parser": LvZhou,
+        "api_hosts": ["m.oasis.weibo.cn"],
     },
     VideoSource.MeiPai: {
         "domain_list": ["meipai.com"],
         "parser": MeiPai,
+        "api_hosts": ["www.meipai.com"],
     },
     VideoSource.PiPiGaoXiao: {
         "domain_list": ["h5.pipigx.com"],
         "parser": PiPiGaoXiao,
+        "api_hosts": ["share.ippzone.com"],
     },
     VideoSource.PiPiXia: {
         "domain_list": ["h5.pipix.com"],
         "parser": PiPiXia,
+        "api_hosts": ["api.pipix.com"],
     },
     VideoSource.QuanMin: {
         "domain_list": ["xspshare.baidu.com"],
         "parser": QuanMin,
+        "api_hosts": ["quanmin.hao222.com"],
     },
     VideoSource.QuanMinKGe: {
         "domain_list": ["kg.qq.com"],
         "parser": QuanMinKGe,
+        "api_hosts": ["kg.qq.com"],
     },
     VideoSource.SixRoom: {
         "domain_list": ["6.cn"],
         "parser": SixRoom,
+        "api_hosts": ["v.6.cn"],
     },
     VideoSource.WeiBo: {
-        "domain_list": ["weibo.com"],
+        "domain_list": ["weibo.com", "m.weibo.cn"],
         "parser": WeiBo,
+        "api_hosts": ["m.weibo.cn", "h5.video.weibo.com"],
+        "http2_hosts": ["m.weibo.cn"],
     },
     VideoSource.WeiShi: {
         "domain_list": ["isee.weishi.qq.com"],
         "parser": WeiShi,
+        "api_hosts": ["h5.weishi.qq.com"],
     },
     VideoSource.XiGua: {
         "domain_list": ["v.ixigua.com", "www.ixigua.com"],
         "parser": XiGua,
+        "api_hosts": ["m.ixigua.com"],
     },
     VideoSource.XinPianChang: {
         "domain_list": ["xinpianchang.com"],
         "parser": XinPianChang,
+        "api_hosts": ["www.xinpianchang.com", "mod-api.xinpianchang.com"],
     },
     VideoSource.ZuiYou: {
         "domain_list": ["share.xiaochuankeji.cn"],
         "parser": ZuiYou,
+        "api_hosts": ["share.xiaochuankeji.cn"],
     },
     VideoSource.RedBook: {
         "domain_list": [
@@ -116,9 +169,143 @@ video_source_info_mapping = {
             "xhslink.com",
         ],
         "parser": RedBook,
+        "cache_ttl": 1800,
+        "api_hosts": ["www.xiaohongshu.com"],
     },
 }
 
+# 分享链接域名 -> 视频来源
+source_router: HostRouter[VideoSource] = HostRouter(
+    (domain, source)
+    for source, source_info in video_source_info_mapping.items()
+    for domain in source_info["domain_list"]
+)
+
+http_client_registry.set_http2_hosts(
+    host
+    for source_info in video_source_info_mapping.values()
+    for host in source_info.get("http2_hosts", [])
+)
+
+# 合并相同分享链接 / 视频ID 的并发解析请求
+parse_single_flight = SingleFlight()
+# 解析请求的热度, 最热的结果在过期前由后台任务提前刷新
+hot_results = HotKeyTracker(
+    half_life=HOT_HALF_LIFE,
+    max_tracked=max(1000, HOT_REFRESH_TOP_N * 10),
+    min_score=HOT_MIN_SCORE,
+)
+_refresh_tasks: Set[asyncio.Future] = set()
+_refresh_count = 0
+
+
+async def cached_parse(
+    source: VideoSource, key: str, parse: Callable[[], Awaitable[VideoInfo]]
+) -> VideoInfo:
+    """
+    先查解析结果缓存, 未命中时合并相同 key 的并发请求, 执行 parse 并写入缓存
+    永久失败(PermanentParseError)短时间内直接失败, 不再请求上游
+    :param source: 视频来源
+    :param key: 视频ID 或 分享链接
+    :param parse: 实际的解析函数
+    :return:
+    """
+    error_msg = negative_cache.get((source, key))
+    if error_msg is not None:
+        raise PermanentParseError(error_msg)
+
+    hot_results.hit((source, key), parse)
+    cached = await result_cache.get(source, key)
+    if cached is not None:
+        hot_results.set_due((source, key), cached.refresh_at)
+        # 临近过期的结果直接返回, 同时在后台重新解析 (stale-while-revalidate)
+        if cached.stale:
+            refresh_in_background(source, key, parse)
+        return cached.video_info
+
+    return await _parse_and_store(source, key, parse)
+
+
+async def _parse_and_store(
+    source: VideoSource, key: str, parse: Callable[[], Awaitable[VideoInfo]]
+) -> VideoInfo:
+    async def parse_and_store() -> VideoInfo:
+        try:
+            parsed_info = await parse()
+        except PermanentParseError as err:
+            negative_cache.set((source, key), str(err))
+            await result_cache.delete(source, key)
+            raise
+        refresh_at = await result_cache.set(
+            source, key, parsed_info, video_source_info_mapping[source].get("cache_ttl")
+        )
+        hot_results.set_due((source, key), refresh_at)
+        return parsed_info
+
+    return await parse_single_flight.do((source, key), parse_and_store)
+
+
+def refresh_in_background(
+    source: VideoSource, key: str, parse: Callable[[], Awaitable[VideoInfo]]
+) -> None:
+    """
+    后台重新解析并更新缓存, 相同 key 正在解析时不会重复发起
+    """
+    global _refresh_count
+    if (source, key) in parse_single_flight:
+        return
+    _refresh_count += 1
+    task = asyncio.ensure_future(_parse_and_store(source, key, parse))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_on_refresh_done)
+
+
+def _on_refresh_done(task: asyncio.Future) -> None:
+    _refresh_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[HotRefresh] 后台刷新失败: {task.exception()!r}")
+
+
+async def refresh_hot_results(
+    top_n: int = HOT_REFRESH_TOP_N, interval: float = HOT_REFRESH_INTERVAL
+) -> None:
+    """
+    定期检查最热的 top_n 条解析结果, 在下次检查前会变为 stale 的提前刷新
+    在应用启动时作为后台任务运行
+    """
+    while True:
+        await asyncio.sleep(interval)
+        deadline = time.time() + interval
+        for (source, key), parse, due_at in hot_results.top(top_n):
+            if due_at is not None and due_at <= deadline:
+                refresh_in_background(source, key, parse)
+
+
+def hot_refresh_stats() -> Dict[str, int]:
+    return {
+        "tracked": len(hot_results),
+        "refreshing": len(_refresh_tasks),
+        "refreshes": _refresh_count,
+    }
+
+
+def get_source_hosts(sources: Optional[Iterable[VideoSource]] = None) -> List[str]:
+    """
+    获取视频来源对应的全部 host (分享链接域名 + 解析器请求的 API host)
+    :param sources: 视频来源, 为空时返回全部来源
+    :return:
+    """
+    if sources is None:
+        sources = video_source_info_mapping.keys()
+
+    hosts = []
+    for source in sources:
+        source_info = video_source_info_mapping[source]
+        for host in source_info["domain_list"] + source_info.get("api_hosts", []):
+            if host not in hosts:
+                hosts.append(host)
+    return hosts
+
 
 async def parse_video_share_url(share_url: str) -> VideoInfo:
     """
@@ -126,24 +313,17 @@ async def parse_video_share_url(share_url: str) -> VideoInfo:
     :param share_url: 视频分享链接
     :return:
     """
-    source = ""
-    for item_source, item_source_info in video_source_info_mapping.items():
-        for item_url_domain in item_source_info["domain_list"]:
-            if item_url_domain in share_url:
-                source = item_source
-                break
-        if source:
-            break
-
-    if not source:
+    source = source_router.match(share_url)
+    if source is None:
         raise ValueError(f"share url [{share_url}] does not have source config")
 
     url_parser = video_source_info_mapping[source]["parser"]
     if not url_parser:
         raise ValueError(f"source {source} has no video parser")
 
-    _obj = url_parser()
-    video_info = await _obj.parse_share_url(share_url)
+    video_info = await cached_parse(
+        source, share_url, lambda: url_parser().parse_share_url(share_url)
+    )
 
     return video_info
 
@@ -162,7 +342,8 @@ async def parse_video_id(source: VideoSource, video_id: str) -> VideoInfo:
     if not id_parser:
         raise ValueError(f"source {source} has no video parser")
 
-    _obj = id_parser()
-    video_info = await _obj.parse_video_id(video_id)
+    video_info = await cached_parse(
+        source, video_id, lambda: id_parser().parse_video_id(video_id)
+    )
 
     return video_info
@@ -1,8 +1,8 @@
-import json
-import re
+from typing import Tuple
 
-import httpx
-from parsel import Selector
+from utils import embedded_state
+from utils.html_fields import HtmlFields
+from utils.offload import extraction_offloader
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -12,40 +12,53 @@ class AcFun(BaseParser):
     A站：视频地址是m3u8, 可以使用网站 https://tools.thatwind.com/tool/m3u8downloader 下载
     """
 
-    async def parse_share_url(self, share_url: str) -> VideoInfo:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(share_url, headers=self.get_default_headers())
-            response.raise_for_status()
+    # 页面中 videoInfo / playInfo 的标记
+    VIDEO_INFO_MARKER = b"var videoInfo ="
+    PLAY_INFO_MARKER = b"var playInfo ="
 
-        re_video_pattern = r"var videoInfo =\s(.*?);"
-        re_video_result = re.search(re_video_pattern, response.text)
-        if not re_video_result or len(re_video_result.groups()) < 1:
-            raise Exception("failed to parse video JSON info from HTML")
+    # up-info 节点中的作者信息
+    AUTHOR_FIELDS = HtmlFields(
+        {
+            "uid": "div.up-info > a.info-item1::attr(href)",
+            "name": "div.up-info span.up-name::text",
+            "avatar": "div.up-info span.up-avatar > img::attr(src)",
+        }
+    )
 
-        video_text = re_video_result.group(1).strip()
-        video_data = json.loads(video_text)
+    @staticmethod
+    def _extract_page(html: bytes) -> Tuple[dict, str]:
+        """
+        提取 videoInfo 和播放地址, 页面较大时在执行器中运行, 见 utils.offload
+        """
+        # 标题等字段中可能包含 ;, 按括号匹配截取整个对象
+        video_data = embedded_state.extract_state(html, AcFun.VIDEO_INFO_MARKER)
 
         # 解析视频播放地址
-        re_play_info_pattern = r"var playInfo =\s(.*?);"
-        re_play_info_result = re.search(re_play_info_pattern, response.text)
-        if not re_play_info_result or len(re_play_info_result.groups()) < 1:
-            raise Exception("failed to parse play info JSON info from HTML")
-
-        play_info_text = re_play_info_result.group(1).strip()
-        play_info_data = json.loads(play_info_text)
-
-        # 解析用户信息
-        sel = Selector(response.text)
-        uid = (
-            sel.css("div.up-info > a.info-item1::attr(href)")
-            .get(default="")
-            .replace("/upPage/", "")
+        play_url = embedded_state.extract_state(
+            html, AcFun.PLAY_INFO_MARKER, ("streams", 0, "playUrls", 0)
         )
-        name = sel.css("div.up-info span.up-name::text").get(default="")
-        avatar = sel.css("div.up-info span.up-avatar > img::attr(src)").get(default="")
+        return video_data, play_url
+
+    async def parse_share_url(self, share_url: str) -> VideoInfo:
+        # 作者信息在读取页面时增量解析, 两段 <script> 读完且作者字段全部找到后停止
+        author_reader = self.AUTHOR_FIELDS.reader()
+        response, html = await self.fetch_page(
+            share_url,
+            [self.VIDEO_INFO_MARKER, self.PLAY_INFO_MARKER],
+            headers=self.get_default_headers(),
+            field_reader=author_reader,
+            follow_redirects=True,
+        )
+        response.raise_for_status()
+        author = author_reader.close()
+
+        video_data, play_url = await extraction_offloader.run(self._extract_page, html)
+        uid = (author["uid"] or "").replace("/upPage/", "")
+        name = author["name"] or ""
+        avatar = author["avatar"] or ""
 
         video_info = VideoInfo(
-            video_url=play_info_data["streams"][0]["playUrls"][0],
+            video_url=play_url,
             cover_url=video_data["cover"],
             title=video_data["title"],
             author=VideoAuthor(
@@ -1,9 +1,16 @@
 import dataclasses
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence, Tuple
 
-import fake_useragent
+import httpx
+
+from utils.host_limiter import host_limiter
+from utils.html_fields import HtmlFieldReader, HtmlFields
+from utils.http_client import http_client_registry
+from utils.page_stream import PAGE_MAX_BYTES, read_until_fields, read_until_scripts
+from utils.short_link import ShortLinkResolution, short_link_cache
+from utils.user_agent import user_agent_pool
 
 
 class VideoSource(Enum):
@@ -34,7 +41,14 @@ class VideoSource(Enum):
     RedBook = "redbook"  # 小红书
 
 
-@dataclasses.dataclass
+class PermanentParseError(Exception):
+    """
+    作品已删除 / 不可见 / 分享链接失效等, 重试也不会成功的解析失败
+    会被短时间缓存, 重复请求直接失败, 网络错误等临时失败不要使用
+    """
+
+
+@dataclasses.dataclass(slots=True)
 class VideoAuthor:
     """
     视频作者信息
@@ -50,7 +64,7 @@ class VideoAuthor:
     avatar: str = ""
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class ImgInfo:
     """
     图集图片信息
@@ -63,10 +77,11 @@ class ImgInfo:
     live_photo_url: str = ""
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class VideoInfo:
     """
     视频信息
+    与 ImgInfo / VideoAuthor 一样使用 __slots__, 没有 __dict__, 编码时使用 utils.fast_json.dumps
     """
 
     # 视频播放地址
@@ -92,9 +107,114 @@ class BaseParser(ABC):
     @staticmethod
     def get_default_headers() -> Dict[str, str]:
         return {
-            "User-Agent": fake_useragent.UserAgent(os=["ios"]).random,
+            "User-Agent": user_agent_pool.get("ios"),
         }
 
+    @staticmethod
+    def get_client(**kwargs) -> httpx.AsyncClient:
+        """
+        获取复用进程级连接池的 httpx.AsyncClient, 参数与 httpx.AsyncClient 一致
+        :param kwargs: httpx.AsyncClient 参数
+        :return:
+        """
+        return http_client_registry.client(**kwargs)
+
+    async def resolve_share_url(
+        self,
+        share_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        follow_redirects: bool = False,
+        **client_kwargs,
+    ) -> ShortLinkResolution:
+        """
+        解析短链接的跳转地址, 结果会被缓存, 重复的分享链接无需再次请求
+        :param share_url: 短链接
+        :param headers: 请求头
+        :param follow_redirects: 是否跟随全部跳转, 是则返回最终地址, 否则返回 location 头
+        :param client_kwargs: httpx.AsyncClient 其他参数
+        :return:
+        """
+        resolution = short_link_cache.get(share_url)
+        if resolution is not None:
+            return resolution
+
+        async with self.get_client(
+            follow_redirects=follow_redirects, **client_kwargs
+        ) as client:
+            response = await client.get(share_url, headers=headers)
+
+        if follow_redirects:
+            location = str(response.url) if response.is_success else ""
+        else:
+            location = response.headers.get("location", "")
+        resolution = ShortLinkResolution(
+            location=location,
+            headers=list(response.headers.multi_items()),
+            cookies=dict(response.cookies),
+        )
+        if location:
+            short_link_cache.set(share_url, resolution)
+        return resolution
+
+    async def fetch_page(
+        self,
+        url: str,
+        markers: Sequence[bytes],
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: int = PAGE_MAX_BYTES,
+        field_reader: Optional[HtmlFieldReader] = None,
+        **client_kwargs,
+    ) -> Tuple[httpx.Response, bytes]:
+        """
+        流式获取 HTML 页面, 所有 marker 所在的 <script> 读取完毕即停止, 不下载整个页面
+        返回未解码的 bytes, 内嵌数据使用 utils.embedded_state 直接从 bytes 中提取
+        :param url: 页面地址
+        :param markers: 需要的内嵌数据标记, 如 b"window._ROUTER_DATA"
+        :param headers: 请求头
+        :param max_bytes: 最大读取字节数
+        :param field_reader: 同时需要的页面字段, 全部找到后才停止, 见 HtmlFields.reader
+        :param client_kwargs: httpx.AsyncClient 其他参数
+        :return: 响应(响应体已关闭) 和 已读取部分的内容
+        """
+        async with self.get_client(**client_kwargs) as client:
+            async with client.stream("GET", url, headers=headers) as response:
+                content = await read_until_scripts(
+                    response, markers, max_bytes, field_reader
+                )
+        return response, content
+
+    async def fetch_fields(
+        self,
+        url: str,
+        fields: HtmlFields,
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: int = PAGE_MAX_BYTES,
+        **client_kwargs,
+    ) -> Tuple[httpx.Response, Dict[str, Optional[str]]]:
+        """
+        流式获取 HTML 页面并按 CSS 选择器提取字段, 全部找到即停止, 不下载和解析整个页面
+        :param url: 页面地址
+        :param fields: 需要提取的字段, 见 utils.html_fields
+        :param headers: 请求头
+        :param max_bytes: 最大读取字节数
+        :param client_kwargs: httpx.AsyncClient 其他参数
+        :return: 响应(响应体已关闭) 和 字段名 -> 值, 未找到的字段为 None
+        """
+        async with self.get_client(**client_kwargs) as client:
+            async with client.stream("GET", url, headers=headers) as response:
+                response.raise_for_status()
+                values = await read_until_fields(response, fields, max_bytes)
+        return response, values
+
+    @staticmethod
+    def report_throttled(url: str) -> None:
+        """
+        上报平台风控信号(如接口返回空数据), 降低该 host 的并发上限
+        :param url: 触发风控的请求地址
+        :return:
+        """
+        host_limiter.on_throttle(httpx.URL(url).host)
+
     @abstractmethod
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         """
@@ -1,9 +1,8 @@
-import json
 from urllib.parse import urlparse
 
-import httpx
+from utils import fast_json
 
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .base import BaseParser, PermanentParseError, VideoAuthor, VideoInfo
 
 
 class BiliBili(BaseParser):
@@ -19,6 +18,15 @@ class BiliBili(BaseParser):
         "(KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36"
     )
 
+    # 风控 / 限流的错误码: -412 请求被拦截, -352 风控校验失败,
+    # -509 请求过于频繁, -799 请求过于频繁(稍后再试)
+    THROTTLE_CODES = (-412, -352, -509, -799)
+
+    # 视频本身不可用的错误码, 按永久失败缓存: -400 请求错误(BV 号无效), -403 权限不足,
+    # -404 视频不存在, 62002 稿件不可见, 62004 稿件审核中, 62012 仅 UP 主自己可见
+    # 其余非 0 错误码(如 -500 / -503 服务端错误)可能是临时的, 按普通错误处理
+    PERMANENT_CODES = (-400, -403, -404, 62002, 62004, 62012)
+
     def get_default_headers(self) -> dict:
         headers = {
             "User-Agent": self.USER_AGENT,
@@ -37,9 +45,11 @@ class BiliBili(BaseParser):
         view_api_url = f"https://api.bilibili.com/x/web-interface/view?bvid={video_id}"
         view_resp_data = await self._send_bili_request(view_api_url)
 
-        view_resp = json.loads(view_resp_data)
-        if view_resp.get("code") != 0 or not view_resp.get("data", {}).get("pages"):
-            raise ValueError(f"无法获取该视频: {view_resp.get('message', '未知错误')}")
+        view_resp = fast_json.loads(view_resp_data)
+        self._check_throttled(view_api_url, view_resp)
+        self._check_code(view_resp, "无法获取该视频")
+        if not view_resp.get("data", {}).get("pages"):
+            raise PermanentParseError("无法获取该视频: 没有分P信息")
 
         data = view_resp["data"]
         first_page_cid = data["pages"][0]["cid"]
@@ -52,12 +62,9 @@ class BiliBili(BaseParser):
         )
         play_resp_data = await self._send_bili_request(play_api_url)
 
-        play_resp = json.loads(play_resp_data)
-        if play_resp.get("code") != 0:
-            raise ValueError(
-                f"B站API返回错误: {play_resp.get('message', '未知错误')} "
-                f"(code: {play_resp.get('code')})"
-            )
+        play_resp = fast_json.loads(play_resp_data)
+        self._check_throttled(play_api_url, play_resp)
+        self._check_code(play_resp, "B站API返回错误")
 
         # 提取视频URL
         video_url = ""
@@ -95,12 +102,12 @@ class BiliBili(BaseParser):
 
         if "b23.tv" in parsed_url.netloc:
             # 处理短链接
-            async with httpx.AsyncClient(follow_redirects=False) as client:
-                resp = await client.get(raw_url, headers=self.get_default_headers())
-                location = resp.headers.get("location")
-                if not location:
-                    raise ValueError("无法从b23.tv获取重定向链接")
-                return await self._get_bvid_from_url(location)
+            resolution = await self.resolve_share_url(
+                raw_url, headers=self.get_default_headers()
+            )
+            if not resolution.location:
+                raise ValueError("无法从b23.tv获取重定向链接")
+            return await self._get_bvid_from_url(resolution.location)
 
         if "bilibili.com" in parsed_url.netloc:
             path = parsed_url.path.strip("/")
@@ -111,10 +118,30 @@ class BiliBili(BaseParser):
 
         raise ValueError("不是有效的B站视频链接")
 
-    async def _send_bili_request(self, api_url: str) -> str:
+    def _check_throttled(self, api_url: str, resp: dict) -> None:
+        """
+        THROTTLE_CODES 是风控 / 限流, 不代表视频不存在, 上报限流后按普通错误抛出
+        """
+        if (code := resp.get("code")) in self.THROTTLE_CODES:
+            self.report_throttled(api_url)
+            raise ValueError(f"B站API请求被风控拦截 (code: {code})")
+
+    def _check_code(self, resp: dict, message: str) -> None:
+        """
+        code 非 0 时抛出异常, 只有 PERMANENT_CODES 按永久失败处理
+        """
+        code = resp.get("code")
+        if code == 0:
+            return
+        error = f"{message}: {resp.get('message', '未知错误')} (code: {code})"
+        if code in self.PERMANENT_CODES:
+            raise PermanentParseError(error)
+        raise ValueError(error)
+
+    async def _send_bili_request(self, api_url: str) -> bytes:
         """发送B站API请求"""
-        async with httpx.AsyncClient() as client:
+        async with self.get_client() as client:
             response = await client.get(api_url, headers=self.get_default_headers())
             if response.status_code != 200:
                 raise ValueError(f"HTTP请求失败, 状态码: {response.status_code}")
-            return response.text
+            return response.content
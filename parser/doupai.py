@@ -1,6 +1,4 @@
-import httpx
-
-from utils import get_val_from_url_by_query_key
+from utils import fast_json, get_val_from_url_by_query_key
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -16,11 +14,11 @@ class DouPai(BaseParser):
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         req_url = f"https://v2.doupai.cc/topic/{video_id}.json"
-        async with httpx.AsyncClient() as client:
+        async with self.get_client() as client:
             response = await client.get(req_url, headers=self.get_default_headers())
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         data = json_data["data"]
 
         video_info = VideoInfo(
@@ -1,14 +1,40 @@
-import json
 import re
 import os
-import execjs
 from urllib.parse import parse_qs, urlparse, urlencode
-import httpx
+from utils import a_bogus, embedded_state, fast_json, json_path
+from utils.node_pool import NodeWorkerError, NodeWorkerPool
+from utils.offload import extraction_offloader
+from utils.race import race_with_fallback
 from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
 
 # 全局变量存储 Cookie
 GLOBAL_DY_COOKIE = ''
 
+# 页面中 _ROUTER_DATA 的标记
+ROUTER_DATA_MARKER = b"window._ROUTER_DATA"
+
+# a_bogus 签名方式: node (signer.js 常驻进程池) / python (进程内实现, 不依赖 Node)
+DOUYIN_SIGNER = os.getenv("PARSE_VIDEO_DOUYIN_SIGNER", "node")
+
+
+def _find_signer_js():
+    """寻找 signer.js"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = [
+        os.path.join(current_dir, "..", "signer.js"), 
+        os.path.join(current_dir, "signer.js"),
+        "signer.js"
+    ]
+    for p in paths:
+        if os.path.exists(p):
+            return os.path.abspath(p)
+    print("[WARN] signer.js 未找到，Mode A 将不可用")
+    return "signer.js"
+
+
+# 签名进程池: 常驻 Node 进程只加载一次 signer.js, 签名请求通过管道异步提交
+signer_pool = NodeWorkerPool(_find_signer_js())
+
 class DouYin(BaseParser):
     """
     抖音双模解析器
@@ -16,38 +42,21 @@ class DouYin(BaseParser):
     Mode B: 原版 HTML解析 (兜底方案，无需Cookie，可能无实况)
     """
 
-    def __init__(self):
-        super().__init__()
-        self.js_ctx = self._load_js()
-
     @classmethod
     def update_cookie(cls, new_cookie):
         global GLOBAL_DY_COOKIE
         GLOBAL_DY_COOKIE = new_cookie.strip()
         print(f"[Config] Cookie 已更新")
 
-    def _load_js(self):
-        """加载签名算法"""
+    async def _sign(self, query, ua):
+        # 两种签名方式失败时都记录日志并返回空签名, 由 Mode A 按请求失败处理
         try:
-            # 寻找 signer.js
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            paths = [
-                os.path.join(current_dir, "..", "signer.js"), 
-                os.path.join(current_dir, "signer.js"),
-                "signer.js"
-            ]
-            for p in paths:
-                if os.path.exists(p):
-                    with open(p, "r", encoding="utf-8") as f:
-                        return execjs.compile(f.read())
-            print("[WARN] signer.js 未找到，Mode A 将不可用")
-            return None
-        except: return None
-
-    def _sign(self, query, ua):
-        if not self.js_ctx: return ""
-        try: return self.js_ctx.call("get_sign", query, ua)
-        except: return ""
+            if DOUYIN_SIGNER == "python":
+                return a_bogus.get_sign(query, ua)
+            return await signer_pool.call("get_sign", query, ua)
+        except (NodeWorkerError, ValueError, TypeError, IndexError) as e:
+            print(f"[WARN] a_bogus 签名失败: {e!r}")
+            return ""
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         # 1. 统一提取 Video ID
@@ -57,19 +66,34 @@ class DouYin(BaseParser):
         
         print(f"[Main] Target ID: {video_id}")
 
-        # 2. 尝试 Mode A (API 强力模式)
+        # 2. 有 Cookie 时 Mode A (API 强力模式) 与 Mode B (原版 HTML 兜底) 赛跑:
+        #    Mode A 在 FALLBACK_DELAY 内未成功即并发启动 Mode B, 取先成功的结果
         if GLOBAL_DY_COOKIE:
-            try:
-                print("[Main] 正在尝试 Mode A (API解析)...")
-                return await self._parse_mode_a(video_id)
-            except Exception as e:
-                print(f"[Main] Mode A 失败 ({e})，正在切换到 Mode B...")
-        else:
-            print("[Main] 未设置 Cookie，直接使用 Mode B...")
+            print("[Main] 正在尝试 Mode A (API解析)...")
+            return await race_with_fallback(
+                lambda: self._try_mode_a(video_id),
+                lambda: self._parse_mode_b(video_id),
+                accept_fallback=self._is_complete_mode_b_result,
+            )
 
-        # 3. 尝试 Mode B (原版 HTML 兜底)
+        # 3. 未设置 Cookie, 直接使用 Mode B
+        print("[Main] 未设置 Cookie，直接使用 Mode B...")
         return await self._parse_mode_b(video_id)
 
+    async def _try_mode_a(self, video_id):
+        try:
+            return await self._parse_mode_a(video_id)
+        except Exception as e:
+            print(f"[Main] Mode A 失败 ({e})，使用 Mode B 结果...")
+            raise
+
+    @staticmethod
+    def _is_complete_mode_b_result(video_info):
+        # 图集的实况数据以 Mode A 为准: Mode B 图集没有实况地址时继续等待 Mode A
+        if not video_info.images:
+            return True
+        return any(img.live_photo_url for img in video_info.images)
+
     # =================================================================
     # 工具：提取 ID
     # =================================================================
@@ -81,9 +105,8 @@ class DouYin(BaseParser):
 
             # 否则跟随跳转 (v.douyin.com)
             headers = { "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1" }
-            async with httpx.AsyncClient(follow_redirects=True, timeout=10.0, headers=headers) as client:
-                resp = await client.get(url)
-                final_url = str(resp.url)
+            resolution = await self.resolve_share_url(url, headers=headers, follow_redirects=True, timeout=10.0)
+            final_url = resolution.location
             
             match = re.search(r'/(?:video|note|slides)/(\d+)', final_url)
             return match.group(1) if match else ""
@@ -109,7 +132,7 @@ class DouYin(BaseParser):
         }
         
         query_str = urlencode(params)
-        abogus = self._sign(query_str, PC_UA)
+        abogus = await self._sign(query_str, PC_UA)
         final_url = f"{api_url}?{query_str}&a_bogus={abogus}"
         
         headers = {
@@ -119,18 +142,21 @@ class DouYin(BaseParser):
             "Accept": "application/json"
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with self.get_client(timeout=10.0) as client:
             resp = await client.get(final_url, headers=headers)
             # 检查响应
             if not resp.text or resp.status_code != 200:
                 raise ValueError("API Network Error")
             try:
-                data = resp.json()
+                data = fast_json.loads(resp.content)
             except:
                 raise ValueError("API returned non-JSON")
 
         detail = data.get("aweme_detail")
-        if not detail: raise ValueError("Empty detail")
+        if not detail:
+            # 空 aweme_detail 通常是风控信号, 降低该接口并发
+            self.report_throttled(api_url)
+            raise ValueError("Empty detail")
 
         # 提取数据
         images = []
@@ -191,45 +217,27 @@ class DouYin(BaseParser):
              "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 13_2_3 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/13.0.3 Mobile/15E148 Safari/604.1"
         }
         
-        async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
-            response = await client.get(req_url, headers=headers)
-            html = response.text
-
-        # 3. 正则提取 (严格使用原版 regex)
-        pattern = re.compile(
-            pattern=r"window\._ROUTER_DATA\s*=\s*(.*?)</script>",
-            flags=re.DOTALL,
+        _, html = await self.fetch_page(
+            req_url,
+            [ROUTER_DATA_MARKER],
+            headers=headers,
+            follow_redirects=True,
+            timeout=15.0,
         )
-        find_res = pattern.search(html)
 
-        if not find_res or not find_res.group(1):
-            raise ValueError("Mode B Failed: 无法从 HTML 提取 _ROUTER_DATA")
-
-        json_data = json.loads(find_res.group(1).strip())
-
-        # 4. 解析 loaderData (严格原版逻辑)
-        data = None
-        if isinstance(json_data, dict) and "loaderData" in json_data:
-            # 原版逻辑：检查 loaderData 里的 key
-            original_video_info = None
-            
-            # 模糊匹配寻找 videoInfoRes
-            for key, val in json_data["loaderData"].items():
-                if isinstance(val, dict) and "videoInfoRes" in val:
-                    original_video_info = val["videoInfoRes"]
-                    break
-            
-            if not original_video_info:
-                raise ValueError("Mode B Failed: loaderData 中未找到 videoInfoRes")
-
-            if len(original_video_info["item_list"]) == 0:
-                 raise ValueError("Mode B Failed: item_list 为空")
-
-            data = original_video_info["item_list"][0]
-        else:
-            raise ValueError("Mode B Failed: 未知的数据结构")
+        # 3. 只解码 _ROUTER_DATA 中 loaderData 第一个 videoInfoRes 的 item_list[0], 其余数据只扫描不解码
+        #    页面较大时在执行器中扫描, 不阻塞事件循环
+        data = await extraction_offloader.run(
+            embedded_state.extract_state, html, ROUTER_DATA_MARKER,
+            ("loaderData", json_path.WILDCARD, "videoInfoRes", "item_list", 0),
+            default=None,
+        )
+        if data is None:
+            raise ValueError(
+                "Mode B Failed: loaderData 中未找到 videoInfoRes 或 item_list 为空"
+            )
 
-        # 5. 提取内容
+        # 4. 提取内容
         images = []
         if "images" in data and isinstance(data["images"], list):
             for img in data["images"]:
@@ -1,9 +1,9 @@
 import re
 
-import fake_useragent
-import httpx
+from utils import fast_json
+from utils.user_agent import user_agent_pool
 
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .base import BaseParser, PermanentParseError, VideoAuthor, VideoInfo
 
 
 class HuYa(BaseParser):
@@ -23,18 +23,18 @@ class HuYa(BaseParser):
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         req_url = f"https://liveapi.huya.com/moment/getMomentContent?videoId={video_id}"
-        async with httpx.AsyncClient() as client:
+        async with self.get_client() as client:
             headers = {
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": user_agent_pool.get("windows"),
                 "Referer": "https://v.huya.com/",
             }
             response = await client.get(req_url, headers=headers)
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         data = json_data["data"]["moment"]["videoInfo"]
         if data["uid"] == 0:
-            raise Exception("video not found")
+            raise PermanentParseError("video not found")
 
         video_info = VideoInfo(
             video_url=data["definitions"][0]["url"],
@@ -1,10 +1,8 @@
-import json
-import re
+from utils import embedded_state
+from utils.offload import extraction_offloader
+from utils.user_agent import user_agent_pool
 
-import fake_useragent
-import httpx
-
-from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
+from .base import BaseParser, ImgInfo, PermanentParseError, VideoAuthor, VideoInfo
 
 
 class KuaiShou(BaseParser):
@@ -12,41 +10,43 @@ class KuaiShou(BaseParser):
     快手
     """
 
+    # 触发风控验证的 result, 其余非 1 的 result 表示作品不存在或不可见
+    THROTTLE_RESULT_CODES = (400002,)
+
+    # 页面中 INIT_STATE 的标记
+    INIT_STATE_MARKER = b"window.INIT_STATE"
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        user_agent = fake_useragent.UserAgent(os=["ios"]).random
+        # 跳转结果(含 cookie)会被缓存, 同一分享链接固定使用同一个 User-Agent
+        user_agent = user_agent_pool.get("ios", session=share_url)
 
         # 获取跳转前的信息, 从中获取跳转url, cookie
-        async with httpx.AsyncClient(follow_redirects=False) as client:
-            share_response = await client.get(
-                share_url,
-                headers={
-                    "User-Agent": user_agent,
-                    "Referer": "https://v.kuaishou.com/",
-                },
-            )
-
-        location_url = share_response.headers.get("location", "")
+        share_resolution = await self.resolve_share_url(
+            share_url,
+            headers={
+                "User-Agent": user_agent,
+                "Referer": "https://v.kuaishou.com/",
+            },
+        )
+
+        location_url = share_resolution.location
         if len(location_url) <= 0:
             raise Exception("failed to get location url from share url")
 
         # /fw/long-video/ 返回结果不一样, 统一替换为 /fw/photo/ 请求
         location_url = location_url.replace("/fw/long-video/", "/fw/photo/")
 
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(
-                location_url,
-                headers=share_response.headers,
-                cookies=share_response.cookies,
-            )
-
-        re_pattern = r"window.INIT_STATE\s*=\s*(.*?)</script>"
-        re_result = re.search(re_pattern, response.text)
-
-        if not re_result or len(re_result.groups()) < 1:
-            raise Exception("failed to parse video JSON info from HTML")
+        response, html = await self.fetch_page(
+            location_url,
+            [self.INIT_STATE_MARKER],
+            headers=dict(share_resolution.headers),
+            cookies=share_resolution.cookies,
+            follow_redirects=True,
+        )
 
-        json_text = re_result.group(1).strip()
-        json_data = json.loads(json_text)
+        json_data = await extraction_offloader.run(
+            embedded_state.extract_state, html, self.INIT_STATE_MARKER
+        )
 
         photo_data = {}
         for json_item in json_data.values():
@@ -59,7 +59,10 @@ class KuaiShou(BaseParser):
 
         # 判断result状态
         if (result_code := photo_data["result"]) != 1:
-            raise Exception(f"获取作品信息失败:result={result_code}")
+            if result_code in self.THROTTLE_RESULT_CODES:
+                self.report_throttled(str(response.url))
+                raise Exception(f"获取作品信息失败:result={result_code}")
+            raise PermanentParseError(f"获取作品信息失败:result={result_code}")
 
         data = photo_data["photo"]
 
@@ -1,8 +1,8 @@
 import time
 from urllib.parse import urlparse
 
-import fake_useragent
-import httpx
+from utils import fast_json
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, VideoInfo
 
@@ -27,17 +27,17 @@ class LiShiPin(BaseParser):
             f"https://www.pearvideo.com/videoStatus.jsp?contId={video_id}&mrd={now}"
         )
 
-        async with httpx.AsyncClient() as client:
+        async with self.get_client() as client:
             headers = {
                 "Referer": f"https://www.pearvideo.com/detail_{video_id}",
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": user_agent_pool.get("windows"),
             }
             response = await client.get(req_url, headers=headers)
 
         if response.status_code != 200:
             raise Exception("failed to fetch data")
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
 
         # 获取 videoInfo 字段的值
         video_src_url = json_data["videoInfo"]["videos"]["srcUrl"]
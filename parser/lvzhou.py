@@ -1,7 +1,6 @@
 import re
 
-import httpx
-from parsel import Selector
+from utils.html_fields import HtmlFields
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -11,16 +10,25 @@ class LvZhou(BaseParser):
     绿洲
     """
 
-    async def parse_share_url(self, share_url: str) -> VideoInfo:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(share_url, headers=self.get_default_headers())
-            response.raise_for_status()
+    # 页面中需要的字段, 全部找到后不再读取剩余页面
+    PAGE_FIELDS = HtmlFields(
+        {
+            "video_url": "video::attr(src)",
+            "author_avatar": "a.avatar img::attr(src)",
+            "video_cover_style": "div.video-cover::attr(style)",
+            "title": "div.status-title::text",
+            "author_name": "div.nickname::text",
+        }
+    )
 
-        sel = Selector(response.text)
+    async def parse_share_url(self, share_url: str) -> VideoInfo:
+        _, fields = await self.fetch_fields(
+            share_url, self.PAGE_FIELDS, headers=self.get_default_headers()
+        )
 
-        video_url = sel.css("video::attr(src)").get()
-        author_avatar = sel.css("a.avatar img::attr(src)").get()
-        video_cover_style = sel.css("div.video-cover::attr(style)").get(default="")
+        video_url = fields["video_url"]
+        author_avatar = fields["author_avatar"]
+        video_cover_style = fields["video_cover_style"] or ""
 
         cover_url = ""
         if video_cover_style:
@@ -28,8 +36,8 @@ class LvZhou(BaseParser):
             if match:
                 cover_url = match.group(1)
 
-        title = sel.css("div.status-title::text").get()
-        author_name = sel.css("div.nickname::text").get()
+        title = fields["title"]
+        author_name = fields["author_name"]
 
         return VideoInfo(
             video_url=video_url,
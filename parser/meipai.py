@@ -1,9 +1,8 @@
 import base64
 from typing import Dict, List
 
-import fake_useragent
-import httpx
-from parsel import Selector
+from utils.html_fields import HtmlFields
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -13,28 +12,36 @@ class MeiPai(BaseParser):
     美拍
     """
 
+    # 页面中需要的字段, 全部找到后不再读取剩余页面
+    PAGE_FIELDS = HtmlFields(
+        {
+            "video_bs64": "#shareMediaBtn::attr(data-video)",
+            "cover_url": "#detailVideo img::attr(src)",
+            "title": ".detail-cover-title::text",
+            "author_href": ".detail-name a::attr(href)",
+            "author_name": ".detail-avatar::attr(alt)",
+            "author_avatar": ".detail-avatar::attr(src)",
+        }
+    )
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
-            }
-            response = await client.get(share_url, headers=headers)
-            response.raise_for_status()
+        headers = {
+            "User-Agent": user_agent_pool.get("windows"),
+        }
+        _, fields = await self.fetch_fields(
+            share_url, self.PAGE_FIELDS, headers=headers
+        )
 
-        sel = Selector(response.text)
-        video_bs64 = sel.css("#shareMediaBtn::attr(data-video)").get(default="")
-        video_url = self.parse_video_bs64(video_bs64)
+        video_url = self.parse_video_bs64(fields["video_bs64"] or "")
 
         video_info = VideoInfo(
             video_url=video_url,
-            cover_url=sel.css("#detailVideo img::attr(src)").get(default=""),
-            title=sel.css(".detail-cover-title::text").get(default="").strip(),
+            cover_url=fields["cover_url"] or "",
+            title=(fields["title"] or "").strip(),
             author=VideoAuthor(
-                uid=sel.css(".detail-name a::attr(href)")
-                .get(default="")
-                .split("/")[-1],
-                name=sel.css(".detail-avatar::attr(alt)").get(default=""),
-                avatar="https:" + sel.css(".detail-avatar::attr(src)").get(default=""),
+                uid=(fields["author_href"] or "").split("/")[-1],
+                name=fields["author_name"] or "",
+                avatar="https:" + (fields["author_avatar"] or ""),
             ),
         )
         return video_info
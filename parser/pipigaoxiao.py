@@ -1,7 +1,7 @@
 from urllib.parse import urlparse
 
-import fake_useragent
-import httpx
+from utils import fast_json
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, VideoInfo
 
@@ -22,18 +22,18 @@ class PiPiGaoXiao(BaseParser):
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         req_url = "https://share.ippzone.com/ppapi/share/fetch_content"
-        async with httpx.AsyncClient() as client:
+        async with self.get_client() as client:
             headers = {
                 "Referer": req_url,
                 "Content-Type": "text/plain;charset=UTF-8",
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": user_agent_pool.get("windows"),
             }
             # pid需要是数字，这里直接拼接json字符串，不用json.dumps
             post_content = '{"pid":' + video_id + ',"type":"post","mid":null}'
             response = await client.post(req_url, headers=headers, content=post_content)
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         # 接口返回错误
         if "msg" in json_data:
             raise Exception(json_data["msg"])
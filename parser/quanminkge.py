@@ -1,10 +1,5 @@
-import json
-import re
-
-import fake_useragent
-import httpx
-
-from utils import get_val_from_url_by_query_key
+from utils import embedded_state, get_val_from_url_by_query_key
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -14,28 +9,24 @@ class QuanMinKGe(BaseParser):
     全民K歌
     """
 
+    # 页面中 __DATA__ 的标记
+    DATA_MARKER = b"window.__DATA__"
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         video_id = get_val_from_url_by_query_key(share_url, "s")
         return await self.parse_video_id(video_id)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         req_url = f"https://kg.qq.com/node/play?s={video_id}"
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "User-Agent": fake_useragent.UserAgent(os="windows").random,
-            }
-            response = await client.get(req_url, headers=headers)
-            response.raise_for_status()
-
-        re_pattern = r"window.__DATA__ = (.*?); </script>"
-        re_result = re.search(re_pattern, response.text)
-
-        if not re_result or len(re_result.groups()) < 1:
-            raise Exception("failed to parse video JSON info from HTML")
-
-        json_text = re_result.group(1).strip()
-        json_data = json.loads(json_text)
-        data = json_data["detail"]
+        headers = {
+            "User-Agent": user_agent_pool.get("windows"),
+        }
+        response, html = await self.fetch_page(
+            req_url, [self.DATA_MARKER], headers=headers
+        )
+        response.raise_for_status()
+
+        data = embedded_state.extract_state(html, self.DATA_MARKER, ("detail",))
 
         video_info = VideoInfo(
             video_url=data["playurl_video"],
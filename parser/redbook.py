@@ -1,10 +1,10 @@
-import re
+from typing import Optional
 
-import fake_useragent
-import httpx
-import yaml
+from utils import embedded_state, js_literal
+from utils.offload import extraction_offloader
+from utils.user_agent import user_agent_pool
 
-from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
+from .base import BaseParser, ImgInfo, PermanentParseError, VideoAuthor, VideoInfo
 
 
 class RedBook(BaseParser):
@@ -12,30 +12,47 @@ class RedBook(BaseParser):
     小红书
     """
 
+    # 页面中 __INITIAL_STATE__ 的标记
+    INITIAL_STATE_MARKER = b"window.__INITIAL_STATE__"
+
+    @staticmethod
+    def _extract_note(html: bytes) -> Optional[dict]:
+        """
+        __INITIAL_STATE__ 包含整页数据, 当前笔记靠前时只解码当前笔记(见 embedded_state),
+        当前笔记 id 为 undefined 时返回 None
+        页面较大时在执行器中运行, 见 utils.offload
+        """
+        note_id = embedded_state.extract_state(
+            html,
+            RedBook.INITIAL_STATE_MARKER,
+            ("note", "currentNoteId"),
+            loads=js_literal.loads,
+        )
+        if note_id is None:
+            return None
+        return embedded_state.extract_state(
+            html,
+            RedBook.INITIAL_STATE_MARKER,
+            ("note", "noteDetailMap", note_id, "note"),
+            loads=js_literal.loads,
+        )
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+            "User-Agent": user_agent_pool.get("windows"),
         }
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(share_url, headers=headers)
-            response.raise_for_status()
-
-        pattern = re.compile(
-            pattern=r"window\.__INITIAL_STATE__\s*=\s*(.*?)</script>",
-            flags=re.DOTALL,
+        response, html = await self.fetch_page(
+            share_url,
+            [self.INITIAL_STATE_MARKER],
+            headers=headers,
+            follow_redirects=True,
         )
-        find_res = pattern.search(response.text)
-
-        if not find_res or not find_res.group(1):
-            raise ValueError("parse video json info from html fail")
-
-        json_data = yaml.safe_load(find_res.group(1))
+        response.raise_for_status()
 
-        note_id = json_data["note"]["currentNoteId"]
+        data = await extraction_offloader.run(self._extract_note, html)
         # 验证返回：小红书的分享链接有有效期，过期后会返回 undefined
-        if note_id == "undefined":
-            raise Exception("parse fail: note id in response is undefined")
-        data = json_data["note"]["noteDetailMap"][note_id]["note"]
+        if data is None:
+            raise PermanentParseError("parse fail: note id in response is undefined")
 
         # 视频地址
         video_url = ""
@@ -0,0 +1,228 @@
+import dataclasses
+import os
+import time
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlparse
+
+from utils import fast_json
+from utils.cache_backends import CacheBackend, create_cache_backend
+from utils.ttl_cache import TTLCache
+
+from .base import ImgInfo, VideoAuthor, VideoInfo, VideoSource
+
+# 解析结果缓存: 默认有效期(秒) / 最大条数
+RESULT_CACHE_TTL = float(os.getenv("PARSE_VIDEO_RESULT_CACHE_TTL", "600"))
+RESULT_CACHE_SIZE = int(os.getenv("PARSE_VIDEO_RESULT_CACHE_SIZE", "10000"))
+# 缓存后端: memory / sqlite / mmap / redis
+RESULT_CACHE_BACKEND = os.getenv("PARSE_VIDEO_RESULT_CACHE_BACKEND", "memory")
+# sqlite / mmap 缓存文件路径, 为空时使用默认路径
+RESULT_CACHE_PATH = os.getenv("PARSE_VIDEO_RESULT_CACHE_PATH", "")
+# redis 后端地址
+RESULT_CACHE_URL = os.getenv("PARSE_VIDEO_RESULT_CACHE_URL", "redis://127.0.0.1:6379/0")
+# mmap 后端每条结果最多占用的字节数
+RESULT_CACHE_SLOT_BYTES = int(os.getenv("PARSE_VIDEO_RESULT_CACHE_SLOT_BYTES", "16384"))
+# 距离媒体链接过期不足该时间(秒)时不再使用缓存
+RESULT_CACHE_EXPIRY_MARGIN = float(
+    os.getenv("PARSE_VIDEO_RESULT_CACHE_EXPIRY_MARGIN", "60")
+)
+
+# 缓存已过有效期的该比例后, 仍返回缓存结果, 同时在后台重新解析
+RESULT_CACHE_REFRESH_RATIO = float(
+    os.getenv("PARSE_VIDEO_RESULT_CACHE_REFRESH_RATIO", "0.8")
+)
+# 后台提前刷新最热的多少条解析结果, 0 表示关闭
+HOT_REFRESH_TOP_N = int(os.getenv("PARSE_VIDEO_HOT_REFRESH_TOP_N", "100"))
+# 检查热点结果是否需要刷新的间隔(秒)
+HOT_REFRESH_INTERVAL = float(os.getenv("PARSE_VIDEO_HOT_REFRESH_INTERVAL", "30"))
+# 热度衰减一半的时间(秒)
+HOT_HALF_LIFE = float(os.getenv("PARSE_VIDEO_HOT_HALF_LIFE", "600"))
+# 成为热点需要的最低热度(衰减后的访问次数), 只访问过一次的结果不会被后台刷新
+HOT_MIN_SCORE = float(os.getenv("PARSE_VIDEO_HOT_MIN_SCORE", "2"))
+
+# 永久失败(作品删除 / 不可见等)的缓存有效期(秒) / 最大条数
+NEGATIVE_CACHE_TTL = float(os.getenv("PARSE_VIDEO_NEGATIVE_CACHE_TTL", "60"))
+NEGATIVE_CACHE_SIZE = int(os.getenv("PARSE_VIDEO_NEGATIVE_CACHE_SIZE", "10000"))
+
+# 各平台 CDN 链接中表示过期时间戳的 query 参数
+_EXPIRY_QUERY_KEYS = ("x-expires", "expires", "deadline", "x-oss-expires")
+
+
+def get_media_url_expiry(url: str) -> Optional[float]:
+    """
+    从媒体链接的 query 参数中解析过期时间
+    :param url: 媒体链接
+    :return: 过期时间的 unix 时间戳(秒), 链接中没有过期参数时返回 None
+    """
+    if not url or "?" not in url:
+        return None
+    for key, value in parse_qsl(urlparse(url).query):
+        if key.lower() in _EXPIRY_QUERY_KEYS and value.isdigit():
+            expiry = float(value)
+            # 毫秒时间戳
+            if expiry > 1e12:
+                expiry /= 1000
+            return expiry
+    return None
+
+
+def get_video_info_expiry(video_info: VideoInfo) -> Optional[float]:
+    """
+    视频信息中所有媒体链接最早的过期时间
+    :param video_info: 视频信息
+    :return: 过期时间的 unix 时间戳(秒), 所有链接都没有过期参数时返回 None
+    """
+    expiries = [
+        expiry
+        for expiry in map(get_media_url_expiry, _iter_media_urls(video_info))
+        if expiry is not None
+    ]
+    return min(expiries) if expiries else None
+
+
+def _iter_media_urls(video_info: VideoInfo) -> Iterator[str]:
+    yield video_info.video_url
+    for img in video_info.images:
+        yield img.url
+        yield img.live_photo_url
+
+
+@dataclasses.dataclass
+class CachedResult:
+    video_info: VideoInfo
+
+    # 超过该时间(unix 时间戳)后结果仍然可用, 但需要重新解析
+    refresh_at: float
+
+    @property
+    def stale(self) -> bool:
+        return self.refresh_at <= time.time()
+
+
+def _dump_entry(
+    expiry: Optional[float], refresh_at: float, video_info: VideoInfo
+) -> bytes:
+    return fast_json.dumps(
+        {"expiry": expiry, "refresh_at": refresh_at, "info": video_info}
+    )
+
+
+def _load_entry(data: bytes) -> Dict[str, Any]:
+    entry = fast_json.loads(data)
+    info = entry["info"]
+    info["images"] = [ImgInfo(**img) for img in info["images"]]
+    info["author"] = VideoAuthor(**info["author"])
+    entry["info"] = VideoInfo(**info)
+    return entry
+
+
+class ResultCache:
+    """
+    解析结果缓存, key 为 (视频来源, 视频ID 或 分享链接)
+    有效期取平台默认值与媒体链接剩余有效期中较小的一个, 不会返回已过期的链接
+    有效期过去 refresh_ratio 后结果标记为 stale, 由调用方决定是否后台刷新
+    缓存后端出错时按未命中处理, 不影响解析
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        default_ttl: float = RESULT_CACHE_TTL,
+        expiry_margin: float = RESULT_CACHE_EXPIRY_MARGIN,
+        refresh_ratio: float = RESULT_CACHE_REFRESH_RATIO,
+    ):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.expiry_margin = expiry_margin
+        self.refresh_ratio = refresh_ratio
+        self.errors = 0
+
+    async def get(self, source: VideoSource, key: str) -> Optional[CachedResult]:
+        cache_key = f"{source.value}:{key}"
+        try:
+            data = await self.backend.get(cache_key)
+            if data is None:
+                return None
+            entry = _load_entry(data)
+            expiry = entry["expiry"]
+            # 按墙上时间再校验一次, 防止系统时间调整导致返回过期链接
+            if expiry is not None and expiry - self.expiry_margin <= time.time():
+                await self.backend.delete(cache_key)
+                return None
+        except Exception as err:
+            self._on_error("get", err)
+            return None
+        return CachedResult(entry["info"], entry.get("refresh_at") or float("inf"))
+
+    async def set(
+        self,
+        source: VideoSource,
+        key: str,
+        video_info: VideoInfo,
+        default_ttl: Optional[float] = None,
+    ) -> Optional[float]:
+        """
+        :param source: 视频来源
+        :param key: 视频ID 或 分享链接
+        :param video_info: 视频信息
+        :param default_ttl: 平台默认有效期, 为空时使用全局默认值
+        :return: 需要重新解析的时间(unix 时间戳), 没有缓存时返回 None
+        """
+        # 没有视频也没有图集的结果不缓存
+        if not video_info.video_url and not video_info.images:
+            return None
+
+        now = time.time()
+        ttl = self.default_ttl if default_ttl is None else default_ttl
+        expiry = get_video_info_expiry(video_info)
+        if expiry is not None:
+            ttl = min(ttl, expiry - self.expiry_margin - now)
+        if ttl <= 0:
+            return None
+        refresh_at = now + ttl * self.refresh_ratio
+        try:
+            await self.backend.set(
+                f"{source.value}:{key}",
+                _dump_entry(expiry, refresh_at, video_info),
+                ttl,
+            )
+        except Exception as err:
+            self._on_error("set", err)
+            return None
+        return refresh_at
+
+    async def delete(self, source: VideoSource, key: str) -> None:
+        try:
+            await self.backend.delete(f"{source.value}:{key}")
+        except Exception as err:
+            self._on_error("delete", err)
+
+    async def stats(self) -> Dict[str, Any]:
+        try:
+            stats = await self.backend.stats()
+        except Exception as err:
+            self._on_error("stats", err)
+            stats = {"backend": self.backend.name}
+        stats["errors"] = self.errors
+        return stats
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    def _on_error(self, operation: str, err: Exception) -> None:
+        self.errors += 1
+        print(f"[ResultCache] {self.backend.name} {operation} 失败: {err!r}")
+
+
+result_cache = ResultCache(
+    create_cache_backend(
+        RESULT_CACHE_BACKEND,
+        "result",
+        RESULT_CACHE_SIZE,
+        path=RESULT_CACHE_PATH,
+        url=RESULT_CACHE_URL,
+        slot_bytes=RESULT_CACHE_SLOT_BYTES,
+    )
+)
+
+# 只记录 PermanentParseError 的错误信息, key 与 result_cache 相同
+negative_cache = TTLCache(maxsize=NEGATIVE_CACHE_SIZE, ttl=NEGATIVE_CACHE_TTL)
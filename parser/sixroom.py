@@ -1,7 +1,5 @@
-import fake_useragent
-import httpx
-
-from utils import get_val_from_url_by_query_key
+from utils import fast_json, get_val_from_url_by_query_key
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -30,13 +28,13 @@ class SixRoom(BaseParser):
         )
         headers = {
             "Referer": f"https://m.6.cn/v/{video_id}",
-            "User-Agent": fake_useragent.UserAgent(os=["ios"]).random,
+            "User-Agent": user_agent_pool.get("ios"),
         }
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with self.get_client(follow_redirects=True) as client:
             response = await client.get(req_url, headers=headers)
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         data = json_data["content"]
 
         video_info = VideoInfo(
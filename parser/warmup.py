@@ -0,0 +1,145 @@
+"""
+批量预解析分享链接, 提前写入解析结果缓存
+
+请求经过与线上流量相同的连接池和 host_limiter, 不会突破各平台的自适应并发上限
+命令行方式在独立进程中运行, 只有使用 sqlite / mmap / redis 等共享缓存后端时才能让服务进程命中,
+memory 后端请使用 /api/warmup 接口
+
+运行: python -m parser.warmup urls.txt [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils import extract_url
+from utils.http_client import http_client_registry
+
+from . import parse_video_share_url
+from .result_cache import result_cache
+
+# 预解析的默认并发数
+WARMUP_CONCURRENCY = int(os.getenv("PARSE_VIDEO_WARMUP_CONCURRENCY", "4"))
+# 单个预解析任务的最大并发数, 接口传入的并发数不能超过该值
+WARMUP_MAX_CONCURRENCY = int(os.getenv("PARSE_VIDEO_WARMUP_MAX_CONCURRENCY", "16"))
+# 最多记录的失败明细条数
+_MAX_FAILURES = 100
+
+
+@dataclasses.dataclass
+class WarmupProgress:
+    """
+    预解析进度
+    """
+
+    # 链接总数
+    total: int
+
+    # 已完成数
+    done: int = 0
+
+    # 成功数
+    succeeded: int = 0
+
+    # 失败数
+    failed: int = 0
+
+    # 失败明细, 最多记录 _MAX_FAILURES 条
+    failures: List[Dict[str, str]] = dataclasses.field(default_factory=list)
+
+    # 开始 / 结束时间(unix 时间戳)
+    started_at: float = dataclasses.field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+
+def load_share_urls(lines: Iterable[str]) -> List[str]:
+    """
+    从文本行中提取分享链接, 忽略空行和 # 开头的注释, 去重并保持顺序
+    :param lines: 分享链接或分享文案, 每行一条
+    :return:
+    """
+    share_urls = {}
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            share_urls[extract_url(line)] = None
+    return list(share_urls)
+
+
+async def warm_up(
+    share_urls: List[str],
+    concurrency: int = WARMUP_CONCURRENCY,
+    progress: Optional[WarmupProgress] = None,
+    on_result: Optional[Callable[[str, Optional[Exception]], None]] = None,
+) -> WarmupProgress:
+    """
+    以有限并发解析分享链接, 结果写入解析结果缓存
+    :param share_urls: 分享链接列表
+    :param concurrency: 并发数, 限制在 1 到 WARMUP_MAX_CONCURRENCY 之间
+    :param progress: 进度对象, 为空时新建, 调用方可以在运行过程中读取
+    :param on_result: 每条链接完成时的回调, 失败时传入异常
+    :return:
+    """
+    if progress is None:
+        progress = WarmupProgress(total=len(share_urls))
+    pending = iter(share_urls)
+
+    async def worker() -> None:
+        for share_url in pending:
+            error = None
+            try:
+                await parse_video_share_url(share_url)
+            except Exception as err:
+                error = err
+
+            progress.done += 1
+            if error is None:
+                progress.succeeded += 1
+            else:
+                progress.failed += 1
+                if len(progress.failures) < _MAX_FAILURES:
+                    progress.failures.append({"url": share_url, "error": str(error)})
+            if on_result is not None:
+                on_result(share_url, error)
+
+    concurrency = min(max(1, concurrency), WARMUP_MAX_CONCURRENCY)
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    progress.finished_at = time.time()
+    return progress
+
+
+async def _main() -> None:
+    arg_parser = argparse.ArgumentParser(description="批量预解析分享链接")
+    arg_parser.add_argument("file", help="分享链接文件, 每行一条, - 表示标准输入")
+    arg_parser.add_argument("--concurrency", type=int, default=WARMUP_CONCURRENCY)
+    args = arg_parser.parse_args()
+
+    if args.file == "-":
+        share_urls = load_share_urls(sys.stdin)
+    else:
+        with open(args.file, encoding="utf-8") as f:
+            share_urls = load_share_urls(f)
+    progress = WarmupProgress(total=len(share_urls))
+
+    def on_result(share_url: str, error: Optional[Exception]) -> None:
+        status = "ok" if error is None else f"fail: {error}"
+        print(f"[{progress.done}/{progress.total}] {share_url} {status}")
+
+    await http_client_registry.open()
+    try:
+        await warm_up(share_urls, args.concurrency, progress, on_result)
+    finally:
+        await http_client_registry.aclose()
+        await result_cache.aclose()
+    print(
+        f"完成 {progress.done} 条, 成功 {progress.succeeded} 条, "
+        f"失败 {progress.failed} 条, 耗时 {progress.finished_at - progress.started_at:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
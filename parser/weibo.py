@@ -1,10 +1,9 @@
 import re
 from urllib.parse import urlparse
 
-import fake_useragent
-import httpx
-
-from utils import get_val_from_url_by_query_key
+from utils import embedded_state, fast_json, get_val_from_url_by_query_key
+from utils.race import race_with_fallback
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
 
@@ -14,6 +13,9 @@ class WeiBo(BaseParser):
     微博
     """
 
+    # 帖子页面内嵌数据的标记: var $render_data = [{...}][0] || {};
+    RENDER_DATA_MARKER = b"$render_data"
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         # Handle video URLs
         if "show?fid=" in share_url:
@@ -39,14 +41,20 @@ class WeiBo(BaseParser):
         headers = {
             "Referer": f"https://h5.video.weibo.com/show/{video_id}",
             "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": fake_useragent.UserAgent(os=["ios"]).random,
+            "User-Agent": user_agent_pool.get("ios"),
         }
         post_content = 'data={"Component_Play_Playinfo":{"oid":"' + video_id + '"}}'
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.post(req_url, headers=headers, content=post_content)
+        async with self.get_client(follow_redirects=True) as client:
+            # 该接口只查询数据, 声明为幂等以便开启对冲时可以重发
+            response = await client.post(
+                req_url,
+                headers=headers,
+                content=post_content,
+                extensions={"idempotent": True},
+            )
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         data = json_data["data"]["Component_Play_Playinfo"]
 
         video_url = data["stream_url"]
@@ -71,36 +79,47 @@ class WeiBo(BaseParser):
         """
         Parse Weibo post (potential image album)
         """
-        # Try mobile API first
+        # Try mobile API first, race the desktop page if it is slow or fails
+        # 两路请求使用同一个 User-Agent, 与同一个访客会话保持一致
+        return await race_with_fallback(
+            lambda: self._parse_post_by_mobile_api(post_id),
+            lambda: self._parse_post_by_html(post_id, original_url),
+        )
+
+    async def _parse_post_by_mobile_api(self, post_id: str) -> VideoInfo:
+        """
+        Parse Weibo post from mobile API
+        """
         req_url = f"https://m.weibo.cn/statuses/show?id={post_id}"
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["ios"]).random,
+            "User-Agent": user_agent_pool.get("ios", session=post_id),
             "Referer": "https://m.weibo.cn/",
             "Content-Type": "application/json;charset=UTF-8",
             "X-Requested-With": "XMLHttpRequest",
         }
 
-        try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(req_url, headers=headers)
-                response.raise_for_status()
+        async with self.get_client(follow_redirects=True) as client:
+            response = await client.get(req_url, headers=headers)
+            response.raise_for_status()
 
-            json_data = response.json()
-            if "data" in json_data:
-                return await self._parse_mobile_api_data(json_data["data"])
-        except Exception:
-            pass
+        json_data = fast_json.loads(response.content)
+        if "data" not in json_data:
+            raise Exception("weibo mobile api returned no data")
+        return await self._parse_mobile_api_data(json_data["data"])
 
-        # Fallback to desktop page parsing using the original URL
+    async def _parse_post_by_html(self, post_id: str, original_url: str) -> VideoInfo:
+        """
+        Fallback to desktop page parsing using the original URL
+        """
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["ios"]).random,
+            "User-Agent": user_agent_pool.get("ios", session=post_id),
         }
 
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with self.get_client(follow_redirects=True) as client:
             response = await client.get(original_url, headers=headers)
             response.raise_for_status()
 
-        return await self._parse_html_page(response.text)
+        return await self._parse_html_page(response.content)
 
     async def _parse_mobile_api_data(self, data: dict) -> VideoInfo:
         """
@@ -138,20 +157,12 @@ class WeiBo(BaseParser):
         )
         return video_info
 
-    async def _parse_html_page(self, html_content: str) -> VideoInfo:
+    async def _parse_html_page(self, html_content: bytes) -> VideoInfo:
         """
         Parse data from HTML page
         """
-        # Try to extract data from $render_data script
-        pattern = r"\$render_data\s*=\s*(.*?)\[0\]"
-        match = re.search(pattern, html_content)
-        if not match:
-            raise Exception("parse weibo html page fail")
-
-        json_str = match.group(1) + "[0]"
-        import json
-
-        data = json.loads(json_str)
+        # Extract data from $render_data script
+        data = embedded_state.extract_state(html_content, self.RENDER_DATA_MARKER, (0,))
 
         # Extract basic info
         status_data = data.get("status", {})
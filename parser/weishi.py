@@ -1,6 +1,4 @@
-import httpx
-
-from utils import get_val_from_url_by_query_key
+from utils import fast_json, get_val_from_url_by_query_key
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -19,11 +17,11 @@ class WeiShi(BaseParser):
             "https://h5.weishi.qq.com/webapp/json/weishi/WSH5GetPlayPage"
             f"?feedid={video_id}"
         )
-        async with httpx.AsyncClient() as client:
+        async with self.get_client() as client:
             response = await client.get(req_url, headers=self.get_default_headers())
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         # 接口返回错误
         if json_data["ret"] != 0:
             raise Exception(json_data["msg"])
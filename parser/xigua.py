@@ -1,10 +1,7 @@
-import json
-import re
+from utils import embedded_state
+from utils.user_agent import user_agent_pool
 
-import fake_useragent
-import httpx
-
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .base import BaseParser, PermanentParseError, VideoAuthor, VideoInfo
 
 
 class XiGua(BaseParser):
@@ -12,19 +9,20 @@ class XiGua(BaseParser):
     西瓜视频
     """
 
+    # 页面中 _ROUTER_DATA 的标记
+    ROUTER_DATA_MARKER = b"window._ROUTER_DATA"
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["android"]).random,
+            "User-Agent": user_agent_pool.get("android"),
         }
         if share_url.startswith("https://www.ixigua.com/"):
             # 支持电脑网页版链接 https://www.ixigua.com/xxxxxx
             video_id = share_url.strip("/").split("/")[-1]
             return await self.parse_video_id(video_id)
 
-        async with httpx.AsyncClient(follow_redirects=False) as client:
-            response = await client.get(share_url, headers=headers)
-
-        location_url = response.headers.get("location", "")
+        resolution = await self.resolve_share_url(share_url, headers=headers)
+        location_url = resolution.location
         video_id = location_url.split("?")[0].strip("/").split("/")[-1]
         if len(video_id) <= 0:
             raise Exception("failed to get video_id from share URL")
@@ -39,30 +37,32 @@ class XiGua(BaseParser):
             f"&utm_campaign=client_share&utm_medium=android&app=aweme"
         )
 
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(req_url, headers=self.get_default_headers())
-            response.raise_for_status()
-
-        pattern = re.compile(
-            pattern=r"window\._ROUTER_DATA\s*=\s*(.*?)</script>",
-            flags=re.DOTALL,
+        response, html = await self.fetch_page(
+            req_url,
+            [self.ROUTER_DATA_MARKER],
+            headers=self.get_default_headers(),
+            follow_redirects=True,
+        )
+        response.raise_for_status()
+
+        # 只解码用到的 item_list[0], 不构造整个 _ROUTER_DATA
+        video_info_path = ("loaderData", "video_(id)/page", "videoInfoRes")
+        data = embedded_state.extract_state(
+            html,
+            self.ROUTER_DATA_MARKER,
+            (*video_info_path, "item_list", 0),
+            default=None,
         )
-        find_res = pattern.search(response.text)
-
-        if not find_res or not find_res.group(1):
-            raise ValueError("parse video json info from html fail")
-
-        json_data = json.loads(find_res.group(1).strip())
-        original_video_info = json_data["loaderData"]["video_(id)/page"]["videoInfoRes"]
 
         # 如果没有视频信息，获取并抛出异常
-        if len(original_video_info["item_list"]) == 0:
-            err_detail_msg = "failed to parse video info from HTML"
-            if len(filter_list := original_video_info["filter_list"]) > 0:
-                err_detail_msg = filter_list[0]["detail_msg"]
-            raise Exception(err_detail_msg)
-
-        data = original_video_info["item_list"][0]
+        if data is None:
+            # filter_list 不为空表示作品被删除或不可见
+            filter_list = embedded_state.extract_state(
+                html, self.ROUTER_DATA_MARKER, (*video_info_path, "filter_list")
+            )
+            if len(filter_list) > 0:
+                raise PermanentParseError(filter_list[0]["detail_msg"])
+            raise Exception("failed to parse video info from HTML")
         video_url = data["video"]["play_addr"]["url_list"][0].replace("playwm", "play")
 
         video_info = VideoInfo(
@@ -1,8 +1,7 @@
-import json
+import re
 
-import fake_useragent
-import httpx
-from parsel import Selector
+from utils import embedded_state, fast_json
+from utils.user_agent import user_agent_pool
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -12,20 +11,32 @@ class XinPianChang(BaseParser):
     新片场
     """
 
+    # 流式读取时等待的标记, 之后的 </script> 到达即可停止;
+    # 引号不同等情况下找不到时会读完整个页面, 不影响提取
+    NEXT_DATA_MARKER = b'id="__NEXT_DATA__"'
+    # __NEXT_DATA__ 的 script 标签, 不依赖属性顺序、引号和 nonce 等其他属性
+    NEXT_DATA_TAG = re.compile(
+        rb"""<script\b[^>]*?\bid\s*=\s*["']?__NEXT_DATA__["']?(?=[\s/>])[^>]*>""",
+        re.IGNORECASE,
+    )
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+            "User-Agent": user_agent_pool.get("windows"),
             "Upgrade-Insecure-Requests": "1",
             "Referer": "https://www.xinpianchang.com/",
         }
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(share_url, headers=headers)
-            response.raise_for_status()
+        response, html = await self.fetch_page(
+            share_url,
+            [self.NEXT_DATA_MARKER],
+            headers=headers,
+            follow_redirects=True,
+        )
+        response.raise_for_status()
 
-        sel = Selector(response.text)
-        json_text = sel.css("script#__NEXT_DATA__::text").get()
-        json_data = json.loads(json_text)
-        data = json_data["props"]["pageProps"]["detail"]
+        data = embedded_state.extract_state(
+            html, self.NEXT_DATA_TAG, ("props", "pageProps", "detail")
+        )
 
         # 获取 appKey 和 media_id， 另外调用接口获取mp4视频地址
         app_key = data["video"]["appKey"]
@@ -34,10 +45,10 @@ class XinPianChang(BaseParser):
             f"https://mod-api.xinpianchang.com/mod/api/v2/media/{media_id}"
             f"?appKey={app_key}&extend=userInfo%2CuserStatus"
         )
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with self.get_client(follow_redirects=True) as client:
             mp4_response = await client.get(req_mp4_url, headers=headers)
             mp4_response.raise_for_status()
-        mp4_data = mp4_response.json()
+        mp4_data = fast_json.loads(mp4_response.content)
         video_url = mp4_data["data"]["resource"]["progressive"][0]["url"]
 
         video_info = VideoInfo(
@@ -1,6 +1,4 @@
-import httpx
-
-from utils import get_val_from_url_by_query_key
+from utils import fast_json, get_val_from_url_by_query_key
 
 from .base import BaseParser, VideoAuthor, VideoInfo
 
@@ -21,13 +19,13 @@ class ZuiYou(BaseParser):
             "h_av": "5.2.13.011",
             "pid": int_video_id,
         }
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with self.get_client(follow_redirects=True) as client:
             response = await client.post(
                 req_url, headers=self.get_default_headers(), json=post_data
             )
             response.raise_for_status()
 
-        json_data = response.json()
+        json_data = fast_json.loads(response.content)
         data = json_data["data"]["post"]
         video_key = str(data["imgs"][0]["id"])
 
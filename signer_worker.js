@@ -0,0 +1,42 @@
+// 长驻 Node 进程: 启动时加载一次 JS 文件, 之后通过 stdin / stdout 按行 JSON 协议调用其中的全局函数
+// 用法: node signer_worker.js signer.js
+// 请求: {"id": 1, "method": "get_sign", "args": ["query", "ua"]}
+// 响应: {"id": 1, "result": "..."} 或 {"id": 1, "error": "..."}
+// method 为 "__ping__" 时直接返回 "pong", 用于健康检查
+
+const fs = require("fs");
+const readline = require("readline");
+const vm = require("vm");
+
+const scriptPath = process.argv[2];
+const sandbox = {};
+vm.createContext(sandbox);
+vm.runInContext(fs.readFileSync(scriptPath, "utf-8"), sandbox, { filename: scriptPath });
+
+function respond(message) {
+    process.stdout.write(JSON.stringify(message) + "\n");
+}
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+rl.on("line", (line) => {
+    let id = null;
+    try {
+        const request = JSON.parse(line);
+        id = request.id;
+        if (request.method === "__ping__") {
+            respond({ id: id, result: "pong" });
+            return;
+        }
+        const func = sandbox[request.method];
+        if (typeof func !== "function") {
+            throw new Error("function not found: " + request.method);
+        }
+        respond({ id: id, result: func.apply(null, request.args || []) });
+    } catch (err) {
+        respond({ id: id, error: String((err && err.message) || err) });
+    }
+});
+
+// 父进程关闭管道后退出
+rl.on("close", () => process.exit(0));
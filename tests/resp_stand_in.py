@@ -0,0 +1,52 @@
+"""
+测试和基准共用的本地 RESP 服务, 代替真实的 Redis
+"""
+
+import asyncio
+import time
+
+
+class RespStandIn:
+    """
+    只实现 GET / SET PX / DEL / INFO / PING 的内存版 Redis 协议服务
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                args = await self._read_command(reader)
+                writer.write(self._execute(args))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader):
+        count = int((await reader.readuntil(b"\r\n"))[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, args):
+        command = args[0].upper()
+        if command == b"GET":
+            item = self.data.get(args[1])
+            if item is None or item[0] <= time.monotonic():
+                return b"$-1\r\n"
+            return b"$%d\r\n%b\r\n" % (len(item[1]), item[1])
+        if command == b"SET":
+            self.data[args[1]] = (time.monotonic() + int(args[4]) / 1000, args[2])
+            return b"+OK\r\n"
+        if command == b"DEL":
+            return b":%d\r\n" % (self.data.pop(args[1], None) is not None)
+        if command == b"INFO":
+            info = b"# Stats\r\nevicted_keys:0\r\n"
+            return b"$%d\r\n%b\r\n" % (len(info), info)
+        return b"+PONG\r\n"
@@ -0,0 +1,48 @@
+"""
+各来源的分享文案 / 链接样例, 供 tests/test_host_router.py 和 benchmarks/bench_router.py 共用
+"""
+
+from parser import VideoSource
+
+# (分享文案或链接, 期望的来源)
+SAMPLE_URLS = [
+    ("7.92 复制打开抖音 https://v.douyin.com/iRNBho6u/ 看看作品", VideoSource.DouYin),
+    ("https://www.douyin.com/video/7298145681699622182", VideoSource.DouYin),
+    ("https://m.douyin.com/share/video/7298145681699622182", VideoSource.DouYin),
+    ("https://www.iesdouyin.com/share/video/7298145681699622182/", VideoSource.DouYin),
+    ("https://v.kuaishou.com/JzHB8d5 复制此链接", VideoSource.KuaiShou),
+    ("https://h5.pipix.com/s/iRkcqbU2/", VideoSource.PiPiXia),
+    ("https://weibo.com/2543858012/Q9pcJ4S21", VideoSource.WeiBo),
+    ("https://video.weibo.com/show?fid=1034:4914351942074379", VideoSource.WeiBo),
+    ("https://m.weibo.cn/status/Q9pcJ4S21", VideoSource.WeiBo),
+    (
+        "https://isee.weishi.qq.com/ws/app-pages/share/index.html?id=7",
+        VideoSource.WeiShi,
+    ),
+    ("https://m.oasis.weibo.cn/v1/h5/share?sid=4976424138117291", VideoSource.LvZhou),
+    ("https://oasis.weibo.cn/v1/h5/share?sid=4976424138117291", VideoSource.LvZhou),
+    (
+        "https://share.xiaochuankeji.cn/hybrid/share/post?pid=241891402",
+        VideoSource.ZuiYou,
+    ),
+    ("https://xspshare.baidu.com/s/iJq3dd7Bq", VideoSource.QuanMin),
+    ("https://v.ixigua.com/iRNByY5M/", VideoSource.XiGua),
+    ("https://www.ixigua.com/7298145681699622182", VideoSource.XiGua),
+    ("https://www.pearvideo.com/video_1789018", VideoSource.LiShiPin),
+    ("https://h5.pipigx.com/pp/post/602405378374", VideoSource.PiPiGaoXiao),
+    ("https://v.huya.com/play/966658359.html", VideoSource.HuYa),
+    ("https://www.acfun.cn/v/ac41254356", VideoSource.AcFun),
+    ("https://p.doupai.cc/#/share?id=653b3b6aa1d9ec0018b8d6f2", VideoSource.DouPai),
+    ("https://www.meipai.com/media/6802929496434432356", VideoSource.MeiPai),
+    ("https://kg.qq.com/node/play?s=I8-dUN4xMoF8s5Nh", VideoSource.QuanMinKGe),
+    ("https://m.6.cn/v/13617795", VideoSource.SixRoom),
+    ("https://www.xinpianchang.com/a12896069", VideoSource.XinPianChang),
+    ("https://haokan.baidu.com/v?vid=3974542361040960522", VideoSource.HaoKan),
+    ("https://b23.tv/BV1xx411c7mD", VideoSource.BiliBili),
+    ("https://www.bilibili.com/video/BV1xx411c7mD", VideoSource.BiliBili),
+    ("https://xhslink.com/a/WHdS7Ogo4v2F 复制本条信息", VideoSource.RedBook),
+    (
+        "https://www.xiaohongshu.com/explore/64d2e2d1000000001201f5a3",
+        VideoSource.RedBook,
+    ),
+]
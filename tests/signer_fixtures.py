@@ -0,0 +1,57 @@
+"""
+a_bogus 一致性校验的固定数据: 固定种子生成的 query / UA / 随机数 / 时间戳,
+以及在 Node 中替换 Math.random 和 Date.now 后执行 signer.js 的脚本,
+供 tests/test_a_bogus.py 和 benchmarks/bench_signer.py 共用
+"""
+
+import random
+
+SIGNER_JS = "signer.js"
+PC_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
+QUERY = (
+    "aweme_id=7372484719365098803&aid=6383&device_platform=webapp&pc_client_type=1"
+    "&version_code=190500&version_name=19.5.0&cookie_enabled=true&platform=PC"
+    "&downlink=10"
+)
+
+# 在独立的 vm 上下文中加载 signer.js, 替换随机数和时间后签名
+FIXTURE_RUNNER_JS = """
+const fs = require("fs");
+const vm = require("vm");
+const source = fs.readFileSync(process.argv[1], "utf-8");
+const fixtures = JSON.parse(fs.readFileSync(0, "utf-8"));
+console.log(JSON.stringify(fixtures.map((fixture) => {
+    const ctx = {};
+    vm.createContext(ctx);
+    vm.runInContext(source, ctx);
+    ctx.__random = fixture.random.slice();
+    ctx.__time = [fixture.start_time, fixture.end_time];
+    vm.runInContext(
+        "Math.random = () => __random.shift(); Date.now = () => __time.shift();", ctx
+    );
+    return ctx.get_sign(fixture.query, fixture.user_agent);
+})));
+"""
+
+
+def make_fixtures(count: int, seed: int = 20240601):
+    rng = random.Random(seed)
+    fixtures = []
+    for index in range(count):
+        params = [f"p{i}={rng.randrange(10**12)}" for i in range(rng.randrange(0, 24))]
+        if index % 5 == 0:
+            params.append("keyword=记录美好生活")
+        start_time = 1_600_000_000_000 + rng.randrange(10**12)
+        fixtures.append(
+            {
+                "query": "&".join(params) if index % 10 else QUERY,
+                "user_agent": PC_UA if index % 3 else f"{PC_UA} Edg/{index}.0",
+                "random": [rng.random() for _ in range(3)],
+                "start_time": start_time,
+                "end_time": start_time + rng.randrange(0, 8),
+            }
+        )
+    return fixtures
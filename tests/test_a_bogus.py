@@ -0,0 +1,42 @@
+"""
+utils.a_bogus 与 signer.js 的一致性: 固定种子的 query / UA / 随机数 / 时间戳在两边签名结果必须相同
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from tests.signer_fixtures import FIXTURE_RUNNER_JS, SIGNER_JS, make_fixtures
+from utils import a_bogus
+
+FIXTURES = make_fixtures(100)
+SIGNER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), SIGNER_JS)
+
+
+@pytest.fixture(scope="module")
+def js_signs():
+    completed = subprocess.run(
+        ["node", "-e", FIXTURE_RUNNER_JS, SIGNER_PATH],
+        input=json.dumps(FIXTURES),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="需要安装 node")
+@pytest.mark.parametrize("index", range(len(FIXTURES)))
+def test_matches_signer_js(js_signs, index):
+    fixture = FIXTURES[index]
+    py_sign = a_bogus.generate_a_bogus(
+        fixture["query"],
+        fixture["user_agent"],
+        fixture["random"],
+        fixture["start_time"],
+        fixture["end_time"],
+    )
+    assert py_sign == js_signs[index]
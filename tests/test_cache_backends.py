@@ -0,0 +1,114 @@
+"""
+缓存后端: redis 后端连接本地 RESP 服务, mmap 后端使用临时文件
+"""
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from tests.resp_stand_in import RespStandIn
+from utils.cache_backends import (
+    CacheBackendError,
+    MmapCacheBackend,
+    RedisCacheBackend,
+)
+
+fcntl = pytest.importorskip("fcntl")
+
+
+async def _start_server(handler):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"redis://127.0.0.1:{port}/0"
+
+
+def test_redis_backend():
+    async def run():
+        server, url = await _start_server(RespStandIn().handle)
+        backend = RedisCacheBackend(url, prefix="test:")
+        try:
+            assert await backend.get("a") is None
+            await backend.set("a", b"value\r\n", ttl=60)
+            assert await backend.get("a") == b"value\r\n"
+            await backend.set("expired", b"x", ttl=0)
+            assert await backend.get("expired") is None
+            await backend.delete("a")
+            assert await backend.get("a") is None
+            stats = await backend.stats()
+            assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 0)
+        finally:
+            await backend.aclose()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_redis_backend_timeout():
+    async def stalled(reader, writer):
+        # 接受连接但从不回复
+        await reader.read()
+        writer.close()
+
+    async def run():
+        server, url = await _start_server(stalled)
+        backend = RedisCacheBackend(url, timeout=0.1)
+        try:
+            start = time.monotonic()
+            with pytest.raises(CacheBackendError):
+                await backend.get("a")
+            assert time.monotonic() - start < 1
+            # 超时的连接不放回连接池
+            assert not backend._idle
+        finally:
+            await backend.aclose()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_mmap_backend(tmp_path):
+    async def run():
+        backend = MmapCacheBackend(str(tmp_path / "cache.mmap"), 64, 512)
+        try:
+            await backend.set("a", b"1", ttl=60)
+            await backend.set("a", b"2", ttl=60)
+            await backend.set("b", b"3", ttl=60)
+            await backend.set("big", b"x" * 1024, ttl=60)
+            assert await backend.get("a") == b"2"
+            assert await backend.get("big") is None
+            stats = await backend.stats()
+            assert (stats["size"], stats["oversize"]) == (2, 1)
+            await backend.delete("a")
+            assert await backend.get("a") is None
+            assert (await backend.stats())["size"] == 1
+        finally:
+            await backend.aclose()
+
+    asyncio.run(run())
+
+
+def test_mmap_lock_does_not_block_loop(tmp_path):
+    path = str(tmp_path / "cache.mmap")
+
+    async def run():
+        backend = MmapCacheBackend(path, 64, 512)
+        await backend.set("a", b"1", ttl=60)
+        # 模拟其他 worker 持有排他锁
+        fd = os.open(path, os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            task = asyncio.ensure_future(backend.get("a"))
+            ticks = 0
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert ticks == 5 and not task.done()
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        assert await task == b"1"
+        await backend.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+"""
+分享链接路由: 每个来源的样例链接都应路由到对应的解析器
+
+样例链接见 tests/share_urls.py, benchmarks/bench_router.py 使用同一张表统计路由耗时
+"""
+
+import pytest
+
+from parser import VideoSource, source_router
+from tests.share_urls import SAMPLE_URLS
+from utils import extract_url
+from utils.host_router import HostRouter, get_host
+
+
+@pytest.mark.parametrize("text, expected", SAMPLE_URLS)
+def test_source_router(text, expected):
+    assert source_router.match(extract_url(text)) == expected
+
+
+def test_all_sources_covered():
+    assert {expected for _, expected in SAMPLE_URLS} == set(VideoSource)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://evil-douyin.com/video/1",
+        "https://douyin.com.evil.cn/video/1",
+        "https://example.com/?u=https://v.douyin.com/iRNBho6u/",
+        "not a url",
+        "",
+    ],
+)
+def test_source_router_no_match(url):
+    assert source_router.match(url) is None
+
+
+@pytest.mark.parametrize(
+    "url, host",
+    [
+        ("https://V.DouYin.com./xx", "v.douyin.com"),
+        ("v.douyin.com/xx", "v.douyin.com"),
+        ("http://m.weibo.cn:8080/status/1", "m.weibo.cn"),
+        ("http://[::1", ""),
+    ],
+)
+def test_get_host(url, host):
+    assert get_host(url) == host
+
+
+def test_most_specific_domain_wins():
+    router = HostRouter([("weibo.com", "weibo"), ("oasis.weibo.cn", "oasis")])
+    assert router.match("https://m.oasis.weibo.cn/x") == "oasis"
+    assert router.match("https://m.weibo.cn/x") is None
+    with pytest.raises(ValueError):
+        router.add("weibo.com", "other")
@@ -0,0 +1,38 @@
+"""
+html_fields 增量提取: 字段在页面开头或末尾时结果都与 parsel 整页解析一致
+"""
+
+import pytest
+from parsel import Selector
+
+from parser.acfun import AcFun
+from utils.html_fields import HtmlFields
+
+AUTHOR_HTML = (
+    '<div class="up-info"><a class="info-item1" href="/upPage/9">'
+    '<span class="up-avatar"><img src="a.jpg"></span></a>'
+    '<span class="up-name">UP主</span></div>'
+)
+PADDING = '<div class="item"><p>推荐</p></div>' * 2000
+
+
+@pytest.mark.parametrize(
+    "body", [AUTHOR_HTML + PADDING, PADDING + AUTHOR_HTML, PADDING, ""]
+)
+def test_extract_matches_parsel(body):
+    html = f"<html><body>{body}</body></html>".encode()
+    sel = Selector(body=html)
+    expected = {
+        "uid": sel.css("div.up-info > a.info-item1::attr(href)").get(),
+        "name": sel.css("div.up-info span.up-name::text").get(),
+        "avatar": sel.css("div.up-info span.up-avatar > img::attr(src)").get(),
+    }
+    assert AcFun.AUTHOR_FIELDS.extract(html) == expected
+
+
+def test_reader_stops_after_fields():
+    fields = HtmlFields({"title": "h1::text"})
+    reader = fields.reader()
+    assert not reader.feed("<html><body><h1>标".encode())
+    assert reader.feed("题</h1><p>".encode())
+    assert reader.close() == {"title": "标题"}
@@ -0,0 +1,110 @@
+"""
+json_path / embedded_state 按路径解码子树, 结果与整体解码后取值一致
+"""
+
+import pytest
+
+from parser.xinpianchang import XinPianChang
+from utils import embedded_state, js_literal, json_path
+
+DOCUMENT = '{"a": {"b": [1, {"c": "x]}"}, null]}, "d": -1.5e3, "e": "\\"q\\""}'
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ((), {"a": {"b": [1, {"c": "x]}"}, None]}, "d": -1.5e3, "e": '"q"'}),
+        (("a", "b", 1, "c"), "x]}"),
+        (("a", "b", 2), None),
+        (("d",), -1.5e3),
+        (("e",), '"q"'),
+        ((json_path.WILDCARD, "b", 0), 1),
+    ],
+)
+def test_extract(path, expected):
+    assert json_path.extract(DOCUMENT, path) == expected
+    assert json_path.extract(DOCUMENT.encode(), path) == expected
+
+
+def test_extract_missing():
+    with pytest.raises(KeyError):
+        json_path.extract(DOCUMENT, ("a", "missing"))
+    assert json_path.extract(DOCUMENT, ("a", "b", 5), default=None) is None
+
+
+@pytest.mark.parametrize(
+    "page, marker, expected",
+    [
+        # ; 结尾的顶层标量赋值
+        (b"<script>var x = 123;</script>", b"var x =", 123),
+        (b"<script>var flag = true;var y = 1;</script>", b"var flag =", True),
+        (b"<script>init(false)</script>", b"init(", False),
+        # 没有 ; 直接结束的脚本
+        (b"<script>window.x = 12</script>", b"window.x =", 12),
+        (b'<script>var info = {"t": "a;b"};</script>', b"var info =", {"t": "a;b"}),
+    ],
+)
+def test_extract_state(page, marker, expected):
+    assert embedded_state.extract_state(page, marker) == expected
+
+
+def test_extract_state_js_literal():
+    page = b'<script>window.__INITIAL_STATE__={"a":undefined,"b":[1]};</script>'
+    marker = b"window.__INITIAL_STATE__"
+    assert embedded_state.extract_state(page, marker, ("b", 0)) == 1
+    assert (
+        embedded_state.extract_state(page, marker, ("a",), loads=js_literal.loads)
+        is None
+    )
+
+
+@pytest.mark.parametrize(
+    "tag",
+    [
+        '<script id="__NEXT_DATA__" type="application/json">',
+        '<script type="application/json" id="__NEXT_DATA__" crossorigin="anonymous">',
+        "<script nonce='abc' id='__NEXT_DATA__'>",
+        '<SCRIPT id=__NEXT_DATA__ type="application/json">',
+    ],
+)
+def test_extract_state_next_data_tag(tag):
+    page = (
+        "<script>self.__NEXT_DATA__x = 1</script>"
+        f'{tag}{{"props": {{"pageProps": {{"detail": {{"a": 1}}}}}}}}</script>'
+    ).encode()
+    path = ("props", "pageProps", "detail")
+    detail = embedded_state.extract_state(page, XinPianChang.NEXT_DATA_TAG, path)
+    assert detail == {"a": 1}
+
+
+@pytest.mark.parametrize(
+    "path",
+    [(), ("a", "b", 1, "c"), ("a", "b", 2), ("d",), (json_path.WILDCARD, "b", 0)],
+)
+def test_walk(path):
+    value = json_path.extract(DOCUMENT, ())
+    assert json_path.walk(value, path) == json_path.extract(DOCUMENT, path)
+
+
+def test_walk_missing():
+    value = json_path.extract(DOCUMENT, ())
+    with pytest.raises(KeyError):
+        json_path.walk(value, ("a", "missing"))
+    assert json_path.walk(value, ("a", "b", 5), default=None) is None
+    assert json_path.walk(value, (json_path.WILDCARD, "x"), default=None) is None
+
+
+@pytest.mark.parametrize("cutoff", [0, embedded_state.SCAN_CUTOFF])
+def test_extract_state_full_decode(monkeypatch, cutoff):
+    # 超过阈值且目标靠后时整体解码, 结果与扫描器一致
+    monkeypatch.setattr(embedded_state, "SCAN_CUTOFF", cutoff)
+    padding = ",".join(f'"k{i}": [{i}]' for i in range(100))
+    page = f'<script>window.s = {{{padding}, "t": {{"v": [1, 2]}}}};</script>'
+    marker = b"window.s"
+    assert embedded_state.extract_state(page.encode(), marker, ("t", "v", 1)) == 2
+    assert (
+        embedded_state.extract_state(page.encode(), marker, ("t", "x"), default=0) == 0
+    )
+    # 同一个 <script> 中还有其他语句时退回扫描器
+    page = b'<script>var a = {"t": 1}; var b = {"t": 2};</script>'
+    assert embedded_state.extract_state(page, b"var a =", ("t",)) == 1
@@ -0,0 +1,39 @@
+"""
+响应编码: Accept 协商按 q 值选择 JSON 或 MessagePack
+"""
+
+import pytest
+
+from utils import response_codec
+from utils.response_codec import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+
+pytestmark = pytest.mark.skipif(
+    MSGPACK_MEDIA_TYPE not in response_codec.ENCODERS,
+    reason="需要安装 msgspec 或 msgpack",
+)
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, JSON_MEDIA_TYPE),
+        ("*/*", JSON_MEDIA_TYPE),
+        ("application/json", JSON_MEDIA_TYPE),
+        ("application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("Application/X-MsgPack", MSGPACK_MEDIA_TYPE),
+        ("application/vnd.msgpack, */*", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack;q=0", JSON_MEDIA_TYPE),
+        ("application/msgpack; q=0.0, */*", JSON_MEDIA_TYPE),
+        ("application/json, application/msgpack;q=0.5", JSON_MEDIA_TYPE),
+        ("application/json;q=0.5, application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack;q=0.8, */*;q=0.1", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack;q=abc", JSON_MEDIA_TYPE),
+    ],
+)
+def test_negotiate(accept, expected):
+    assert response_codec.negotiate(accept) == expected
+
+
+def test_encode():
+    content, media_type = response_codec.encode({"a": 1}, "application/json")
+    assert (content, media_type) == (b'{"a":1}', JSON_MEDIA_TYPE)
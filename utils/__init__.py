@@ -1,5 +1,11 @@
+import re
 from urllib.parse import parse_qs, urlparse
 
+# 从分享文案中提取链接
+_URL_PATTERN = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
+)
+
 
 def get_val_from_url_by_query_key(url: str, query_key: str) -> str:
     """
@@ -20,3 +26,13 @@ def get_val_from_url_by_query_key(url: str, query_key: str) -> str:
         raise ValueError(f"url中query参数值长度为0: {query_key}")
 
     return url_query[query_key][0]
+
+
+def extract_url(text: str) -> str:
+    """
+    从分享文案中提取第一个链接, 没有链接时原样返回
+    :param text: 分享文案或链接
+    :return:
+    """
+    match = _URL_PATTERN.search(text)
+    return match.group() if match else text
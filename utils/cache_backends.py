@@ -0,0 +1,555 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .ttl_cache import TTLCache
+
+# redis 后端建立连接和单条命令的超时时间(秒), 超时按错误处理, 不阻塞解析
+REDIS_TIMEOUT = float(os.getenv("PARSE_VIDEO_REDIS_TIMEOUT", "1.0"))
+
+
+class CacheBackendError(Exception):
+    """
+    缓存后端返回错误
+    """
+
+
+class CacheBackend(ABC):
+    """
+    缓存后端接口, key 为字符串, value 为序列化后的 bytes
+    各后端自行统计命中 / 未命中 / 淘汰次数
+    """
+
+    name = ""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        :param key: 缓存 key
+        :param value: 缓存值
+        :param ttl: 过期时间(秒)
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    async def aclose(self) -> None:
+        pass
+
+    def _count(self, value: Optional[bytes]) -> Optional[bytes]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    进程内有界 LRU, 每个 worker 独立
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self._cache = TTLCache(maxsize=maxsize, ttl=0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self._cache.stats()}
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite 文件缓存, 重启后仍然有效, 同一文件可被多个 worker 共用
+    数据库操作在线程池中执行, 避免其他 worker 持有写锁时阻塞事件循环
+    """
+
+    name = "sqlite"
+
+    # 命中时最多每隔多久(秒)刷新一次访问时间, 避免每次读取都产生写操作
+    _TOUCH_INTERVAL = 60.0
+    # 每写入多少次清理一次过期和超出容量的数据
+    _TRIM_EVERY = 128
+
+    def __init__(self, path: str, maxsize: int):
+        super().__init__()
+        self.path = path
+        self.maxsize = maxsize
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(
+            path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._count(await asyncio.to_thread(self._get, key))
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM cache WHERE key = ?", key)
+
+    async def stats(self) -> Dict[str, Any]:
+        stats = await super().stats()
+        row = await asyncio.to_thread(self._execute, "SELECT COUNT(*) FROM cache")
+        stats.update(size=row[0], maxsize=self.maxsize)
+        return stats
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            now = time.time()
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            if now - accessed_at >= self._TOUCH_INTERVAL:
+                self._conn.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            return value
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % self._TRIM_EVERY == 1:
+                self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        (size,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if size > self.maxsize:
+            # 按访问时间淘汰最久未使用的数据
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (size - self.maxsize,),
+            )
+            self.evictions += cursor.rowcount
+
+    def _execute(self, sql: str, *params) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+
+class MmapCacheBackend(CacheBackend):
+    """
+    基于 mmap 共享文件的定长槽位哈希表, 同一节点上的所有 worker 共用
+    默认放在 /dev/shm, 文件是稀疏的, 只有写入过的槽位占用内存
+    读写时对整个文件加 flock 共享锁 / 排他锁, 持锁时间只有一次内存拷贝;
+    锁以非阻塞方式获取, 被其他进程持有时让出事件循环后重试, 不阻塞其他请求
+    文件头中记录已占用的槽位数, stats() 直接读取, 不扫描槽位(已过期但尚未被覆盖的也计入)
+    超过 slot_bytes 的数据不缓存
+    """
+
+    name = "mmap"
+
+    _MAGIC = b"PVC2"
+    # 文件头: magic, 槽位数, 槽位大小
+    _FILE_HEADER = struct.Struct("<4sII")
+    # 文件头之后: 已占用的槽位数
+    _COUNTER = struct.Struct("<Q")
+    _COUNTER_OFFSET = _FILE_HEADER.size
+    _DATA_OFFSET = _COUNTER_OFFSET + _COUNTER.size
+    # 槽位头: key 哈希, 过期时间(unix 时间戳), value 长度, key 长度
+    _SLOT_HEADER = struct.Struct("<QdIH2x")
+    # 同一 key 最多探测的槽位数
+    _PROBES = 8
+
+    def __init__(self, path: str, slots: int, slot_bytes: int):
+        import fcntl
+
+        super().__init__()
+        self._fcntl = fcntl
+        self.path = path
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.oversize = 0
+        size = self._DATA_OFFSET + slots * slot_bytes
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(
+                    self._fd, self._FILE_HEADER.pack(self._MAGIC, slots, slot_bytes), 0
+                )
+            header = os.pread(self._fd, self._FILE_HEADER.size, 0)
+            if header != self._FILE_HEADER.pack(self._MAGIC, slots, slot_bytes):
+                raise ValueError(
+                    f"缓存文件 {path} 的槽位配置与当前配置不一致, 请删除后重启"
+                )
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mmap = mmap.mmap(self._fd, size)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        key_bytes = key.encode()
+        key_hash = self._hash(key_bytes)
+        async with self._locked(self._fcntl.LOCK_SH):
+            for offset in self._probe(key_hash):
+                if self._matches(offset, key_hash, key_bytes):
+                    _, expires_at, value_len, key_len = self._SLOT_HEADER.unpack_from(
+                        self._mmap, offset
+                    )
+                    if expires_at <= time.time():
+                        break
+                    start = offset + self._SLOT_HEADER.size + key_len
+                    end = start + value_len
+                    return self._count(self._mmap[start:end])
+        return self._count(None)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        key_bytes = key.encode()
+        if self._SLOT_HEADER.size + len(key_bytes) + len(value) > self.slot_bytes:
+            self.oversize += 1
+            return
+        key_hash = self._hash(key_bytes)
+        now = time.time()
+        async with self._locked(self._fcntl.LOCK_EX):
+            target, victim, victim_expires_at = None, None, None
+            for offset in self._probe(key_hash):
+                stored_hash, expires_at, _, _ = self._SLOT_HEADER.unpack_from(
+                    self._mmap, offset
+                )
+                if self._matches(offset, key_hash, key_bytes):
+                    target = offset
+                    break
+                if target is None and (stored_hash == 0 or expires_at <= now):
+                    target = offset
+                elif victim_expires_at is None or expires_at < victim_expires_at:
+                    victim, victim_expires_at = offset, expires_at
+            if target is None:
+                # 探测范围内都是有效数据, 淘汰最早过期的一个
+                target = victim
+                self.evictions += 1
+            elif not self._SLOT_HEADER.unpack_from(self._mmap, target)[0]:
+                self._add_occupied(1)
+            self._SLOT_HEADER.pack_into(
+                self._mmap, target, key_hash, now + ttl, len(value), len(key_bytes)
+            )
+            data = key_bytes + value
+            start = target + self._SLOT_HEADER.size
+            end = start + len(data)
+            self._mmap[start:end] = data
+
+    async def delete(self, key: str) -> None:
+        key_bytes = key.encode()
+        key_hash = self._hash(key_bytes)
+        async with self._locked(self._fcntl.LOCK_EX):
+            for offset in self._probe(key_hash):
+                if self._matches(offset, key_hash, key_bytes):
+                    self._SLOT_HEADER.pack_into(self._mmap, offset, 0, 0.0, 0, 0)
+                    self._add_occupied(-1)
+
+    async def stats(self) -> Dict[str, Any]:
+        stats = await super().stats()
+        async with self._locked(self._fcntl.LOCK_SH):
+            (size,) = self._COUNTER.unpack_from(self._mmap, self._COUNTER_OFFSET)
+        stats.update(size=size, maxsize=self.slots, oversize=self.oversize)
+        return stats
+
+    async def aclose(self) -> None:
+        self._mmap.close()
+        os.close(self._fd)
+
+    def _locked(self, operation: int) -> "_FileLock":
+        return _FileLock(self._fcntl, self._fd, operation)
+
+    def _add_occupied(self, delta: int) -> None:
+        # 持有排他锁时调用
+        (occupied,) = self._COUNTER.unpack_from(self._mmap, self._COUNTER_OFFSET)
+        self._COUNTER.pack_into(self._mmap, self._COUNTER_OFFSET, occupied + delta)
+
+    def _probe(self, key_hash: int) -> List[int]:
+        index = key_hash % self.slots
+        return [
+            self._DATA_OFFSET + (index + i) % self.slots * self.slot_bytes
+            for i in range(min(self._PROBES, self.slots))
+        ]
+
+    def _matches(self, offset: int, key_hash: int, key_bytes: bytes) -> bool:
+        stored_hash, _, _, key_len = self._SLOT_HEADER.unpack_from(self._mmap, offset)
+        if stored_hash != key_hash or key_len != len(key_bytes):
+            return False
+        start = offset + self._SLOT_HEADER.size
+        end = start + key_len
+        return self._mmap[start:end] == key_bytes
+
+    @staticmethod
+    def _hash(key_bytes: bytes) -> int:
+        # 内置 hash() 每个进程的随机种子不同, 不能跨 worker 使用; 0 表示空槽位
+        digest = hashlib.blake2b(key_bytes, digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+
+class _FileLock:
+    """
+    非阻塞获取 flock, 被其他进程持有时 sleep 后重试, 等待期间事件循环可以处理其他请求
+    """
+
+    # 重试间隔(秒), 每次翻倍直到上限
+    _RETRY_DELAY = 0.0005
+    _MAX_RETRY_DELAY = 0.01
+
+    def __init__(self, fcntl, fd: int, operation: int):
+        self._fcntl = fcntl
+        self._fd = fd
+        self._operation = operation
+
+    async def __aenter__(self):
+        delay = self._RETRY_DELAY
+        while True:
+            try:
+                self._fcntl.flock(self._fd, self._operation | self._fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._MAX_RETRY_DELAY)
+
+    async def __aexit__(self, *exc_info):
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    使用 Redis 协议(RESP)的缓存后端, 兼容 Redis / Valkey / KeyDB 等
+    连接失败或超时时按未命中处理, 不影响解析, 超时的连接直接关闭
+    """
+
+    name = "redis"
+
+    # 最多保留的空闲连接数
+    _MAX_IDLE = 8
+
+    def __init__(
+        self, url: str, prefix: str = "parse-video:", timeout: float = REDIS_TIMEOUT
+    ):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._count(await self._command(b"GET", self.prefix + key))
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ttl_ms = int(ttl * 1000)
+        if ttl_ms <= 0:
+            return
+        await self._command(b"SET", self.prefix + key, value, b"PX", ttl_ms)
+
+    async def delete(self, key: str) -> None:
+        await self._command(b"DEL", self.prefix + key)
+
+    async def stats(self) -> Dict[str, Any]:
+        stats = await super().stats()
+        # Redis 自己做容量淘汰, 淘汰次数取服务端统计
+        info = await self._command(b"INFO", b"stats")
+        for line in (info or b"").decode().splitlines():
+            if line.startswith("evicted_keys:"):
+                stats["evictions"] = int(line.split(":", 1)[1])
+        return stats
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    async def _command(self, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 连接绑定在创建它的事件循环上
+            self._idle = []
+            self._loop = loop
+
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            try:
+                reader, writer = await asyncio.wait_for(self._connect(), self.timeout)
+            except asyncio.TimeoutError as err:
+                raise CacheBackendError(
+                    f"redis connect timed out after {self.timeout}s"
+                ) from err
+        try:
+            writer.write(_encode_command(args))
+            reply = await asyncio.wait_for(_read_reply(reader), self.timeout)
+        except asyncio.TimeoutError as err:
+            # 超时后连接上可能还有未读取的回复, 不能放回
+            writer.close()
+            raise CacheBackendError(
+                f"redis command timed out after {self.timeout}s"
+            ) from err
+        except BaseException:
+            writer.close()
+            raise
+        if len(self._idle) < self._MAX_IDLE:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        return reply
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                writer.write(_encode_command((b"AUTH", self.password)))
+                await _read_reply(reader)
+            if self.db:
+                writer.write(_encode_command((b"SELECT", self.db)))
+                await _read_reply(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+
+def _encode_command(args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode()
+        elif isinstance(arg, int):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%b\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readuntil(b"\r\n")
+    prefix, payload = line[:1], line[1:-2]
+    if prefix == b"+":
+        return payload
+    if prefix == b"-":
+        raise CacheBackendError(payload.decode(errors="replace"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise CacheBackendError(f"unexpected RESP reply: {line!r}")
+
+
+def default_cache_path(backend: str, name: str) -> str:
+    """
+    缓存文件默认路径: sqlite 放在项目 cache 目录, mmap 优先放在 /dev/shm
+    """
+    if backend == "sqlite":
+        return os.path.join("cache", f"{name}.sqlite3")
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"parse-video-{name}.mmap")
+
+
+def create_cache_backend(
+    backend: str,
+    name: str,
+    maxsize: int,
+    path: str = "",
+    url: str = "",
+    slot_bytes: int = 16384,
+) -> CacheBackend:
+    """
+    按配置创建缓存后端
+    :param backend: memory / sqlite / mmap / redis
+    :param name: 缓存名称, 用于文件名和 Redis key 前缀
+    :param maxsize: 最大条数 (redis 由服务端 maxmemory 控制)
+    :param path: sqlite / mmap 文件路径, 为空时使用默认路径
+    :param url: redis 地址, 如 redis://:password@127.0.0.1:6379/0
+    :param slot_bytes: mmap 每个槽位的字节数
+    :return:
+    """
+    if backend == "memory":
+        return MemoryCacheBackend(maxsize)
+    if backend == "sqlite":
+        return SQLiteCacheBackend(path or default_cache_path(backend, name), maxsize)
+    if backend == "mmap":
+        return MmapCacheBackend(
+            path or default_cache_path(backend, name), maxsize, slot_bytes
+        )
+    if backend == "redis":
+        return RedisCacheBackend(url, prefix=f"parse-video:{name}:")
+    raise ValueError(f"不支持的缓存后端: {backend}")
@@ -0,0 +1,182 @@
+import asyncio
+import ipaddress
+import os
+import socket
+import time
+import typing
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpcore
+
+SocketOptions = typing.Optional[typing.Iterable[httpcore.SOCKET_OPTION]]
+
+# DNS 缓存有效期(秒)
+DNS_CACHE_TTL = float(os.getenv("PARSE_VIDEO_DNS_CACHE_TTL", "300"))
+
+
+class DNSCache:
+    """
+    异步 DNS 缓存
+    同一 host 的并发解析只发起一次 getaddrinfo, 结果在 ttl 内复用
+    解析在独立的 task 中执行, 某个调用方被取消不会影响其他调用方, 所有调用方都取消后才取消解析
+    """
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, List[str]]] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        # 解析 task -> 等待它的调用方数量
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    async def resolve(self, host: str, port: int = 443) -> List[str]:
+        """
+        解析 host, 返回 ip 地址列表
+        :param host: 域名或 ip
+        :param port: 端口
+        :return:
+        """
+        if _is_ip_address(host):
+            return [host]
+
+        entry = self._entries.get(host)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        task = self._pending.get(host)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup_and_store(host, port))
+            self._pending[host] = task
+            self._waiters[task] = 0
+            task.add_done_callback(lambda _: self._forget(host, task))
+
+        self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                self._waiters[task] -= 1
+                if not self._waiters[task]:
+                    # 最后一个调用方也已取消, 之后的调用重新发起解析
+                    task.cancel()
+                    if self._pending.get(host) is task:
+                        del self._pending[host]
+            raise
+
+    async def _lookup_and_store(self, host: str, port: int) -> List[str]:
+        addresses = await self._lookup(host, port)
+        self._entries[host] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def _forget(self, host: str, task: asyncio.Task) -> None:
+        if self._pending.get(host) is task:
+            del self._pending[host]
+        self._waiters.pop(task, None)
+        # 所有调用方都已取消时, 避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate(self, host: str) -> None:
+        """
+        连接失败时删除缓存, 下次重新解析
+        """
+        self._entries.pop(host, None)
+
+    async def prefetch(self, hosts: Iterable[str]) -> None:
+        """
+        预解析 host 列表, 解析失败的 host 忽略
+        """
+        await asyncio.gather(
+            *(self.resolve(host) for host in set(hosts)), return_exceptions=True
+        )
+
+    @staticmethod
+    async def _lookup(host: str, port: int) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+        addresses = []
+        for _, _, _, _, sockaddr in infos:
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        return addresses
+
+
+class CachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    建连时使用 DNSCache 解析域名的 httpcore 网络后端
+    TLS 的 SNI 和证书校验仍使用原始域名, 只替换 TCP 连接的目标地址
+    连接超时是解析和连接全部地址的总时间: 依次尝试各地址, 每个地址分到剩余时间的均分,
+    前面的地址快速失败时, 没用完的时间留给后面的地址
+    """
+
+    def __init__(self, dns_cache: DNSCache):
+        self._dns_cache = dns_cache
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: SocketOptions = None,
+    ) -> httpcore.AsyncNetworkStream:
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            addresses = await asyncio.wait_for(
+                self._dns_cache.resolve(host, port), timeout
+            )
+        except asyncio.TimeoutError as err:
+            raise httpcore.ConnectTimeout(f"resolve {host} timed out") from err
+        except OSError as err:
+            raise httpcore.ConnectError(str(err)) from err
+
+        last_err: Optional[Exception] = None
+        for index, address in enumerate(addresses):
+            attempt_timeout = None
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    last_err = httpcore.ConnectTimeout(f"connect {host} timed out")
+                    break
+                attempt_timeout = remaining / (len(addresses) - index)
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=attempt_timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as err:
+                last_err = err
+        # 所有地址都连接失败, 缓存可能已过时
+        self._dns_cache.invalidate(host)
+        if last_err is None:
+            raise httpcore.ConnectError(f"no address resolved for host: {host}")
+        raise last_err
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: SocketOptions = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+dns_cache = DNSCache()
@@ -0,0 +1,119 @@
+"""
+从 HTML 页面的原始 bytes 中提取内嵌数据, 如 window._ROUTER_DATA = {...}
+
+先用 bytes.find 定位标记, 再用 json_path 的括号匹配扫描器截出紧随其后的一个 JSON 值:
+不需要把整个页面解码为 str, 也没有 (.*?)</script> 这类非贪婪正则的回溯,
+字符串中的 ; 或 </script> 等内容不会提前截断
+属性顺序或引号可能变化的标签(如 <script id="__NEXT_DATA__" ...>)用编译好的 bytes 正则作为标记
+
+扫描器是纯 Python 实现, 每越过一个括号都要回到解释器, 比 C 实现的整体解码慢,
+只在数据较小或目标位于数据开头时使用; 否则截取到 </script> 整体解码后按路径取值
+"""
+
+import os
+import re
+from typing import Any, Callable, Pattern, Union
+
+from utils import fast_json, json_path
+
+# 标记之后到 </script> 的数据不超过该字节数时直接用扫描器按路径提取
+SCAN_CUTOFF = int(os.getenv("PARSE_VIDEO_STATE_SCAN_CUTOFF", str(32 * 1024)))
+
+# 更大的数据中, 路径上的 key 都位于数据前这一比例之内时仍用扫描器,
+# 扫描速度约为整体解码的一半, 目标更靠后时整体解码更快
+SCAN_RATIO = 0.25
+
+# 标记和值之间的空白及赋值符号
+_VALUE_PREFIX = re.compile(rb"\s*=?\s*")
+
+_SCRIPT_END = b"</script"
+
+# 值之后的空白和语句结尾的 ;
+_TRAILING = b" \t\r\n;"
+
+_MISSING = object()
+
+Marker = Union[bytes, Pattern[bytes]]
+
+
+def find_state(page: bytes, marker: Marker, start: int = 0) -> int:
+    """
+    定位标记之后 JSON 值的起始位置
+    :param page: 页面内容
+    :param marker: 标记, 如 b"window._ROUTER_DATA"、b"var videoInfo =", 或 bytes 正则
+    :param start: 查找的起始位置
+    :return:
+    """
+    if isinstance(marker, bytes):
+        index = page.find(marker, start)
+        end = index + len(marker)
+    else:
+        match = marker.search(page, start)
+        index, end = (match.start(), match.end()) if match else (-1, -1)
+    if index < 0:
+        raise ValueError(f"embedded state not found: {marker!r}")
+    return _VALUE_PREFIX.match(page, end).end()
+
+
+def extract_state(
+    page: bytes,
+    marker: Marker,
+    path: json_path.JsonPath = (),
+    loads: Callable[[Any], Any] = fast_json.loads,
+    default: Any = _MISSING,
+) -> Any:
+    """
+    解码页面中标记之后的 JSON 值, 指定 path 时只解码其中的子树
+    :param page: 页面内容
+    :param marker: 标记, 如 b"window._ROUTER_DATA", 或 bytes 正则
+    :param path: 子树路径, 见 json_path.extract, 为空时解码整个值
+    :param loads: 解码函数, 含 undefined 等 JS 取值时使用 js_literal.loads
+    :param default: path 不存在时的返回值, 未指定时抛出 KeyError
+    :return:
+    """
+    start = find_state(page, marker)
+    end = _script_end(page, start)
+    if end - start > SCAN_CUTOFF and not _target_is_early(page, path, start, end):
+        try:
+            value = loads(page[start:end].rstrip(_TRAILING))
+        except ValueError:
+            # 同一个 <script> 中值之后还有其他语句, 如 A站 var videoInfo = {...}; var playInfo
+            pass
+        else:
+            return json_path.walk(value, path, default)
+    if default is _MISSING:
+        return json_path.extract(page, path, loads=loads, start=start)
+    return json_path.extract(page, path, loads=loads, default=default, start=start)
+
+
+def _script_end(page: bytes, start: int) -> int:
+    """
+    值所在 <script> 的结束位置, 没有时为页面末尾
+    内嵌数据中很少出现 <, 逐个检查比直接查找多字节的 </script 快
+    """
+    index = page.find(b"<", start)
+    while index >= 0 and not page.startswith(_SCRIPT_END, index):
+        index = page.find(b"<", index + 1)
+    return index if index >= 0 else len(page)
+
+
+def _target_is_early(
+    page: bytes, path: json_path.JsonPath, start: int, end: int
+) -> bool:
+    """
+    用 bytes.find 粗略定位路径中的 key, 扫描器需要依次越过它们, 目标不早于其中最靠后的一个
+    只在数据前 SCAN_RATIO 的范围内查找, key 含转义或不在范围内时按不在开头处理,
+    整体解码的结果同样正确
+    """
+    keys = [
+        step for step in path if isinstance(step, str) and step != json_path.WILDCARD
+    ]
+    if not keys:
+        return False
+    limit = start + int((end - start) * SCAN_RATIO)
+    for key in keys:
+        index = page.find(b'"' + key.encode() + b'"', start, limit)
+        if index < 0:
+            return False
+        start = index
+    return True
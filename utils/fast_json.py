@@ -0,0 +1,87 @@
+"""
+JSON 编解码: 已安装 orjson 或 msgspec 时使用它们, 否则使用标准库 json
+
+解析器统一通过 loads 解码接口响应和页面内嵌数据, 优先直接传入响应的 bytes, 省去先解码为 str 的一次拷贝
+dumps 直接把解析结果(dataclass)编码为 bytes, 不需要先转换为 dict
+"""
+
+import dataclasses
+import json
+import os
+from typing import Any, Callable, Dict, Tuple, Union
+
+# 使用的解码器: auto(按 orjson / msgspec / json 的顺序选择已安装的) 或指定其中之一
+JSON_BACKEND = os.getenv("PARSE_VIDEO_JSON_BACKEND", "auto")
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+def to_builtin(obj: Any) -> Any:
+    """
+    标准库 json / msgpack 不支持的类型的转换函数, 用作 default 参数
+    """
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _load_codecs() -> (
+    Tuple[Dict[str, Callable[[JsonInput], Any]], Dict[str, Callable[[Any], bytes]]]
+):
+    decoders: Dict[str, Callable[[JsonInput], Any]] = {}
+    encoders: Dict[str, Callable[[Any], bytes]] = {}
+    try:
+        import orjson
+    except ImportError:
+        pass
+    else:
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+        decoders["orjson"] = orjson.loads
+        encoders["orjson"] = orjson.dumps
+
+    try:
+        import msgspec
+    except ImportError:
+        pass
+    else:
+        msgspec_decode = msgspec.json.decode
+
+        def msgspec_loads(data: JsonInput) -> Any:
+            try:
+                return msgspec_decode(data)
+            except msgspec.DecodeError as err:
+                # 与其他解码器一致, 格式错误时抛出 ValueError
+                raise ValueError(str(err)) from err
+
+        decoders["msgspec"] = msgspec_loads
+        encoders["msgspec"] = msgspec.json.Encoder().encode
+
+    def json_loads(data: JsonInput) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), default=to_builtin
+        ).encode()
+
+    decoders["json"] = json_loads
+    encoders["json"] = json_dumps
+    return decoders, encoders
+
+
+# 当前环境可用的全部解码器 / 编码器, 按优先级排列
+DECODERS, ENCODERS = _load_codecs()
+
+if JSON_BACKEND == "auto":
+    BACKEND = next(iter(DECODERS))
+elif JSON_BACKEND in DECODERS:
+    BACKEND = JSON_BACKEND
+else:
+    raise ValueError(f"不支持的 JSON 解码器: {JSON_BACKEND}, 可选: {list(DECODERS)}")
+
+# 解码 JSON, 参数为 bytes / bytearray / memoryview / str, 格式错误时抛出 ValueError
+loads: Callable[[JsonInput], Any] = DECODERS[BACKEND]
+# 编码为 UTF-8 JSON bytes, 不转义非 ASCII 字符, 支持嵌套的 dataclass
+dumps: Callable[[Any], bytes] = ENCODERS[BACKEND]
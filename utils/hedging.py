@@ -0,0 +1,101 @@
+import collections
+import os
+from typing import Deque, Dict, Optional
+
+# 是否对幂等请求开启对冲: 请求超过该 host 的 p95 延迟仍未响应时再发一份, 取先返回的
+HEDGE_ENABLED = os.getenv("PARSE_VIDEO_HEDGE", "0") == "1"
+# 对冲请求最多占正常请求的比例, 按 host 分别计算
+HEDGE_BUDGET_RATIO = float(os.getenv("PARSE_VIDEO_HEDGE_BUDGET_RATIO", "0.1"))
+# 计算 p95 至少需要的样本数, 样本不足时不对冲
+HEDGE_MIN_SAMPLES = int(os.getenv("PARSE_VIDEO_HEDGE_MIN_SAMPLES", "20"))
+
+# 每个 host 保留的延迟样本数
+_WINDOW_SIZE = 200
+# 预算最多累积的对冲次数, 避免长时间空闲后集中对冲
+_MAX_BUDGET_TOKENS = 10.0
+
+
+class _HostHedgeState:
+    def __init__(self):
+        self.latencies: Deque[float] = collections.deque(maxlen=_WINDOW_SIZE)
+        self.tokens = 0.0
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+
+class HedgePolicy:
+    """
+    按 host 统计响应延迟, 决定何时发出对冲请求, 并用令牌桶限制对冲带来的额外流量
+    每个正常请求积累 budget_ratio 个令牌, 每次对冲消耗 1 个
+    """
+
+    def __init__(
+        self,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+    ):
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self._hosts: Dict[str, _HostHedgeState] = {}
+
+    def hedge_delay(self, host: str) -> Optional[float]:
+        """
+        返回发出对冲请求前的等待时间(该 host 的 p95 延迟), 样本不足时返回 None
+        """
+        state = self._get_state(host)
+        state.requests += 1
+        state.tokens = min(_MAX_BUDGET_TOKENS, state.tokens + self.budget_ratio)
+        if len(state.latencies) < self.min_samples:
+            return None
+        return _percentile(state.latencies, 0.95)
+
+    def try_hedge(self, host: str) -> bool:
+        """
+        预算充足时消耗一个令牌并返回 True
+        """
+        state = self._get_state(host)
+        if state.tokens < 1:
+            return False
+        state.tokens -= 1
+        state.hedges += 1
+        return True
+
+    def record(self, host: str, latency: float, hedge_won: bool = False) -> None:
+        """
+        记录请求的响应延迟(收到响应头为止)
+        """
+        state = self._get_state(host)
+        state.latencies.append(latency)
+        if hedge_won:
+            state.hedge_wins += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            host: {
+                "p95_ms": (
+                    round(_percentile(state.latencies, 0.95) * 1000, 1)
+                    if state.latencies
+                    else None
+                ),
+                "samples": len(state.latencies),
+                "requests": state.requests,
+                "hedges": state.hedges,
+                "hedge_wins": state.hedge_wins,
+            }
+            for host, state in self._hosts.items()
+        }
+
+    def _get_state(self, host: str) -> _HostHedgeState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostHedgeState()
+        return state
+
+
+def _percentile(values: Deque[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent))]
+
+
+hedge_policy = HedgePolicy()
@@ -0,0 +1,167 @@
+import asyncio
+import collections
+import os
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+
+# 每个上游 host 的并发上限: 初始值 / 最小值 / 最大值
+HOST_CONCURRENCY_INITIAL = float(os.getenv("PARSE_VIDEO_HOST_CONCURRENCY_INITIAL", "8"))
+HOST_CONCURRENCY_MIN = float(os.getenv("PARSE_VIDEO_HOST_CONCURRENCY_MIN", "1"))
+HOST_CONCURRENCY_MAX = float(os.getenv("PARSE_VIDEO_HOST_CONCURRENCY_MAX", "64"))
+# 遵守 Retry-After 时最多暂停多久(秒)
+RETRY_AFTER_MAX = float(os.getenv("PARSE_VIDEO_RETRY_AFTER_MAX", "10"))
+
+# 两次乘性减小之间的最小间隔(秒), 避免同一波限流响应把并发连续减半多次
+_DECREASE_INTERVAL = 1.0
+
+
+class _HostState:
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = collections.deque()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.successes = 0
+        self.throttles = 0
+
+
+class AdaptiveHostLimiter:
+    """
+    按上游 host 限制并发请求数, AIMD 自适应调整上限
+    请求成功时上限加性增加(每轮约 +1), 遇到限流时乘性减小, Retry-After 期间暂停发送
+    """
+
+    def __init__(
+        self,
+        initial: float = HOST_CONCURRENCY_INITIAL,
+        minimum: float = HOST_CONCURRENCY_MIN,
+        maximum: float = HOST_CONCURRENCY_MAX,
+        decrease_factor: float = 0.5,
+    ):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self._hosts: Dict[str, _HostState] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """
+        占用 host 的一个并发名额
+        """
+        await self.acquire(host)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    async def acquire(self, host: str) -> None:
+        state = self._get_state(host)
+        while True:
+            pause = state.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if state.in_flight < int(state.limit):
+                state.in_flight += 1
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            state.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in state.waiters:
+                    state.waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # 已被唤醒但取消了, 把名额让给下一个等待者
+                    self._wake(state)
+                raise
+
+    def release(self, host: str) -> None:
+        state = self._get_state(host)
+        state.in_flight -= 1
+        self._wake(state)
+
+    def on_success(self, host: str) -> None:
+        """
+        请求成功, 加性增加并发上限
+        """
+        state = self._get_state(host)
+        state.successes += 1
+        state.limit = min(self.maximum, state.limit + 1 / state.limit)
+        self._wake(state)
+
+    def on_throttle(self, host: str, retry_after: Optional[float] = None) -> None:
+        """
+        上游限流(429 / Retry-After / 平台风控信号), 乘性减小并发上限
+        :param host: 上游 host
+        :param retry_after: 上游要求的等待时间(秒)
+        """
+        state = self._get_state(host)
+        state.throttles += 1
+        now = time.monotonic()
+        if now - state.last_decrease >= _DECREASE_INTERVAL:
+            state.limit = max(self.minimum, state.limit * self.decrease_factor)
+            state.last_decrease = now
+        if retry_after:
+            state.paused_until = max(
+                state.paused_until, now + min(retry_after, RETRY_AFTER_MAX)
+            )
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        当前各 host 的并发上限与统计
+        """
+        now = time.monotonic()
+        return {
+            host: {
+                "limit": int(state.limit),
+                "in_flight": state.in_flight,
+                "waiting": len(state.waiters),
+                "paused_seconds": round(max(0.0, state.paused_until - now), 3),
+                "successes": state.successes,
+                "throttles": state.throttles,
+            }
+            for host, state in self._hosts.items()
+        }
+
+    def _get_state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial)
+        return state
+
+    @staticmethod
+    def _wake(state: _HostState) -> None:
+        free = int(state.limit) - state.in_flight
+        while free > 0 and state.waiters:
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头, 支持秒数和 HTTP 日期两种格式
+    :param value: 响应头的值
+    :return: 需要等待的秒数
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+host_limiter = AdaptiveHostLimiter()
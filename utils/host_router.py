@@ -0,0 +1,78 @@
+"""
+按链接的 host 分发到对应的值(如视频来源)
+
+注册的域名匹配自身及其全部子域名, 多个域名同时匹配时最长(最具体)的优先,
+如注册了 weibo.com 和 oasis.weibo.cn 时, m.oasis.weibo.cn 匹配后者, m.weibo.cn 都不匹配
+查找时先按完整 host 查表, 再依次去掉最左边的一级查找父域名, 耗时只与 host 的级数有关,
+与注册的域名数量和注册顺序无关; 只比较 host, 路径或参数中出现的域名不会误匹配
+"""
+
+from typing import Dict, Generic, Iterable, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+V = TypeVar("V")
+
+
+def get_host(url: str) -> str:
+    """
+    获取链接中的 host, 统一为小写并去掉端口和末尾的 .
+    :param url: 链接, 可以省略 scheme, 如 v.douyin.com/xxx
+    :return: 无法解析时返回空字符串
+    """
+    if "//" not in url:
+        url = "//" + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return ""
+    return (host or "").rstrip(".")
+
+
+class HostRouter(Generic[V]):
+    """
+    域名 -> 值 的路由表, 注册完成后只读
+    """
+
+    def __init__(self, routes: Iterable[Tuple[str, V]] = ()):
+        # 注册的域名 -> 值, 完整 host 和父域名都在这张表中查找
+        self._domains: Dict[str, V] = {}
+        for domain, value in routes:
+            self.add(domain, value)
+
+    def add(self, domain: str, value: V) -> None:
+        """
+        注册域名, 同时匹配它的子域名
+        :param domain: 域名, 如 weibo.com
+        :param value: 匹配时返回的值
+        :return:
+        """
+        domain = domain.lower().rstrip(".")
+        registered = self._domains.get(domain)
+        if registered is not None and registered != value:
+            raise ValueError(f"domain {domain} already routes to {registered}")
+        self._domains[domain] = value
+
+    def match_host(self, host: str) -> Optional[V]:
+        """
+        :param host: 小写的 host
+        :return: 最具体的匹配域名对应的值, 没有匹配时返回 None
+        """
+        domains = self._domains
+        while True:
+            value = domains.get(host)
+            if value is not None:
+                return value
+            _, dot, host = host.partition(".")
+            if not dot:
+                return None
+
+    def match(self, url: str) -> Optional[V]:
+        """
+        :param url: 链接
+        :return: 链接 host 对应的值, 没有匹配时返回 None
+        """
+        host = get_host(url)
+        return self.match_host(host) if host else None
+
+    def __len__(self) -> int:
+        return len(self._domains)
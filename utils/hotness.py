@@ -0,0 +1,87 @@
+import heapq
+import math
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class _HotEntry:
+    __slots__ = ("score", "updated_at", "payload", "due_at")
+
+    def __init__(self, payload: Any):
+        self.score = 0.0
+        self.updated_at = time.monotonic()
+        self.payload = payload
+        self.due_at: Optional[float] = None
+
+
+class HotKeyTracker:
+    """
+    按指数衰减的访问次数统计热点 key
+    每个 key 附带一个 payload (如重新解析的函数) 和需要刷新的时间, 供后台任务提前刷新
+    衰减后的热度不低于 min_score 的 key 才算热点; 低于 min_score 且超过一个半衰期没有访问的 key
+    热度只会继续下降, 在 top() 时移除, 不会因为跟踪的 key 少而一直留在热点中
+    """
+
+    def __init__(self, half_life: float, max_tracked: int, min_score: float = 2.0):
+        """
+        :param half_life: 访问次数衰减一半的时间(秒)
+        :param max_tracked: 最多跟踪的 key 数量, 超过时丢弃热度最低的一半
+        :param min_score: 成为热点需要的最低热度(衰减后的访问次数)
+        """
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        self.min_score = min_score
+        self._entries: Dict[Hashable, _HotEntry] = {}
+
+    def hit(self, key: Hashable, payload: Any) -> None:
+        """
+        记录一次访问
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= self.max_tracked:
+                self._prune()
+            entry = self._entries[key] = _HotEntry(payload)
+        now = time.monotonic()
+        entry.score = self._decayed(entry, now) + 1
+        entry.updated_at = now
+        entry.payload = payload
+
+    def set_due(self, key: Hashable, due_at: Optional[float]) -> None:
+        """
+        设置 key 需要刷新的时间(unix 时间戳), 为空表示无需刷新
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.due_at = due_at
+
+    def top(self, n: int) -> List[Tuple[Hashable, Any, Optional[float]]]:
+        """
+        当前最热的 n 个 key, 热度低于 min_score 的不返回
+        :return: (key, payload, 需要刷新的时间) 列表
+        """
+        now = time.monotonic()
+        candidates = []
+        for key, entry in list(self._entries.items()):
+            score = self._decayed(entry, now)
+            if score >= self.min_score:
+                candidates.append((score, key, entry))
+            elif now - entry.updated_at >= self.half_life:
+                del self._entries[key]
+        hottest = heapq.nlargest(n, candidates, key=lambda item: item[0])
+        return [(key, entry.payload, entry.due_at) for _, key, entry in hottest]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _decayed(self, entry: _HotEntry, now: float) -> float:
+        return entry.score * math.pow(0.5, (now - entry.updated_at) / self.half_life)
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        keep = heapq.nlargest(
+            self.max_tracked // 2,
+            self._entries.items(),
+            key=lambda item: self._decayed(item[1], now),
+        )
+        self._entries = dict(keep)
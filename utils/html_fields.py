@@ -0,0 +1,201 @@
+"""
+从 HTML 页面中按 CSS 选择器提取少量字段, 代替对整个页面构造 parsel.Selector
+
+选择器在定义时(模块导入时)通过 parsel 的 css2xpath 编译为 lxml XPath, 之后不再重复翻译
+页面分块交给 lxml.etree.HTMLPullParser 增量解析, 所有字段都已找到且所在元素已经结束时停止,
+不需要的后半部分页面既不解析也不下载(配合 page_stream.read_until_fields,
+同时需要内嵌数据时为 read_until_scripts 的 field_reader)
+XPath 查询要遍历已构建的整棵树, 因此先在原始 bytes 中查找选择器里的 id / class / 标签名,
+全部出现过之后才对该字段执行查询
+
+选择器语法与 parsel 一致, 支持 ::attr(name) 和 ::text, 每个字段取第一个匹配, 与 .get() 相同
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from lxml import etree
+from parsel.csstranslator import css2xpath
+
+# 一次交给解析器的字节数
+FEED_CHUNK_SIZE = 16 * 1024
+
+# 选择器中的 id / class 和 标签名
+_NAME_PATTERN = re.compile(r"[#.]([\w-]+)")
+_TAG_PATTERN = re.compile(r"(?:^|[\s>+~,])([a-zA-Z][\w-]*)")
+
+
+def _hints(css: str) -> List[bytes]:
+    """
+    匹配选择器的页面中一定会出现的内容(小写), 如 up-info、<video
+    """
+    css = css.split("::", 1)[0]
+    hints = [name.lower() for name in _NAME_PATTERN.findall(css)]
+    hints += ["<" + tag.lower() for tag in _TAG_PATTERN.findall(css)]
+    return [hint.encode() for hint in dict.fromkeys(hints)]
+
+
+def _element_closed(element) -> bool:
+    """
+    元素的结束标签是否已经解析: 它或它的某个祖先之后已经有内容
+    """
+    while element is not None:
+        if element.tail or element.getnext() is not None:
+            return True
+        element = element.getparent()
+    return False
+
+
+def _complete(result) -> bool:
+    """
+    XPath 的结果是否已经完整: 属性在开始标签解析后即完整, 文本需要所在元素已经结束
+    """
+    if not isinstance(result, etree._ElementUnicodeResult):
+        return True
+    owner = result.getparent()
+    if owner is None or result.is_attribute:
+        return True
+    if result.is_tail:
+        owner = owner.getparent()
+    return _element_closed(owner)
+
+
+class HtmlFields:
+    """
+    一组字段的选择器, 作为类属性定义, 导入时编译一次
+    """
+
+    def __init__(self, selectors: Dict[str, str], encoding: str = "utf-8"):
+        """
+        :param selectors: 字段名 -> CSS 选择器, 如 {"video_url": "video::attr(src)"}
+        :param encoding: 页面编码
+        """
+        self.encoding = encoding
+        self._xpaths = {
+            name: etree.XPath(css2xpath(css)) for name, css in selectors.items()
+        }
+        self._hints = {name: _hints(css) for name, css in selectors.items()}
+
+    def reader(self) -> "HtmlFieldReader":
+        return HtmlFieldReader(self._xpaths, self._hints, self.encoding)
+
+    def extract(
+        self, html: bytes, chunk_size: int = FEED_CHUNK_SIZE
+    ) -> Dict[str, Optional[str]]:
+        """
+        从已读取的页面中提取字段, 全部找到后不再解析剩余内容
+        :param html: 页面内容
+        :param chunk_size: 每次解析的字节数
+        :return: 字段名 -> 值, 未找到的字段为 None
+        """
+        reader = self.reader()
+        # 页面已经完整时先定位全部 hint 出现的位置, 连同之后一块内容一次交给解析器,
+        # 字段所在元素通常已经结束, 字段靠后时只解析一次、查询一轮, 不比整页解析慢
+        start = self._hints_end(html) + chunk_size
+        if reader.feed(html[:start]):
+            return reader.close()
+        for start in range(start, len(html), chunk_size):
+            end = start + chunk_size
+            if reader.feed(html[start:end]):
+                break
+        return reader.close()
+
+    def _hints_end(self, html: bytes) -> int:
+        """
+        所有 hint 都已出现的位置, 有 hint 不存在时为页面末尾
+        """
+        lowered = html.lower()
+        end = 0
+        for hints in self._hints.values():
+            for hint in hints:
+                index = lowered.find(hint)
+                if index < 0:
+                    return len(html)
+                end = max(end, index + len(hint))
+        return end
+
+
+class HtmlFieldReader:
+    """
+    单个页面的增量提取状态, 只在一个协程内使用
+    """
+
+    def __init__(
+        self,
+        xpaths: Dict[str, etree.XPath],
+        hints: Dict[str, List[bytes]],
+        encoding: str,
+    ):
+        # 只订阅根元素的 start 事件用来拿到正在构建的树, 不为每个元素产生事件
+        self._parser = etree.HTMLPullParser(
+            events=("start",), tag="html", encoding=encoding
+        )
+        self._pending = dict(xpaths)
+        # 字段 -> 还没有在页面中出现过的 hint
+        self._unseen = {name: list(field_hints) for name, field_hints in hints.items()}
+        # 上一块末尾的内容, 避免 hint 被分块截断
+        self._overlap = max((len(h) for hs in hints.values() for h in hs), default=1)
+        self._tail = b""
+        self._root = None
+        self.values: Dict[str, Optional[str]] = dict.fromkeys(xpaths)
+
+    @property
+    def done(self) -> bool:
+        return not self._pending
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        解析一块内容
+        :param chunk: 页面的下一块内容
+        :return: 全部字段是否都已找到
+        """
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            self._root = element
+
+        window = (self._tail + chunk).lower()
+        tail_start = max(0, len(window) - self._overlap)
+        self._tail = window[tail_start:]
+        for name in self._pending:
+            unseen = self._unseen[name]
+            if unseen:
+                unseen[:] = [hint for hint in unseen if hint not in window]
+        self._match(final=False)
+        return self.done
+
+    def close(self) -> Dict[str, Optional[str]]:
+        """
+        结束解析, 未找到的字段在完整的文档上再查找一次
+        :return: 字段名 -> 值, 未找到的字段为 None
+        """
+        if self._pending:
+            try:
+                self._root = self._parser.close()
+            except etree.XMLSyntaxError:
+                # 空页面等无法解析的情况, 保留已有结果
+                pass
+            self._match(final=True)
+        return self.values
+
+    def _match(self, final: bool) -> None:
+        if self._root is None:
+            return
+        for name, xpath in list(self._pending.items()):
+            if self._unseen[name] and not final:
+                continue
+            results = xpath(self._root)
+            if not results:
+                if final:
+                    del self._pending[name]
+                continue
+            result = results[0]
+            if not final and not _complete(result):
+                continue
+            if isinstance(result, str):
+                self.values[name] = str(result)
+            else:
+                # 选择器没有 ::attr / ::text 时返回元素本身的 HTML, 与 parsel 一致
+                self.values[name] = etree.tostring(
+                    result, encoding="unicode", with_tail=False
+                )
+            del self._pending[name]
@@ -0,0 +1,281 @@
+import asyncio
+import os
+import ssl
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import httpcore
+import httpx
+
+from .dns_cache import CachedDNSBackend, dns_cache
+from .hedging import HEDGE_ENABLED, hedge_policy
+from .host_limiter import host_limiter, parse_retry_after
+
+# 连接池参数, 可通过环境变量调整 (每个上游 host 独立计算)
+POOL_MAX_CONNECTIONS = int(os.getenv("PARSE_VIDEO_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("PARSE_VIDEO_POOL_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("PARSE_VIDEO_POOL_KEEPALIVE_EXPIRY", "30"))
+
+# 是否对配置了 http2_hosts 的平台开启 HTTP/2 多路复用, 需要安装 h2
+HTTP2_ENABLED = os.getenv("PARSE_VIDEO_HTTP2", "0") == "1"
+
+# 由连接池决定的 httpx.AsyncClient 参数, 传给 client() 时不会生效
+_TRANSPORT_KWARGS = frozenset(
+    ("transport", "mounts", "verify", "cert", "proxy", "http1", "http2", "limits")
+)
+
+
+class _HostRoutingTransport(httpx.AsyncBaseTransport):
+    """
+    按请求的 host 分发到对应的连接池, 跟随重定向跨域时同样生效
+    每个请求都经过 host_limiter 限制并发, 并根据响应状态调整上限
+    开启 PARSE_VIDEO_HEDGE 后, 幂等请求按 hedge_policy 发出对冲请求
+    client 关闭时不关闭连接池, 连接池的生命周期由 HttpClientRegistry 管理
+    """
+
+    def __init__(self, registry: "HttpClientRegistry"):
+        self._registry = registry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        transport = self._registry.get_transport(host)
+        if HEDGE_ENABLED and _is_idempotent(request):
+            return await self._send_hedged(host, transport, request)
+        return await self._send(host, transport, request)
+
+    async def _send_hedged(
+        self, host: str, transport: httpx.AsyncBaseTransport, request: httpx.Request
+    ) -> httpx.Response:
+        start = time.monotonic()
+        delay = hedge_policy.hedge_delay(host)
+        tasks = [asyncio.ensure_future(self._send(host, transport, request))]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and hedge_policy.try_hedge(host):
+                hedge = asyncio.ensure_future(self._send(host, transport, request))
+                tasks.append(hedge)
+
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in tasks:
+                    if task in done and task.exception() is None:
+                        winner = task
+                        break
+
+            if winner is None:
+                # 全部失败, 抛出原始请求的异常
+                return tasks[0].result()
+            hedge_policy.record(host, time.monotonic() - start, winner is not tasks[0])
+            return winner.result()
+        finally:
+            await _discard_losers(tasks, winner)
+
+    async def _send(
+        self, host: str, transport: httpx.AsyncBaseTransport, request: httpx.Request
+    ) -> httpx.Response:
+        # 收到响应头即释放名额, 响应体的读取不占用并发
+        async with host_limiter.slot(host):
+            response = await transport.handle_async_request(request)
+
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        if response.status_code == 429 or (
+            response.status_code == 503 and retry_after is not None
+        ):
+            host_limiter.on_throttle(host, retry_after)
+        elif response.status_code < 500:
+            host_limiter.on_success(host)
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+
+class _PoolTransport(httpx.AsyncHTTPTransport):
+    """
+    AsyncHTTPTransport 不支持自定义 network_backend, 这里改为使用 DNS 缓存的连接池
+    父类的请求转换、异常映射和关闭都只通过 self._pool 进行, 因此不调用父类的 __init__,
+    避免先创建一个不会使用的连接池
+    """
+
+    def __init__(
+        self,
+        ssl_context: ssl.SSLContext,
+        http2: bool,
+        limits: httpx.Limits,
+        network_backend: httpcore.AsyncNetworkBackend,
+    ):
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http2=http2,
+            network_backend=network_backend,
+        )
+
+
+def _is_idempotent(request: httpx.Request) -> bool:
+    # POST 请求可以通过 extensions={"idempotent": True} 声明自己可以安全重发
+    return request.method in ("GET", "HEAD") or bool(
+        request.extensions.get("idempotent")
+    )
+
+
+async def _discard_losers(
+    tasks: List[asyncio.Future], winner: Optional[asyncio.Future]
+) -> None:
+    """
+    取消未完成的对冲请求, 关闭没有被采用的响应
+    """
+    losers = [task for task in tasks if task is not winner]
+    for task in losers:
+        task.cancel()
+    results = await asyncio.gather(*losers, return_exceptions=True)
+    for result in results:
+        if isinstance(result, httpx.Response):
+            await result.aclose()
+
+
+class HttpClientRegistry:
+    """
+    进程级 HTTP 连接池注册表
+    每个上游 host 一个 keep-alive 连接池, 所有解析器共享, 避免每次请求重新握手
+    """
+
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.limits = limits or httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        )
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+        # 被替换下来、还没有关闭的连接池, 在 aclose 时关闭
+        self._retired: List[httpx.AsyncHTTPTransport] = []
+        self._http2_hosts: Set[str] = set()
+        self._ssl_context = ssl_context
+        self._network_backend = CachedDNSBackend(dns_cache)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._routing_transport = _HostRoutingTransport(self)
+
+    def client(self, **kwargs) -> httpx.AsyncClient:
+        """
+        创建复用连接池的 httpx.AsyncClient, 参数与 httpx.AsyncClient 一致
+        client 本身很轻量, 每次请求新建即可, cookie 等状态不会在请求间共享
+        连接相关的参数(verify / proxy / http2 / limits 等)由注册表统一管理, 传入时抛出 TypeError
+        """
+        unsupported = _TRANSPORT_KWARGS.intersection(kwargs)
+        if unsupported:
+            raise TypeError(
+                f"连接池参数由 HttpClientRegistry 管理, 不支持: {sorted(unsupported)}"
+            )
+        return httpx.AsyncClient(transport=self._routing_transport, **kwargs)
+
+    def get_transport(self, host: str) -> httpx.AsyncHTTPTransport:
+        """
+        获取 host 对应的连接池, 不存在时创建
+        """
+        self._check_event_loop()
+        transport = self._transports.get(host)
+        if transport is None:
+            transport = _PoolTransport(
+                ssl_context=self._get_ssl_context(),
+                http2=host in self._http2_hosts,
+                limits=self.limits,
+                network_backend=self._network_backend,
+            )
+            self._transports[host] = transport
+        return transport
+
+    def set_http2_hosts(self, hosts: Iterable[str]) -> None:
+        """
+        设置使用 HTTP/2 的 host, 同一 host 的并发请求共享一个多路复用连接
+        未开启 PARSE_VIDEO_HTTP2 或未安装 h2 时不生效
+        :param hosts: host 列表
+        """
+        if not HTTP2_ENABLED:
+            return
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("[WARN] 未安装 h2, HTTP/2 模式不可用, 继续使用 HTTP/1.1")
+            return
+        self._http2_hosts = set(hosts)
+        # 已创建的连接池按新配置重建, 旧连接池在当前事件循环中关闭, 没有运行中的事件循环时留到 aclose
+        self._retire_transports()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if loop is self._loop:
+            loop.create_task(self._close_retired())
+
+    async def open(self) -> None:
+        """
+        绑定当前事件循环, 在应用启动时调用
+        """
+        self._check_event_loop()
+
+    async def prewarm(self, hosts: Iterable[str], connections: int = 1) -> None:
+        """
+        预先建立到 host 的 keep-alive 连接, 连接失败的 host 忽略
+        :param hosts: host 列表
+        :param connections: 每个 host 预建的连接数
+        """
+
+        async def warm(client: httpx.AsyncClient, host: str) -> None:
+            try:
+                await client.head(f"https://{host}/")
+            except httpx.HTTPError as err:
+                print(f"[Prewarm] {host} 预热失败: {err!r}")
+
+        async with self.client(timeout=5.0) as client:
+            await asyncio.gather(
+                *(warm(client, host) for host in set(hosts) for _ in range(connections))
+            )
+
+    async def aclose(self) -> None:
+        """
+        关闭所有连接池, 在应用关闭时调用
+        """
+        self._retire_transports()
+        await self._close_retired()
+
+    def _retire_transports(self) -> None:
+        self._retired.extend(self._transports.values())
+        self._transports = {}
+
+    async def _close_retired(self) -> None:
+        retired, self._retired = self._retired, []
+        for transport in retired:
+            try:
+                await transport.aclose()
+            except Exception as err:
+                # 旧事件循环上的连接可能已无法正常关闭, 忽略
+                print(f"[HttpClient] 关闭旧连接池失败: {err!r}")
+
+    def _check_event_loop(self) -> None:
+        # 连接绑定在创建它的事件循环上, 事件循环变化时(如多次 asyncio.run)不再使用旧连接池,
+        # 旧连接池保留到 aclose 时关闭, 不会泄漏其中的 keep-alive 连接
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._retire_transports()
+            self._loop = loop
+
+    def _get_ssl_context(self):
+        # SSL 上下文创建开销较大, 所有连接池共用一个
+        if self._ssl_context is None:
+            self._ssl_context = httpx.create_ssl_context()
+        return self._ssl_context
+
+
+http_client_registry = HttpClientRegistry()
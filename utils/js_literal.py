@@ -0,0 +1,71 @@
+"""
+解析页面中内嵌的 JS 对象字面量, 如 window.__INITIAL_STATE__ = {...}
+
+这类数据基本是 JSON, 只是会出现 undefined 等 JSON 不支持的取值,
+先把字符串以外的 undefined 替换为 null, 再交给 json 的 C 实现解析
+NaN / Infinity / -Infinity 由 json 模块原生支持
+"""
+
+import json
+import re
+from typing import Any, Union
+
+_UNDEFINED = "undefined"
+
+# 被转义的引号: 前面有奇数个反斜杠
+_ESCAPED_QUOTE_PATTERN = re.compile(r'(?<!\\)(?:\\\\)*\\"')
+
+_decoder = json.JSONDecoder()
+
+
+def _is_identifier_char(char: str) -> bool:
+    return char.isalnum() or char in "_$."
+
+
+def _count_quotes(text: str, start: int, end: int) -> int:
+    """
+    统计 text[start:end] 中未被转义的双引号数量
+    """
+    quotes = text.count('"', start, end)
+    if text.find("\\\\", start, end) < 0:
+        return quotes - text.count('\\"', start, end)
+    return quotes - len(_ESCAPED_QUOTE_PATTERN.findall(text, start, end))
+
+
+def _replace_undefined(text: str) -> str:
+    # 只检查每个 undefined 之前未转义的引号数量, 偶数说明位于字符串之外
+    # 查找和计数都在 C 中完成, 不需要逐个匹配页面中上万个字符串
+    pieces = []
+    copied = counted = quotes = 0
+    index = text.find(_UNDEFINED)
+    while index >= 0:
+        end = index + len(_UNDEFINED)
+        quotes += _count_quotes(text, counted, index)
+        counted = index
+        if (
+            quotes % 2 == 0
+            and not (index > 0 and _is_identifier_char(text[index - 1]))
+            and not (end < len(text) and _is_identifier_char(text[end]))
+        ):
+            pieces.append(text[copied:index])
+            pieces.append("null")
+            copied = end
+        index = text.find(_UNDEFINED, end)
+    pieces.append(text[copied:])
+    return "".join(pieces)
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    """
+    解析 JS 对象字面量, undefined 解析为 None
+    对象之后的内容(如 ; 或其他脚本)会被忽略, 格式错误时抛出 json.JSONDecodeError(ValueError 子类)
+    :param text: 以对象或数组开头的文本, 开头的空白会被忽略, bytes 按 UTF-8 解码
+    :return:
+    """
+    if isinstance(text, (bytes, bytearray)):
+        text = text.decode()
+    text = text.lstrip()
+    if _UNDEFINED in text:
+        text = _replace_undefined(text)
+    value, _ = _decoder.raw_decode(text)
+    return value
@@ -0,0 +1,259 @@
+"""
+按路径从大段 JSON 文本中只解码需要的子树
+
+页面内嵌的 _ROUTER_DATA / __INITIAL_STATE__ 往往有几百 KB, 解析器只用到其中一小部分
+这里不构造整个文档, 而是沿路径扫描原始文本: 不需要的值只定位结束位置后跳过,
+命中路径的子树再切片交给解码器, 耗时和内存与用到的数据量相关, 与页面大小无关
+
+跳过值时用正则一次越过连续的非括号字符和完整的字符串, Python 层只处理括号,
+字符串中的括号和转义引号不会影响匹配; 支持 str 和 bytes
+"""
+
+import json
+import re
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, Union
+
+from utils import fast_json
+
+# 路径中匹配对象任意 key 的通配符, 按顺序返回第一个匹配剩余路径的子树
+WILDCARD = "*"
+
+JsonText = Union[str, bytes, bytearray]
+JsonPath = Sequence[Union[str, int]]
+
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_FLAT = r'[^"\[\]{}]'
+
+_MISSING = object()
+
+
+class _Syntax:
+    """
+    str 或 bytes 对应的正则和分隔符
+    """
+
+    def __init__(self, text_type: type):
+        if text_type is str:
+            self.convert: Callable[[str], Any] = str
+        else:
+            self.convert = str.encode
+
+        def compile_pattern(pattern: str) -> re.Pattern:
+            return re.compile(self.convert(pattern))
+
+        self.whitespace = compile_pattern(r"\s*")
+        self.string = compile_pattern(_STRING)
+        # 跳过连续的非括号字符和完整的字符串, 分组 1 为之后的括号, 遇到未闭合的字符串时为空
+        # 写成展开的循环 a*(?:b a*)*, 各部分互斥没有回溯; 括号可选保证匹配不会失败,
+        # 不用 finditer 是因为它在匹配失败时会从后续每个位置重试, 残缺的文本会退化为平方复杂度
+        self.next_bracket = compile_pattern(
+            rf"{_FLAT}*(?:{_STRING}{_FLAT}*)*([\[\]{{}}]?)"
+        )
+        # 数字 / true / false / null 及 undefined 等 JS 标识符,
+        # 页面中顶层的标量后面可能紧跟赋值语句的 ; 、函数调用的 ) 或 </script>
+        self.scalar = compile_pattern(r"[^,:;)<\]}\s]+")
+        self.quote, self.colon, self.comma = map(self.convert, '":,')
+        self.opening = tuple(map(self.convert, "{["))
+        self.closing = tuple(map(self.convert, "}]"))
+        self.lbrace, self.lbracket = self.opening
+        self.rbrace, self.rbracket = self.closing
+        self.backslash = self.convert("\\")
+
+
+_SYNTAX = {str: _Syntax(str), bytes: _Syntax(bytes)}
+
+
+def _syntax(data: JsonText) -> _Syntax:
+    return _SYNTAX[str if isinstance(data, str) else bytes]
+
+
+def _char_at(data: JsonText, pos: int) -> JsonText:
+    end = pos + 1
+    return data[pos:end]
+
+
+def find_value_end(data: JsonText, pos: int) -> int:
+    """
+    定位 JSON 值的结束位置, 不解码
+    :param data: JSON 文本
+    :param pos: 值的起始位置(不能是空白)
+    :return: 值之后第一个字符的位置
+    """
+    syntax = _syntax(data)
+    char = _char_at(data, pos)
+    if char == syntax.quote:
+        match = syntax.string.match(data, pos)
+        if match is None:
+            raise ValueError(f"unterminated string at {pos}")
+        return match.end()
+    if char not in syntax.opening:
+        match = syntax.scalar.match(data, pos)
+        if match is None:
+            raise ValueError(f"expecting value at {pos}")
+        return match.end()
+
+    depth = 0
+    while True:
+        if char in syntax.opening:
+            depth += 1
+        elif char in syntax.closing:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        else:
+            # 文本结束或字符串未闭合
+            raise ValueError(f"unterminated value at {pos}")
+        match = syntax.next_bracket.match(data, pos + 1)
+        pos = match.start(1)
+        char = match.group(1)
+
+
+def _skip_whitespace(data: JsonText, pos: int, syntax: _Syntax) -> int:
+    return syntax.whitespace.match(data, pos).end()
+
+
+def _members(data: JsonText, pos: int, syntax: _Syntax) -> Iterator[Tuple[Any, int]]:
+    """
+    遍历 pos 处对象的成员, 返回 (未转义的原始 key 文本, 值的起始位置)
+    """
+    pos = _skip_whitespace(data, pos + 1, syntax)
+    if _char_at(data, pos) == syntax.rbrace:
+        return
+    while True:
+        match = syntax.string.match(data, pos)
+        if match is None:
+            raise ValueError(f"expecting property name at {pos}")
+        key = match.group()
+        pos = _skip_whitespace(data, match.end(), syntax)
+        if _char_at(data, pos) != syntax.colon:
+            raise ValueError(f"expecting ':' at {pos}")
+        pos = _skip_whitespace(data, pos + 1, syntax)
+        yield key, pos
+
+        pos = _skip_whitespace(data, find_value_end(data, pos), syntax)
+        char = _char_at(data, pos)
+        if char == syntax.rbrace:
+            return
+        if char != syntax.comma:
+            raise ValueError(f"expecting ',' at {pos}")
+        pos = _skip_whitespace(data, pos + 1, syntax)
+
+
+def _elements(data: JsonText, pos: int, syntax: _Syntax) -> Iterator[int]:
+    """
+    遍历 pos 处数组的元素, 返回元素的起始位置
+    """
+    pos = _skip_whitespace(data, pos + 1, syntax)
+    if _char_at(data, pos) == syntax.rbracket:
+        return
+    while True:
+        yield pos
+        pos = _skip_whitespace(data, find_value_end(data, pos), syntax)
+        char = _char_at(data, pos)
+        if char == syntax.rbracket:
+            return
+        if char != syntax.comma:
+            raise ValueError(f"expecting ',' at {pos}")
+        pos = _skip_whitespace(data, pos + 1, syntax)
+
+
+def _key_matches(raw_key: Any, key: str, syntax: _Syntax) -> bool:
+    if syntax.backslash not in raw_key:
+        return raw_key[1:-1] == syntax.convert(key)
+    return json.loads(raw_key) == key
+
+
+def _locate(data: JsonText, pos: int, path: JsonPath, syntax: _Syntax) -> Optional[int]:
+    for rest, step in enumerate(path, 1):
+        char = _char_at(data, pos)
+        if isinstance(step, int):
+            if char != syntax.lbracket:
+                return None
+            for index, start in enumerate(_elements(data, pos, syntax)):
+                if index == step:
+                    pos = start
+                    break
+            else:
+                return None
+        elif step == WILDCARD:
+            if char != syntax.lbrace:
+                return None
+            for _, start in _members(data, pos, syntax):
+                found = _locate(data, start, path[rest:], syntax)
+                if found is not None:
+                    return found
+            return None
+        else:
+            if char != syntax.lbrace:
+                return None
+            for raw_key, start in _members(data, pos, syntax):
+                if _key_matches(raw_key, step, syntax):
+                    pos = start
+                    break
+            else:
+                return None
+    return pos
+
+
+def extract(
+    data: JsonText,
+    path: JsonPath,
+    loads: Callable[[Any], Any] = fast_json.loads,
+    default: Any = _MISSING,
+    start: int = 0,
+) -> Any:
+    """
+    解码 JSON 文本中路径指向的子树, 路径之外的内容只扫描不解码
+    :param data: JSON 文本, 值之后的内容(如 ;</script>)会被忽略
+    :param path: key(str) / 数组下标(int) / WILDCARD 组成的路径,
+        如 ("loaderData", WILDCARD, "videoInfoRes", "item_list", 0)
+    :param loads: 子树的解码函数, 含 undefined 等 JS 取值时使用 js_literal.loads
+    :param default: 路径不存在时的返回值, 未指定时抛出 KeyError
+    :param start: JSON 值在 data 中的起始位置, 之前的空白会被忽略
+    :return:
+    """
+    syntax = _syntax(data)
+    found = _locate(data, _skip_whitespace(data, start, syntax), path, syntax)
+    if found is None:
+        if default is _MISSING:
+            raise KeyError(".".join(map(str, path)))
+        return default
+    end = find_value_end(data, found)
+    return loads(data[found:end])
+
+
+def _walk(value: Any, path: JsonPath) -> Any:
+    for rest, step in enumerate(path, 1):
+        if isinstance(step, int):
+            if not isinstance(value, list) or not 0 <= step < len(value):
+                return _MISSING
+            value = value[step]
+        elif step == WILDCARD:
+            if not isinstance(value, dict):
+                return _MISSING
+            for item in value.values():
+                found = _walk(item, path[rest:])
+                if found is not _MISSING:
+                    return found
+            return _MISSING
+        else:
+            if not isinstance(value, dict) or step not in value:
+                return _MISSING
+            value = value[step]
+    return value
+
+
+def walk(value: Any, path: JsonPath, default: Any = _MISSING) -> Any:
+    """
+    在已解码的值中按路径取子树, 路径含义与 extract 相同
+    :param value: 解码后的 dict / list
+    :param path: 见 extract
+    :param default: 路径不存在时的返回值, 未指定时抛出 KeyError
+    :return:
+    """
+    found = _walk(value, path)
+    if found is _MISSING:
+        if default is _MISSING:
+            raise KeyError(".".join(map(str, path)))
+        return default
+    return found
@@ -0,0 +1,268 @@
+import asyncio
+import itertools
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional
+
+# 签名等 JS 函数的 Node 常驻进程数 / 单次调用超时(秒) / 健康检查间隔(秒)
+NODE_POOL_SIZE = int(os.getenv("PARSE_VIDEO_NODE_POOL_SIZE", "2"))
+NODE_POOL_TIMEOUT = float(os.getenv("PARSE_VIDEO_NODE_POOL_TIMEOUT", "5"))
+NODE_POOL_HEALTH_INTERVAL = float(
+    os.getenv("PARSE_VIDEO_NODE_POOL_HEALTH_INTERVAL", "30")
+)
+
+# 单行响应的最大长度
+_LINE_LIMIT = 1 << 20
+# 按行 JSON 协议执行 JS 全局函数的常驻脚本
+_WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "signer_worker.js"
+)
+
+
+class NodeWorkerError(Exception):
+    """
+    Node 进程不可用、调用超时或 JS 函数抛出异常
+    """
+
+
+class _NodeWorker:
+    """
+    一个 Node 常驻进程, 请求按 id 匹配响应
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None and not self._reader.done()
+
+    async def call(
+        self, request_id: int, method: str, args: tuple, timeout: float
+    ) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        request = {"id": request_id, "method": method, "args": list(args)}
+        try:
+            self.process.stdin.write(json.dumps(request).encode() + b"\n")
+            await self.process.stdin.drain()
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # 进程可能卡死, 结束后由连接池重启
+            self.kill()
+            raise NodeWorkerError(f"node worker call timeout: {method}")
+        except (BrokenPipeError, ConnectionResetError) as err:
+            raise NodeWorkerError(f"node worker exited: {err!r}") from err
+        finally:
+            self.pending.pop(request_id, None)
+
+    def kill(self) -> None:
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def aclose(self) -> None:
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), 1.0)
+            except asyncio.TimeoutError:
+                self.kill()
+                await self.process.wait()
+        self._reader.cancel()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    # JS 文件中的 console.log 或 Node 警告等非协议输出, 忽略
+                    print(f"[NodePool] 忽略非 JSON 输出: {line[:200]!r}")
+                    continue
+                future = self.pending.get(message.get("id"))
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(NodeWorkerError(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(NodeWorkerError("node worker exited"))
+
+
+class NodeWorkerPool:
+    """
+    Node 常驻进程池, 每个进程启动时加载一次 JS 文件, 之后通过管道调用其中的全局函数
+    调用分配给负载最低的进程; 进程崩溃或超时后自动重启, 后台定期 ping 做健康检查
+    """
+
+    def __init__(
+        self,
+        script_path: str,
+        size: int = NODE_POOL_SIZE,
+        timeout: float = NODE_POOL_TIMEOUT,
+        health_interval: float = NODE_POOL_HEALTH_INTERVAL,
+    ):
+        """
+        :param script_path: 要加载的 JS 文件
+        :param size: 进程数
+        :param timeout: 单次调用超时(秒)
+        :param health_interval: 健康检查间隔(秒)
+        """
+        self.script_path = script_path
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.calls = 0
+        self.errors = 0
+        self.restarts = 0
+        self._workers: List[Optional[_NodeWorker]] = [None] * self.size
+        self._spawning: List[Optional[asyncio.Future]] = [None] * self.size
+        self._ids = itertools.count(1)
+        self._health_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def call(self, method: str, *args) -> Any:
+        """
+        调用 JS 全局函数
+        :param method: 函数名
+        :param args: 参数, 需要可 JSON 序列化
+        :return:
+        """
+        self.calls += 1
+        try:
+            worker = await self._get_worker()
+            return await worker.call(next(self._ids), method, args, self.timeout)
+        except NodeWorkerError:
+            self.errors += 1
+            raise
+
+    async def start(self) -> None:
+        """
+        预先启动全部进程, 启动失败时忽略, 调用时再重试
+        """
+        self._check_event_loop()
+        await asyncio.gather(
+            *(self._ensure_worker(index) for index in range(self.size)),
+            return_exceptions=True,
+        )
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        workers, self._workers = self._workers, [None] * self.size
+        for worker in workers:
+            if worker is not None:
+                await worker.aclose()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "alive": sum(1 for w in self._workers if w is not None and w.alive),
+            "in_flight": sum(
+                len(w.pending) for w in self._workers if w is not None and w.alive
+            ),
+            "calls": self.calls,
+            "errors": self.errors,
+            "restarts": self.restarts,
+        }
+
+    async def _get_worker(self) -> _NodeWorker:
+        self._check_event_loop()
+        if self._health_task is None:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+        # 优先补齐不可用的进程, 否则选择等待响应最少的进程
+        def load(index: int) -> int:
+            worker = self._workers[index]
+            return -1 if worker is None or not worker.alive else len(worker.pending)
+
+        index = min(range(self.size), key=load)
+        return await self._ensure_worker(index)
+
+    async def _ensure_worker(self, index: int) -> _NodeWorker:
+        worker = self._workers[index]
+        if worker is not None and worker.alive:
+            return worker
+
+        # 同一槽位的并发调用共用一次启动
+        spawning = self._spawning[index]
+        if spawning is None:
+            spawning = self._spawning[index] = asyncio.ensure_future(self._spawn())
+            if worker is not None:
+                self.restarts += 1
+        try:
+            worker = await asyncio.shield(spawning)
+        finally:
+            if self._spawning[index] is spawning and spawning.done():
+                self._spawning[index] = None
+        self._workers[index] = worker
+        return worker
+
+    async def _spawn(self) -> _NodeWorker:
+        node = shutil.which("node")
+        if node is None:
+            raise NodeWorkerError("node 未安装")
+        if not os.path.exists(self.script_path):
+            raise NodeWorkerError(f"JS 文件不存在: {self.script_path}")
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                node,
+                _WORKER_SCRIPT,
+                self.script_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                limit=_LINE_LIMIT,
+            )
+        except OSError as err:
+            raise NodeWorkerError(f"node 进程启动失败: {err!r}") from err
+        worker = _NodeWorker(process)
+        try:
+            # 确认 JS 文件加载成功
+            await worker.call(0, "__ping__", (), self.timeout)
+        except NodeWorkerError:
+            await worker.aclose()
+            raise
+        return worker
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for index in range(self.size):
+                worker = self._workers[index]
+                try:
+                    if worker is not None and worker.alive:
+                        await worker.call(next(self._ids), "__ping__", (), self.timeout)
+                    else:
+                        await self._ensure_worker(index)
+                except NodeWorkerError as err:
+                    print(f"[NodePool] worker {index} 健康检查失败: {err}")
+                    if worker is not None:
+                        worker.kill()
+
+    def _check_event_loop(self) -> None:
+        # 子进程管道绑定在创建它的事件循环上, 事件循环变化时(如多次 asyncio.run)丢弃旧进程
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            for worker in self._workers:
+                if worker is not None:
+                    worker.kill()
+            self._workers = [None] * self.size
+            self._spawning = [None] * self.size
+            self._health_task = None
+            self._loop = loop
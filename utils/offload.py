@@ -0,0 +1,172 @@
+"""
+把解析器中 CPU 密集的提取步骤(大段 JSON / JS 对象解码、HTML 解析)交给执行器, 避免阻塞事件循环
+
+- PARSE_VIDEO_OFFLOAD=thread: 线程池, 没有序列化开销; 提取仍持有 GIL, 但解释器每隔几毫秒切换线程,
+  事件循环不会被一次提取整段阻塞
+- PARSE_VIDEO_OFFLOAD=process: 进程池, 完全不占用事件循环所在进程的 CPU,
+  但参数和结果需要 pickle, 提取函数必须是模块级函数或类的静态方法
+- PARSE_VIDEO_OFFLOAD=none: 在事件循环中直接执行
+
+只有输入不小于 PARSE_VIDEO_OFFLOAD_THRESHOLD 字节时才交给执行器, 小页面直接执行更快
+loop_lag 定期测量事件循环的调度延迟, 与 extraction_offloader 的统计一起在 /api/stats 中查看效果
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+# 执行器: none / thread / process
+OFFLOAD_MODE = os.getenv("PARSE_VIDEO_OFFLOAD", "thread")
+# 输入不小于该字节数时交给执行器
+OFFLOAD_THRESHOLD = int(os.getenv("PARSE_VIDEO_OFFLOAD_THRESHOLD", str(256 * 1024)))
+# 执行器的线程 / 进程数
+OFFLOAD_WORKERS = int(
+    os.getenv("PARSE_VIDEO_OFFLOAD_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# 事件循环延迟的采样间隔(秒)
+LOOP_LAG_INTERVAL = float(os.getenv("PARSE_VIDEO_LOOP_LAG_INTERVAL", "0.1"))
+
+MODES = ("none", "thread", "process")
+
+T = TypeVar("T")
+
+
+class ExtractionOffloader:
+    """
+    按输入大小决定直接执行还是交给线程池 / 进程池, 执行器在第一次使用时创建
+    """
+
+    def __init__(
+        self,
+        mode: str = OFFLOAD_MODE,
+        threshold: int = OFFLOAD_THRESHOLD,
+        workers: int = OFFLOAD_WORKERS,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"不支持的执行器: {mode}, 可选: {MODES}")
+        self.mode = mode
+        self.threshold = threshold
+        self.workers = workers
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self.inline = 0
+        self.offloaded = 0
+        self.offloaded_bytes = 0
+        self.offloaded_seconds = 0.0
+
+    def _get_executor(self) -> concurrent.futures.Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn 启动的子进程不继承事件循环、连接池和 Node 进程等状态
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="parse-extract"
+                )
+        return self._executor
+
+    async def run(
+        self, func: Callable[..., T], data: bytes, *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        执行 func(data, *args, **kwargs)
+        :param func: 提取函数, 进程池模式下必须可以 pickle
+        :param data: 页面或响应内容, 按其长度决定是否交给执行器
+        :return: func 的返回值
+        """
+        if self.mode == "none" or len(data) < self.threshold:
+            self.inline += 1
+            return func(data, *args, **kwargs)
+
+        self.offloaded += 1
+        self.offloaded_bytes += len(data)
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(), functools.partial(func, data, *args, **kwargs)
+            )
+        finally:
+            self.offloaded_seconds += time.perf_counter() - start
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "offloaded_bytes": self.offloaded_bytes,
+            "offloaded_avg_ms": (
+                round(self.offloaded_seconds / self.offloaded * 1000, 2)
+                if self.offloaded
+                else None
+            ),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class LoopLagMonitor:
+    """
+    每隔 interval 秒 sleep 一次, 实际唤醒时间与预期的差值即事件循环的调度延迟,
+    同步执行的 CPU 密集代码越多, 延迟越大
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+        # 延迟超过 10ms / 100ms 的次数
+        self.over_10ms = 0
+        self.over_100ms = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        self.samples += 1
+        self.last = lag
+        self.total += lag
+        self.max = max(self.max, lag)
+        if lag > 0.01:
+            self.over_10ms += 1
+        if lag > 0.1:
+            self.over_100ms += 1
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "last_ms": round(self.last * 1000, 2),
+            "avg_ms": round(self.total / self.samples * 1000, 2) if self.samples else 0,
+            "max_ms": round(self.max * 1000, 2),
+            "over_10ms": self.over_10ms,
+            "over_100ms": self.over_100ms,
+        }
+
+
+extraction_offloader = ExtractionOffloader()
+loop_lag = LoopLagMonitor()
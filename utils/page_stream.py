@@ -0,0 +1,123 @@
+"""
+流式读取 HTML 页面, 需要的内容到达后提前结束, 不等待页面剩余部分
+
+提前结束是用连接复用换取延迟: 响应没有读完的连接不能放回连接池, 只能关闭,
+下一个请求需要重新建连和 TLS 握手
+剩余内容不超过 PARSE_VIDEO_STREAM_DRAIN_LIMIT 字节时会先读完再放回连接池;
+分块传输(没有 content-length)的响应最多再读这么多字节, 仍未结束则关闭连接
+调大该值可以复用更多连接, 代价是多下载页面末尾的内容; 设为 0 时提前结束总是关闭连接
+"""
+
+import os
+from typing import AsyncIterator, Dict, Optional, Sequence
+
+import httpx
+
+from .html_fields import HtmlFieldReader, HtmlFields
+
+# 流式读取页面时的最大字节数, 超过后放弃解析
+PAGE_MAX_BYTES = int(os.getenv("PARSE_VIDEO_PAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# 提前结束读取时, 剩余内容不超过该字节数则读完, 以便连接放回连接池复用
+STREAM_DRAIN_LIMIT = int(os.getenv("PARSE_VIDEO_STREAM_DRAIN_LIMIT", str(64 * 1024)))
+
+_SCRIPT_END = b"</script>"
+
+
+async def read_until_scripts(
+    response: httpx.Response,
+    markers: Sequence[bytes],
+    max_bytes: int = PAGE_MAX_BYTES,
+    field_reader: Optional[HtmlFieldReader] = None,
+) -> bytes:
+    """
+    分块读取 HTML 响应, 所有 marker 之后的 </script> 都已到达时停止读取
+    未找到全部 marker 时读到响应结束为止
+    :param response: client.stream() 返回的响应, 响应体尚未读取
+    :param markers: 需要等待的标记, 如 b"window._ROUTER_DATA"
+    :param max_bytes: 最大读取字节数, 超过时抛出 ValueError
+    :param field_reader: 同时需要的页面字段, 每块内容也交给它增量解析, 字段全部找到后才停止,
+        结果由调用方 close() 获取
+    :return: 已读取的内容
+    """
+    buffer = bytearray()
+    # marker -> 下次查找的起始位置; 找到 marker 后改为查找 </script>
+    marker_search_from: Dict[bytes, int] = {marker: 0 for marker in markers}
+    script_search_from: Dict[bytes, int] = {}
+
+    chunks = response.aiter_bytes()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            await response.aclose()
+            raise ValueError(f"page exceeds max bytes: {max_bytes}")
+        _scan(buffer, marker_search_from, script_search_from)
+        if field_reader is not None and not field_reader.done:
+            field_reader.feed(chunk)
+        if (
+            not marker_search_from
+            and not script_search_from
+            and (field_reader is None or field_reader.done)
+        ):
+            await _finish(response, chunks)
+            break
+
+    return bytes(buffer)
+
+
+async def read_until_fields(
+    response: httpx.Response,
+    fields: HtmlFields,
+    max_bytes: int = PAGE_MAX_BYTES,
+) -> Dict[str, Optional[str]]:
+    """
+    分块读取 HTML 响应并增量解析, 所有字段都已提取时停止读取
+    :param response: client.stream() 返回的响应, 响应体尚未读取
+    :param fields: 需要提取的字段
+    :param max_bytes: 最大读取字节数, 超过时抛出 ValueError
+    :return: 字段名 -> 值, 未找到的字段为 None
+    """
+    reader = fields.reader()
+    chunks = response.aiter_bytes()
+    async for chunk in chunks:
+        if response.num_bytes_downloaded > max_bytes:
+            await response.aclose()
+            raise ValueError(f"page exceeds max bytes: {max_bytes}")
+        if reader.feed(chunk):
+            await _finish(response, chunks)
+            break
+
+    return reader.close()
+
+
+def _scan(
+    buffer: bytearray,
+    marker_search_from: Dict[bytes, int],
+    script_search_from: Dict[bytes, int],
+) -> None:
+    for marker, start in list(marker_search_from.items()):
+        index = buffer.find(marker, start)
+        if index < 0:
+            marker_search_from[marker] = max(0, len(buffer) - len(marker) + 1)
+            continue
+        del marker_search_from[marker]
+        script_search_from[marker] = index + len(marker)
+
+    for marker, start in list(script_search_from.items()):
+        if buffer.find(_SCRIPT_END, start) >= 0:
+            del script_search_from[marker]
+        else:
+            script_search_from[marker] = max(start, len(buffer) - len(_SCRIPT_END) + 1)
+
+
+async def _finish(response: httpx.Response, chunks: AsyncIterator[bytes]) -> None:
+    """
+    提前结束读取: 剩余内容不超过 STREAM_DRAIN_LIMIT 时读完, 连接放回连接池, 否则关闭连接
+    """
+    content_length = response.headers.get("content-length", "")
+    drain_until = response.num_bytes_downloaded + STREAM_DRAIN_LIMIT
+    if not content_length.isdigit() or int(content_length) <= drain_until:
+        async for _ in chunks:
+            if response.num_bytes_downloaded > drain_until:
+                break
+    await response.aclose()
@@ -0,0 +1,60 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 主方案迟迟没有结果时, 多久后并发启动兜底方案(秒), 0 表示同时启动
+FALLBACK_DELAY = float(os.getenv("PARSE_VIDEO_FALLBACK_DELAY", "1.0"))
+
+
+async def race_with_fallback(
+    primary: Callable[[], Awaitable[T]],
+    fallback: Callable[[], Awaitable[T]],
+    delay: float = FALLBACK_DELAY,
+    accept_fallback: Optional[Callable[[T], bool]] = None,
+) -> T:
+    """
+    先启动主方案, delay 秒内未成功(或已失败)则并发启动兜底方案, 取先成功的结果并取消另一个
+    :param primary: 主方案
+    :param fallback: 兜底方案
+    :param delay: 启动兜底方案前等待主方案的时间(秒)
+    :param accept_fallback: 兜底结果是否可以直接采用, 返回 False 时继续等待主方案,
+        主方案失败后再使用该兜底结果
+    :return:
+    """
+    primary_task = asyncio.ensure_future(primary())
+    fallback_task: Optional[asyncio.Future] = None
+    fallback_result = None
+    has_fallback_result = False
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if primary_task in done and primary_task.exception() is None:
+            return primary_task.result()
+
+        fallback_task = asyncio.ensure_future(fallback())
+        pending = {primary_task, fallback_task} - done
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            if primary_task in done and primary_task.exception() is None:
+                return primary_task.result()
+            if fallback_task in done and fallback_task.exception() is None:
+                fallback_result = fallback_task.result()
+                has_fallback_result = True
+                if accept_fallback is None or accept_fallback(fallback_result):
+                    return fallback_result
+
+        if has_fallback_result:
+            return fallback_result
+        # 都失败时抛出兜底方案的异常, 与顺序执行时的表现一致
+        raise fallback_task.exception()
+    finally:
+        for task in (primary_task, fallback_task):
+            if task is not None and not task.done():
+                task.cancel()
+        await asyncio.gather(
+            *(task for task in (primary_task, fallback_task) if task is not None),
+            return_exceptions=True,
+        )
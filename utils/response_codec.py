@@ -0,0 +1,98 @@
+"""
+接口响应编码: 按请求的 Accept 头选择 JSON 或 MessagePack, 直接编码为 bytes
+
+解析结果中的 dataclass 由编码器直接处理, 不经过 FastAPI 的 jsonable_encoder 逐层转换
+MessagePack 需要安装 msgspec 或 msgpack, 都没有安装时始终返回 JSON
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import fast_json
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Accept 中表示 MessagePack 的类型
+_MSGPACK_ACCEPT = (
+    "application/msgpack",
+    "application/x-msgpack",
+    "application/vnd.msgpack",
+)
+
+
+def _load_msgpack_encoder() -> Optional[Callable[[Any], bytes]]:
+    try:
+        import msgspec
+    except ImportError:
+        pass
+    else:
+        return msgspec.msgpack.Encoder().encode
+
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    packer = msgpack.Packer(default=fast_json.to_builtin)
+    return packer.pack
+
+
+# 媒体类型 -> 编码函数
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {JSON_MEDIA_TYPE: fast_json.dumps}
+_msgpack_encoder = _load_msgpack_encoder()
+if _msgpack_encoder is not None:
+    ENCODERS[MSGPACK_MEDIA_TYPE] = _msgpack_encoder
+
+
+def _parse_accept(accept: str) -> Dict[str, float]:
+    """
+    解析 Accept 头, 返回 媒体范围 -> q 值, 同一媒体范围出现多次时取最大的 q
+    """
+    ranges: Dict[str, float] = {}
+    for item in accept.lower().split(","):
+        media_range, *params = item.split(";")
+        media_range = media_range.strip()
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_range] = max(quality, ranges.get(media_range, 0.0))
+    return ranges
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    根据 Accept 头选择响应的媒体类型, 只有明确请求 MessagePack 且可用时才使用, 否则为 JSON
+    MessagePack 的 q 值为 0 或低于 JSON(含 application/* 和 */*)时同样返回 JSON
+    :param accept: 请求的 Accept 头
+    :return:
+    """
+    if not accept or MSGPACK_MEDIA_TYPE not in ENCODERS:
+        return JSON_MEDIA_TYPE
+    ranges = _parse_accept(accept)
+    msgpack_quality = max(ranges.get(media_type, 0.0) for media_type in _MSGPACK_ACCEPT)
+    if msgpack_quality <= 0:
+        return JSON_MEDIA_TYPE
+    # 按最具体的媒体范围确定 JSON 的 q 值
+    for media_range in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+        if media_range in ranges:
+            if ranges[media_range] > msgpack_quality:
+                return JSON_MEDIA_TYPE
+            break
+    return MSGPACK_MEDIA_TYPE
+
+
+def encode(payload: Any, accept: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    编码响应
+    :param payload: 响应内容, 可以包含 dataclass
+    :param accept: 请求的 Accept 头
+    :return: 编码后的内容 和 媒体类型
+    """
+    media_type = negotiate(accept)
+    return ENCODERS[media_type](payload), media_type
@@ -0,0 +1,28 @@
+import dataclasses
+import os
+from typing import Dict, List, Tuple
+
+from .ttl_cache import TTLCache
+
+# 短链接跳转结果缓存: 有效期(秒) / 最大条数
+SHORT_LINK_CACHE_TTL = float(os.getenv("PARSE_VIDEO_SHORT_LINK_CACHE_TTL", "3600"))
+SHORT_LINK_CACHE_SIZE = int(os.getenv("PARSE_VIDEO_SHORT_LINK_CACHE_SIZE", "10000"))
+
+
+@dataclasses.dataclass(frozen=True)
+class ShortLinkResolution:
+    """
+    短链接跳转结果
+    """
+
+    # 跳转地址
+    location: str
+
+    # 跳转响应的响应头
+    headers: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
+
+    # 跳转响应设置的 cookie
+    cookies: Dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+short_link_cache = TTLCache(maxsize=SHORT_LINK_CACHE_SIZE, ttl=SHORT_LINK_CACHE_TTL)
@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    合并相同 key 的并发调用: 同一时刻只执行一次, 所有调用方共享其结果或异常
+    调用在独立的 task 中执行, 某个调用方被取消不会影响其他调用方
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        :param key: 调用的唯一标识
+        :param func: 没有进行中的相同调用时执行的函数
+        :return:
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # 所有调用方都已取消时, 避免 "exception was never retrieved" 警告
+        if not future.cancelled():
+            future.exception()
@@ -0,0 +1,107 @@
+"""
+按系统分类预加载的 User-Agent 池
+
+fake_useragent.UserAgent() 每次构造都会重新读取浏览器数据文件, 每次取 .random 还会重新过滤整份数据,
+这里在启动时为每个系统各过滤一次, 之后取 User-Agent 只是从列表中选一个
+"""
+
+import itertools
+import os
+import random
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+import fake_useragent
+
+from .ttl_cache import TTLCache
+
+# 取 User-Agent 的方式: random 每次随机 / round_robin 依次轮换 / fixed 每个系统固定一个
+USER_AGENT_POLICY = os.getenv("PARSE_VIDEO_UA_POLICY", "random")
+# 同一个上游会话固定使用同一个 User-Agent 的时间(秒) / 最多记录的会话数
+USER_AGENT_STICKY_TTL = float(os.getenv("PARSE_VIDEO_UA_STICKY_TTL", "3600"))
+USER_AGENT_STICKY_SIZE = int(os.getenv("PARSE_VIDEO_UA_STICKY_SIZE", "10000"))
+
+# 预加载的系统分类
+OS_FAMILIES = ("ios", "android", "windows")
+
+POLICIES = ("random", "round_robin", "fixed")
+
+
+def load_user_agents(os_family: str) -> List[str]:
+    """
+    获取 fake_useragent 数据中该系统的全部 User-Agent, 过滤条件与 UserAgent(os=[...]).random 一致
+    :param os_family: 系统, 如 ios / android / windows
+    :return: 没有数据时只包含 fake_useragent 的默认值
+    """
+    ua = fake_useragent.UserAgent(os=[os_family])
+    user_agents = [
+        item["useragent"]
+        for item in ua.data_browsers
+        if item["browser"] in ua.browsers
+        and item["os"] in ua.os
+        and item["type"] in ua.platforms
+    ]
+    return user_agents or [ua.fallback]
+
+
+class UserAgentPool:
+    """
+    按系统分类的 User-Agent 池
+    指定 session 时, 同一会话在 sticky_ttl 内返回同一个 User-Agent, 与 cookie 等会话状态保持一致
+    只在事件循环线程内使用, 不加锁
+    """
+
+    def __init__(
+        self,
+        families: Tuple[str, ...] = OS_FAMILIES,
+        policy: str = USER_AGENT_POLICY,
+        sticky_ttl: float = USER_AGENT_STICKY_TTL,
+        sticky_size: int = USER_AGENT_STICKY_SIZE,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(
+                f"不支持的 User-Agent 轮换方式: {policy}, 可选: {POLICIES}"
+            )
+        self.policy = policy
+        self._user_agents: Dict[str, List[str]] = {
+            family: load_user_agents(family) for family in families
+        }
+        self._cycles: Dict[str, Iterator[str]] = {
+            family: itertools.cycle(user_agents)
+            for family, user_agents in self._user_agents.items()
+        }
+        self._fixed: Dict[str, str] = {
+            family: random.choice(user_agents)
+            for family, user_agents in self._user_agents.items()
+        }
+        self._sticky = TTLCache(maxsize=sticky_size, ttl=sticky_ttl)
+
+    def _next(self, os_family: str) -> str:
+        if self.policy == "round_robin":
+            return next(self._cycles[os_family])
+        if self.policy == "fixed":
+            return self._fixed[os_family]
+        return random.choice(self._user_agents[os_family])
+
+    def get(self, os_family: str, session: Optional[Hashable] = None) -> str:
+        """
+        获取 User-Agent
+        :param os_family: 系统, 如 ios / android / windows
+        :param session: 上游会话标识, 如同一次解析中的作品ID, 为空时按轮换方式选取
+        :return:
+        """
+        if session is None:
+            return self._next(os_family)
+
+        key = (os_family, session)
+        user_agent = self._sticky.get(key)
+        if user_agent is None:
+            user_agent = self._next(os_family)
+        # 每次使用都延长有效期, 会话持续期间不会更换
+        self._sticky.set(key, user_agent)
+        return user_agent
+
+    def size(self, os_family: str) -> int:
+        return len(self._user_agents[os_family])
+
+
+user_agent_pool = UserAgentPool()